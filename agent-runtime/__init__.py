@@ -5,10 +5,10 @@ This package contains the core components for running the Strands agent
 with MCP server integration and streaming capabilities.
 """
 
-from config import Config
-from mcp_manager import MCPServerManager
-from agent_manager import AgentManager
-from stream_processor import StreamProcessor
+from config.config import Config
+from core.mcp_manager import MCPServerManager
+from core.agent_manager import AgentManager
+from core.stream_processor import StreamProcessor
 from utils.logger import LoggerSetup
 
 __version__ = "1.0.0"
@@ -1,12 +1,364 @@
 import os
-import boto3
-import requests
+import base64
+import atexit
+import random
+import re
+import threading
+import time
+from concurrent.futures import Future
 import json
 from dotenv import load_dotenv
 from bedrock_agentcore.identity.auth import requires_access_token
+from utils.aws_clients import aws_clients
+from utils.circuit_breaker import CircuitOpenError, aws_endpoint_probe, circuit_breakers
+from utils.http_client import RoundTripCounter, http_clients
+from utils.metrics import metrics
 
 load_dotenv()
 
+# Refresh the cached token this many seconds before its JWT expiry
+TOKEN_REFRESH_MARGIN_SECONDS = float(os.getenv("TOKEN_REFRESH_MARGIN_SECONDS", "300"))
+# How long a failed token source (e.g. no workload access token) is skipped
+TOKEN_NEGATIVE_CACHE_SECONDS = float(os.getenv("TOKEN_NEGATIVE_CACHE_SECONDS", "600"))
+# Lifetime assumed for tokens without a readable exp claim, after a gateway check
+OPAQUE_TOKEN_TTL_SECONDS = float(os.getenv("OPAQUE_TOKEN_TTL_SECONDS", "300"))
+# Exponential backoff between MCP connect attempts (full jitter)
+MCP_CONNECT_BACKOFF_BASE_SECONDS = float(os.getenv("MCP_CONNECT_BACKOFF_BASE_SECONDS", "0.5"))
+MCP_CONNECT_BACKOFF_MAX_SECONDS = float(os.getenv("MCP_CONNECT_BACKOFF_MAX_SECONDS", "8"))
+# How long secret values are served from memory before GetSecretValue is called again
+SECRET_CACHE_TTL_SECONDS = float(os.getenv("SECRET_CACHE_TTL_SECONDS", "300"))
+
+# Fail fast while the gateway, Cognito or Secrets Manager is down; MCPServerManager adds the gateway probe
+AUTH_REGION = os.getenv("AWS_REGION", "us-east-1")
+gateway_breaker = circuit_breakers.get("gateway")
+cognito_breaker = circuit_breakers.get("cognito", probe=aws_endpoint_probe("cognito-idp", AUTH_REGION))
+secrets_breaker = circuit_breakers.get("secretsmanager", probe=aws_endpoint_probe("secretsmanager", AUTH_REGION))
+
+def decode_jwt_expiry(token):
+    """
+    Read the exp claim of a JWT without verifying it; None if the token is not a JWT
+    """
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        claims = json.loads(base64.urlsafe_b64decode(payload))
+        return float(claims["exp"])
+    except Exception:
+        return None
+
+class TokenCache:
+    """
+    In-process bearer token cache driven by the JWT expiry,
+    with remembered failures of token sources
+    """
+    
+    def __init__(self, refresh_margin=TOKEN_REFRESH_MARGIN_SECONDS, negative_ttl=TOKEN_NEGATIVE_CACHE_SECONDS):
+        self.refresh_margin = refresh_margin
+        self.negative_ttl = negative_ttl
+        self.token = None
+        self.expires_at = 0.0
+        # Cognito refresh token from the last password authentication
+        self.refresh_token = None
+        self.hits = 0
+        self.misses = 0
+        self.background_refreshes = 0
+        self._failures = {}
+        # Tokens the gateway rejected, until their expiry
+        self._rejected = {}
+        self._refreshing = False
+        self._lock = threading.Lock()
+    
+    def get(self, refresher=None):
+        """
+        Return the cached token while it is valid, starting a background
+        refresh once it is inside the refresh margin
+        """
+        with self._lock:
+            remaining = self.expires_at - time.time()
+            if not self.token or remaining <= 0:
+                self.misses += 1
+                return None
+            self.hits += 1
+            token = self.token
+            start_refresh = refresher is not None and remaining <= self.refresh_margin and not self._refreshing
+            if start_refresh:
+                self._refreshing = True
+        
+        if start_refresh:
+            threading.Thread(target=self._refresh, args=(refresher,), name="token-refresh", daemon=True).start()
+        return token
+    
+    def set(self, token, expires_at=None):
+        """
+        Cache a token until its JWT exp claim (or expires_at for opaque tokens)
+        """
+        expires_at = decode_jwt_expiry(token) or expires_at
+        with self._lock:
+            self.token = token
+            self.expires_at = expires_at or 0.0
+    
+    def invalidate(self, token=None):
+        """
+        Drop the cached token, only if it is still the given one when token is passed
+        """
+        with self._lock:
+            if token is None or token == self.token:
+                self.token = None
+                self.expires_at = 0.0
+    
+    def reject(self, token):
+        """
+        Drop token and refuse it as a stored token until it expires
+        """
+        now = time.time()
+        expires_at = decode_jwt_expiry(token) or now + self.negative_ttl
+        with self._lock:
+            self._rejected = {rejected: until for rejected, until in self._rejected.items() if until > now}
+            self._rejected[token] = expires_at
+            if token == self.token:
+                self.token = None
+                self.expires_at = 0.0
+    
+    def is_rejected(self, token):
+        """
+        Whether token was rejected and has not expired since
+        """
+        with self._lock:
+            return self._rejected.get(token, 0.0) > time.time()
+    
+    def remember_failure(self, source, message):
+        """
+        Skip a token source for negative_ttl seconds after it failed
+        """
+        with self._lock:
+            self._failures[source] = (message, time.time() + self.negative_ttl)
+    
+    def failure(self, source):
+        """
+        The remembered failure message for a source, or None
+        """
+        with self._lock:
+            failure = self._failures.get(source)
+            if failure and failure[1] <= time.time():
+                del self._failures[source]
+                return None
+            return failure[0] if failure else None
+    
+    def stats(self):
+        """
+        Cache hits, misses, background refreshes and seconds until expiry
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "background_refreshes": self.background_refreshes,
+                "expires_in": round(self.expires_at - time.time(), 1) if self.token else None,
+                "failed_sources": sorted(self._failures),
+            }
+    
+    def _refresh(self, refresher):
+        try:
+            token = refresher()
+            if token:
+                self.set(token)
+                with self._lock:
+                    self.background_refreshes += 1
+        except Exception as e:
+            print(f"Background token refresh failed: {e}")
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+class SecretsCache:
+    """
+    In-memory TTL cache of JSON secret values, tracking the VersionId of each
+    entry so stale versions can be invalidated precisely
+    """
+    
+    def __init__(self, ttl=SECRET_CACHE_TTL_SECONDS):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.creates = 0
+        self._entries = {}
+        self._lock = threading.Lock()
+    
+    def get(self, client, secret_name):
+        """
+        Secret value as a dictionary, from memory while the entry is fresh
+        """
+        with self._lock:
+            entry = self._entries.get(secret_name)
+            if entry and time.monotonic() - entry["stored_at"] < self.ttl:
+                self.hits += 1
+                return entry["data"]
+            self.misses += 1
+        
+        response = secrets_breaker.call(client.get_secret_value, SecretId=secret_name)
+        data = json.loads(response['SecretString'])
+        self._store(secret_name, data, response.get('VersionId'))
+        return data
+    
+    def put(self, client, secret_name, data, description=None):
+        """
+        Write a secret value, creating the secret only when it does not exist yet
+        """
+        secret_string = json.dumps(data)
+        try:
+            response = secrets_breaker.call(client.put_secret_value, SecretId=secret_name, SecretString=secret_string)
+            created = False
+        except client.exceptions.ResourceNotFoundException:
+            response = secrets_breaker.call(
+                client.create_secret,
+                Name=secret_name,
+                SecretString=secret_string,
+                Description=description or ""
+            )
+            created = True
+        self._store(secret_name, data, response.get('VersionId'))
+        with self._lock:
+            self.writes += 1
+            self.creates += int(created)
+        return created
+    
+    def invalidate(self, secret_name, version_id=None):
+        """
+        Drop a cached secret; with version_id only if that version is still cached
+        """
+        with self._lock:
+            entry = self._entries.get(secret_name)
+            if entry and (version_id is None or entry["version_id"] == version_id):
+                del self._entries[secret_name]
+    
+    def peek(self, secret_name):
+        """
+        Cached (value, VersionId) without a remote call, or (None, None)
+        """
+        with self._lock:
+            entry = self._entries.get(secret_name)
+            return (entry["data"], entry["version_id"]) if entry else (None, None)
+    
+    def stats(self):
+        """
+        Cache hits, misses and writes
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "writes": self.writes,
+                "creates": self.creates,
+                "cached": len(self._entries),
+            }
+    
+    def _store(self, secret_name, data, version_id):
+        with self._lock:
+            self._entries[secret_name] = {
+                "data": data,
+                "version_id": version_id,
+                "stored_at": time.monotonic(),
+            }
+
+class SingleFlight:
+    """
+    Runs at most one call per key; callers arriving while it runs share its result
+    """
+    
+    def __init__(self):
+        self.calls = 0
+        self.shared = 0
+        self._inflight = {}
+        self._lock = threading.Lock()
+    
+    def do(self, key, fn):
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+                self.calls += 1
+            else:
+                self.shared += 1
+        
+        if not leader:
+            return future.result()
+        
+        try:
+            future.set_result(fn())
+        except Exception as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                del self._inflight[key]
+        return future.result()
+
+class SecretWriteBehind:
+    """
+    Writes secret values on a background thread, coalescing bursts into one
+    write of the latest value
+    """
+    
+    def __init__(self, writer):
+        self.writer = writer
+        self.submitted = 0
+        self.written = 0
+        self._pending = None
+        self._busy = False
+        self._thread = None
+        self._condition = threading.Condition()
+    
+    def submit(self, value):
+        """
+        Queue value for writing, replacing any value not yet written
+        """
+        with self._condition:
+            self._pending = value
+            self.submitted += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="secret-write-behind", daemon=True)
+                self._thread.start()
+            self._condition.notify_all()
+    
+    def flush(self, timeout=5.0):
+        """
+        Wait until queued values are written
+        """
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while self._pending is not None or self._busy:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+        return True
+    
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._pending is None:
+                    self._condition.wait()
+                value, self._pending = self._pending, None
+                self._busy = True
+            try:
+                self.writer(value)
+                self.written += 1
+            except Exception as e:
+                print(f"Background secret write failed: {e}")
+            finally:
+                with self._condition:
+                    self._busy = False
+                    self._condition.notify_all()
+
+token_cache = TokenCache()
+secrets_cache = SecretsCache()
+# One in-flight token refresh per credential
+refresh_flight = SingleFlight()
+# Bearer tokens are written back to secret manager off the request path
+secret_writer = SecretWriteBehind(lambda token: save_bearer_token_to_secret_manager(token))
+atexit.register(secret_writer.flush)
+
 def get_bearer_token_from_secret_manager():
     """
     Get bearer token from AWS Secrets Manager
@@ -21,12 +373,11 @@ def get_bearer_token_from_secret_manager():
             
         print(f"Debug - Getting bearer token from secret: {secret_name}")
         
-        session = boto3.Session()
-        client = session.client('secretsmanager', region_name=region)
-        response = client.get_secret_value(SecretId=secret_name)
-        bearer_token_raw = response['SecretString']
-        
-        token_data = json.loads(bearer_token_raw)        
+        client = aws_clients.client('secretsmanager', region_name=region)
+        # Served from memory until SECRET_CACHE_TTL_SECONDS passes or the version is invalidated
+        token_data = secrets_cache.get(client, secret_name)
+        if token_data.get('refresh_token') and not token_cache.refresh_token:
+            token_cache.refresh_token = token_data['refresh_token']
         if 'bearer_token' in token_data:
             bearer_token = token_data['bearer_token']
             print("Successfully retrieved bearer token from secret manager")
@@ -53,35 +404,28 @@ def save_bearer_token_to_secret_manager(bearer_token):
             
         print(f"Debug - Saving bearer token to secret: {secret_name}")
         
-        session = boto3.Session()
-        client = session.client('secretsmanager', region_name=region)
+        client = aws_clients.client('secretsmanager', region_name=region)
         
         # Create secret value with bearer_key 
         secret_value = {
             "bearer_key": "mcp_server_bearer_token",
             "bearer_token": bearer_token
         }
+        # Keep the Cognito refresh token next to the bearer token for renewals
+        if token_cache.refresh_token:
+            secret_value["refresh_token"] = token_cache.refresh_token
         
-        # Convert to JSON string
-        secret_string = json.dumps(secret_value)
-        
-        # Check if secret already exists
-        try:
-            client.describe_secret(SecretId=secret_name)
-            # Secret exists, update it
-            client.put_secret_value(
-                SecretId=secret_name,
-                SecretString=secret_string
-            )
-            print(f"Bearer token updated in secret manager with key: {secret_value['bearer_key']}")
-        except client.exceptions.ResourceNotFoundException:
-            # Secret doesn't exist, create it
-            client.create_secret(
-                Name=secret_name,
-                SecretString=secret_string,
-                Description="MCP Server Cognito credentials with bearer key and token"
-            )
+        # Update the secret, creating it only if it doesn't exist yet
+        created = secrets_cache.put(
+            client,
+            secret_name,
+            secret_value,
+            description="MCP Server Cognito credentials with bearer key and token"
+        )
+        if created:
             print(f"Bearer token created in secret manager with key: {secret_value['bearer_key']}")
+        else:
+            print(f"Bearer token updated in secret manager with key: {secret_value['bearer_key']}")
             
         return True
             
@@ -89,15 +433,32 @@ def save_bearer_token_to_secret_manager(bearer_token):
         print(f"Error saving bearer token to secret manager: {e}")
         return False
 
-def refresh_bearer_token_if_needed(bearer_token, test_url=None):
+def gateway_request(method, url, **kwargs):
     """
-    Test if bearer token is valid and refresh if needed (like GitHub code)
+    HTTP request to the gateway through its circuit breaker; 5xx responses count as outages
+    """
+    gateway_breaker.check()
+    try:
+        response = http_clients.request(method, url, **kwargs)
+    except Exception as e:
+        gateway_breaker.record_error(e)
+        raise
+    if response.status_code >= 500:
+        gateway_breaker.record_failure(f"HTTP {response.status_code} from {url}")
+    else:
+        gateway_breaker.record_success()
+    return response
+
+def check_bearer_token(bearer_token, test_url=None):
+    """
+    Ask the gateway whether bearer token is valid: True if accepted, False if rejected,
+    None if it could not be checked (no gateway URL, unexpected status or request error)
     """
     if not test_url:
         test_url = os.getenv("GATEWAY_URL")
     
     if not test_url or not bearer_token:
-        return bearer_token
+        return None
     
     try:
         print("Testing bearer token validity...")
@@ -122,33 +483,43 @@ def refresh_bearer_token_if_needed(bearer_token, test_url=None):
             }
         })
         
-        response = requests.post(
+        response = gateway_request(
+            "POST",
             f"{test_url}/mcp",
             headers=headers,
-            data=test_body,
+            content=test_body,
             timeout=30
         )
         
         if response.status_code == 200:
             print("Bearer token is valid")
-            return bearer_token
+            return True
         elif response.status_code == 403 or "Invalid Bearer token" in response.text:
-            print("Bearer token is expired or invalid, getting fresh token...")
-            # Get fresh token from Cognito
-            fresh_token = get_cognito_token_direct()
-            if fresh_token:
-                print("Successfully obtained fresh token, updating secret manager...")
-                save_bearer_token_to_secret_manager(fresh_token)
-                return fresh_token
-            else:
-                print("Failed to get fresh token from Cognito")
-                return bearer_token
+            print("Bearer token is expired or invalid")
+            return False
         else:
             print(f"Unexpected response status: {response.status_code}")
-            return bearer_token
+            return None
             
     except Exception as e:
         print(f"Error testing bearer token: {e}")
+        return None
+
+def refresh_bearer_token_if_needed(bearer_token, test_url=None):
+    """
+    Test if bearer token is valid and refresh if needed (like GitHub code)
+    """
+    if check_bearer_token(bearer_token, test_url) is not False:
+        return bearer_token
+    
+    print("Getting fresh token...")
+    # Get fresh token from Cognito
+    fresh_token = refresh_cognito_token(stale_token=bearer_token)
+    if fresh_token:
+        print("Successfully obtained fresh token")
+        return fresh_token
+    else:
+        print("Failed to get fresh token from Cognito")
         return bearer_token
 
 def make_authenticated_request(url, headers=None, data=None, method="POST", timeout=30, max_retries=1):
@@ -176,9 +547,11 @@ def make_authenticated_request(url, headers=None, data=None, method="POST", time
             print(f"Making authenticated request (attempt {attempt + 1}/{max_retries + 1})...")
             
             if method.upper() == "POST":
-                response = requests.post(url, headers=headers, data=data, timeout=timeout)
+                # Raw JSON strings go as the body, dictionaries as form data
+                body = {"content": data} if isinstance(data, (str, bytes)) else {"data": data}
+                response = gateway_request("POST", url, headers=headers, timeout=timeout, **body)
             elif method.upper() == "GET":
-                response = requests.get(url, headers=headers, timeout=timeout)
+                response = gateway_request("GET", url, headers=headers, timeout=timeout)
             else:
                 raise ValueError(f"Unsupported HTTP method: {method}")
             
@@ -187,16 +560,15 @@ def make_authenticated_request(url, headers=None, data=None, method="POST", time
                 return response
             elif response.status_code == 403 or "Invalid Bearer token" in response.text:
                 print(f"403 Forbidden - Token may be expired (attempt {attempt + 1})")
+                invalidate_token(headers["Authorization"][len("Bearer "):])
                 
                 if attempt < max_retries:
                     print("Getting fresh token from Cognito...")
-                    fresh_token = get_cognito_token_direct()
+                    fresh_token = refresh_cognito_token(stale_token=headers["Authorization"][len("Bearer "):])
                     if fresh_token:
                         print("Successfully obtained fresh token, updating headers and retrying...")
                         # Update headers with fresh token
                         headers["Authorization"] = f"Bearer {fresh_token}"
-                        # Save the fresh token
-                        save_bearer_token_to_secret_manager(fresh_token)
                         continue
                     else:
                         print("Failed to get fresh token from Cognito")
@@ -220,9 +592,70 @@ def make_authenticated_request(url, headers=None, data=None, method="POST", time
     # If we get here, all attempts failed
     raise Exception(f"All {max_retries + 1} attempts failed")
 
+def _cognito_credential_key():
+    return f"cognito:{os.getenv('COGNITO_CLIENT_ID')}:{os.getenv('COGNITO_USERNAME')}"
+
+def refresh_cognito_token(stale_token=None):
+    """
+    Get a fresh Cognito token with one in-flight refresh per credential.
+    Concurrent callers share the result; a caller whose stale_token was already
+    replaced gets the replacement without another Cognito call.
+    The new token is cached and written back to secret manager asynchronously.
+    """
+    def refresh():
+        cached_token = token_cache.get()
+        if stale_token and cached_token and cached_token != stale_token:
+            print("Token was already refreshed by another caller")
+            return cached_token
+        
+        started = time.perf_counter()
+        fresh_token = get_cognito_token_direct()
+        metrics.observe("auth.token_renewal", time.perf_counter() - started)
+        if fresh_token:
+            token_cache.set(fresh_token, time.time() + OPAQUE_TOKEN_TTL_SECONDS)
+            secret_writer.submit(fresh_token)
+        return fresh_token
+    
+    return refresh_flight.do(_cognito_credential_key(), refresh)
+
+def refresh_stats():
+    """
+    Token refresh, secret cache and secret write-back counters
+    """
+    return {
+        "refresh_calls": refresh_flight.calls,
+        "refresh_shared": refresh_flight.shared,
+        "secret_writes_submitted": secret_writer.submitted,
+        "secret_writes": secret_writer.written,
+        "secrets_cache": secrets_cache.stats(),
+    }
+
+def _initiate_auth(client, client_id, auth_flow, auth_parameters):
+    """
+    Call Cognito initiate_auth, counting calls and errors and timing each flow
+    """
+    metric = f"auth.cognito.{auth_flow.lower()}"
+    metrics.increment(f"{metric}.calls")
+    started = time.perf_counter()
+    try:
+        response = cognito_breaker.call(
+            client.initiate_auth,
+            ClientId=client_id,
+            AuthFlow=auth_flow,
+            AuthParameters=auth_parameters
+        )
+        return response['AuthenticationResult']
+    except Exception:
+        metrics.increment(f"{metric}.errors")
+        raise
+    finally:
+        metrics.observe(metric, time.perf_counter() - started)
+
 def get_cognito_token_direct():
     """
-    Direct Cognito token retrieval using USER_PASSWORD_AUTH flow 
+    Direct Cognito token retrieval. Renews with REFRESH_TOKEN_AUTH when a refresh
+    token is known and falls back to the USER_PASSWORD_AUTH flow when it is
+    missing or rejected
     """
     try:
         # Get Cognito configuration from environment
@@ -236,30 +669,43 @@ def get_cognito_token_direct():
         print(f"Debug - Password: {'***' if password else 'None'}")
         print(f"Debug - Region: {region}")
         
-        if not all([client_id, username, password]):
+        if not client_id:
+            raise ValueError("Missing Cognito configuration: COGNITO_CLIENT_ID")
+        
+        # Shared Cognito client using AWS SDK (like GitHub code)
+        client = aws_clients.client('cognito-idp', region_name=region)
+        
+        refresh_token = token_cache.refresh_token
+        if refresh_token:
+            try:
+                print("Debug - Renewing Cognito tokens with refresh token...")
+                auth_result = _initiate_auth(client, client_id, 'REFRESH_TOKEN_AUTH', {
+                    'REFRESH_TOKEN': refresh_token
+                })
+                print("Successfully renewed Cognito tokens with refresh token")
+                return auth_result['AccessToken']
+            except client.exceptions.NotAuthorizedException as e:
+                # Refresh token expired or revoked
+                print(f"Refresh token rejected, falling back to password authentication: {e}")
+                token_cache.refresh_token = None
+        
+        if not all([username, password]):
             missing = []
-            if not client_id: missing.append("COGNITO_CLIENT_ID")
             if not username: missing.append("COGNITO_USERNAME")
             if not password: missing.append("COGNITO_PASSWORD")
             raise ValueError(f"Missing Cognito configuration: {', '.join(missing)}")
         
-        # Create Cognito client using AWS SDK (like GitHub code)
-        client = boto3.client('cognito-idp', region_name=region)
-        
         print("Debug - Making Cognito authentication request...")
         # Authenticate and get tokens using USER_PASSWORD_AUTH flow
-        response = client.initiate_auth(
-            ClientId=client_id,
-            AuthFlow='USER_PASSWORD_AUTH',
-            AuthParameters={
-                'USERNAME': username,
-                'PASSWORD': password
-            }
-        )
+        auth_result = _initiate_auth(client, client_id, 'USER_PASSWORD_AUTH', {
+            'USERNAME': username,
+            'PASSWORD': password
+        })
         
         print(f"Debug - Authentication response received")
-        auth_result = response['AuthenticationResult']
         access_token = auth_result['AccessToken']
+        # Kept for renewals and saved with the bearer token
+        token_cache.refresh_token = auth_result.get('RefreshToken') or token_cache.refresh_token
         
         print(f"Debug - Access token received: {'Yes' if access_token else 'No'}")
         print("Successfully obtained fresh Cognito tokens")
@@ -283,11 +729,99 @@ def get_gateway_access_token_bedrock(access_token: str):
     print(f"Access Token from Bedrock AgentCore: {access_token}")
     return access_token
 
+def invalidate_token(token):
+    """
+    Forget a rejected or expired token in the token cache, the environment
+    and the cached secret version holding it; it is not accepted again
+    """
+    token_cache.reject(token)
+    if os.environ.get("BEARER_TOKEN") == token:
+        del os.environ["BEARER_TOKEN"]
+    secret_name = os.getenv("SECRET_NAME")
+    if secret_name:
+        data, version_id = secrets_cache.peek(secret_name)
+        if data and data.get('bearer_token') == token:
+            # A newer version stored meanwhile is kept
+            secrets_cache.invalidate(secret_name, version_id)
+
+def _accept_stored_token(token):
+    """
+    Cache and return a stored token that is still valid, or None if it has expired.
+    JWTs are checked locally against exp; opaque tokens need a gateway round trip
+    and are only cached once the gateway has accepted them.
+    """
+    if token_cache.is_rejected(token):
+        print("Stored bearer token was rejected by the gateway")
+        return None
+    expires_at = decode_jwt_expiry(token)
+    if expires_at is None:
+        if not os.getenv("GATEWAY_URL"):
+            # Nothing to check against: use the token for this lookup without caching it
+            return token
+        if check_bearer_token(token):
+            token_cache.set(token, time.time() + OPAQUE_TOKEN_TTL_SECONDS)
+            return token
+        print("Stored bearer token could not be confirmed, getting a fresh one")
+        invalidate_token(token)
+        return None
+    if expires_at <= time.time():
+        print("Stored bearer token has expired")
+        invalidate_token(token)
+        return None
+    token_cache.set(token)
+    return token
+
+def fetch_fresh_token():
+    """
+    Get a new token from bedrock_agentcore or direct Cognito and save it to secret manager
+    """
+    failure = token_cache.failure("bedrock_agentcore")
+    if failure:
+        print(f"Skipping bedrock_agentcore authentication: {failure}")
+    else:
+        try:
+            # Try bedrock_agentcore method first
+            print("Trying bedrock_agentcore authentication...")
+            token = get_gateway_access_token_bedrock()
+            if token:
+                token_cache.set(token, time.time() + OPAQUE_TOKEN_TTL_SECONDS)
+                # Save the token to secret manager
+                secret_writer.submit(token)
+                return token
+        except ValueError as e:
+            if "Workload access token has not been set" in str(e):
+                print("Workload access token not available, falling back to direct Cognito authentication...")
+                token_cache.remember_failure("bedrock_agentcore", str(e))
+            else:
+                raise e
+        except Exception as e:
+            print(f"Error with bedrock_agentcore authentication: {e}")
+    
+    # Fall back to direct Cognito token retrieval
+    print("Falling back to direct Cognito authentication...")
+    token = refresh_cognito_token()
+    if token:
+        print("Successfully obtained token via direct Cognito authentication")
+    return token
+
 def get_gateway_access_token():
     """
-    Main function that checks secret manager first, then tries bedrock_agentcore, 
+    Main function that serves the cached token while it is valid, then checks
+    the environment and secret manager, then tries bedrock_agentcore,
     then falls back to direct Cognito with automatic token refresh
     """
+    # Valid cached token: no network I/O, refreshed in the background near expiry
+    cached_token = token_cache.get(refresher=fetch_fresh_token)
+    if cached_token:
+        return cached_token
+    
+    # Concurrent cache misses share one lookup
+    return refresh_flight.do("gateway", _load_gateway_token)
+
+def _load_gateway_token():
+    """
+    Token lookup behind the cache: environment, secret manager, then a fresh token
+    """
     # Set GATEWAY_URL if not already set (for token validation)
     if not os.getenv("GATEWAY_URL") and os.getenv("gateway_endpoint"):
         os.environ["GATEWAY_URL"] = os.getenv("gateway_endpoint")
@@ -296,9 +830,10 @@ def get_gateway_access_token():
     jwt_token = os.getenv("BEARER_TOKEN")
     if jwt_token:
         print("Using bearer token from environment variable")
-        # Even with env token, test if it's still valid
-        jwt_token = refresh_bearer_token_if_needed(jwt_token)
-        return jwt_token
+        # Even with env token, check if it's still valid
+        jwt_token = _accept_stored_token(jwt_token)
+        if jwt_token:
+            return jwt_token
     
     # Check secret manager for stored token
     print("Checking secret manager for stored bearer token...")
@@ -306,39 +841,17 @@ def get_gateway_access_token():
     
     if bearer_token:
         print("Found bearer token in secret manager")
-        # Test if the token is still valid and refresh if needed
-        bearer_token = refresh_bearer_token_if_needed(bearer_token)
-        return bearer_token
-    
-    # No token in secret manager, try to get fresh token from Cognito
-    print("No bearer token found in secret manager, getting fresh bearer token from Cognito...")
-    
-    try:
-        # Try bedrock_agentcore method first
-        print("Trying bedrock_agentcore authentication...")
-        token = get_gateway_access_token_bedrock()
-        if token:
-            # Save the token to secret manager
-            save_bearer_token_to_secret_manager(token)
-            return token
-    except ValueError as e:
-        if "Workload access token has not been set" in str(e):
-            print("Workload access token not available, falling back to direct Cognito authentication...")
-        else:
-            raise e
-    except Exception as e:
-        print(f"Error with bedrock_agentcore authentication: {e}")
+        # Check if the token is still valid
+        bearer_token = _accept_stored_token(bearer_token)
+        if bearer_token:
+            return bearer_token
     
-    # Fall back to direct Cognito token retrieval
-    print("Falling back to direct Cognito authentication...")
-    token = get_cognito_token_direct()
+    # No valid stored token, get fresh token
+    print("No valid bearer token found, getting fresh bearer token...")
+    token = fetch_fresh_token()
     if token:
-        print("Successfully obtained token via direct Cognito authentication")
-        # Save the fresh token to secret manager
-        save_bearer_token_to_secret_manager(token)
         return token
-    else:
-        raise Exception("Failed to obtain token via all methods (secret manager, bedrock_agentcore, and direct Cognito)")
+    raise Exception("Failed to obtain token via all methods (secret manager, bedrock_agentcore, and direct Cognito)")
 
 def get_gateway_access_token_with_retry(max_retries=2):
     """
@@ -359,110 +872,151 @@ def get_gateway_access_token_with_retry(max_retries=2):
     
     raise Exception(f"Failed to obtain token after {max_retries + 1} attempts")
 
-def load_tools_from_mcp_with_retry(gateway_endpoint, max_retries=2):
+# Outcome of the most recent MCP connect
+last_connect = {}
+# Phrases in an error message that mean the gateway rejected the bearer token
+AUTH_ERROR_MARKERS = ("Unauthorized", "Forbidden", "Invalid Bearer token")
+# A bare 401/403 counts only as an HTTP status, never as part of a port, id or byte count
+AUTH_STATUS_PATTERN = re.compile(r"\b(?:status(?:[ _]code)?|HTTP(?:/[\d.]+)?)\W{0,3}40[13]\b", re.IGNORECASE)
+
+def is_auth_error(error):
+    """
+    Whether error, or any exception it wraps, is a gateway authentication failure
+    """
+    pending = [error]
+    seen = set()
+    while pending:
+        current = pending.pop()
+        if current is None or id(current) in seen:
+            continue
+        seen.add(id(current))
+        
+        response = getattr(current, "response", None)
+        if getattr(response, "status_code", None) in (401, 403):
+            return True
+        message = str(current)
+        if any(marker in message for marker in AUTH_ERROR_MARKERS) or AUTH_STATUS_PATTERN.search(message):
+            return True
+        
+        # MCPClient wraps transport errors, which arrive inside exception groups
+        pending.extend(getattr(current, "exceptions", ()))
+        pending.extend([current.__cause__, current.__context__])
+    return False
+
+def backoff_delay(attempt, base=MCP_CONNECT_BACKOFF_BASE_SECONDS, cap=MCP_CONNECT_BACKOFF_MAX_SECONDS):
+    """
+    Exponential backoff with full jitter for the given attempt (0-based)
+    """
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+def connect_stats():
+    """
+    Round trips, attempts and duration of the most recent MCP connect
+    """
+    return dict(last_connect)
+
+def load_tools_from_mcp_with_retry(gateway_endpoint, max_retries=2, list_tools=True, record_stats=True):
     """
-    Load tools from MCP server with automatic token refresh on failure
+    Connect to the MCP gateway and load its tools.
+    The MCP initialize handshake is the only token check: an auth failure there
+    triggers a token refresh, other failures are retried with exponential
+    backoff and jitter.
+    With list_tools=False only the MCP session is opened and the tool list is empty.
+    With record_stats=False the connect is left out of connect_stats and the mcp.connect metrics
     """
     from strands.tools.mcp import MCPClient
     from mcp.client.streamable_http import streamablehttp_client
     
+    started = time.perf_counter()
+    round_trips = RoundTripCounter()
+    token_refreshes = 0
+    
+    def record(attempts, success):
+        print(f"MCP connect {'succeeded' if success else 'failed'} after {attempts} attempt(s), "
+              f"{round_trips.count} gateway round trip(s)")
+        if not record_stats:
+            return
+        last_connect.update({
+            "success": success,
+            "attempts": attempts,
+            "round_trips": round_trips.count,
+            "token_refreshes": token_refreshes,
+            "seconds": round(time.perf_counter() - started, 3),
+        })
+        metrics.observe("mcp.connect", time.perf_counter() - started)
+        metrics.increment("mcp.connect.round_trips", round_trips.count)
+        metrics.increment("mcp.connects" if success else "mcp.connect.failures")
+    
     for attempt in range(max_retries + 1):
+        jwt_token = None
+        mcp_client = None
+        session_started = False
         try:
             print(f"Loading MCP tools attempt {attempt + 1}/{max_retries + 1}")
+            gateway_breaker.check()
             
             # Get current token
             jwt_token = get_gateway_access_token_with_retry(max_retries=1)
             if not jwt_token:
                 raise Exception("Failed to obtain bearer token")
             
-            # Test token validity first with a simple request
-            print("Testing token validity before MCP connection...")
-            test_headers = {
-                "Authorization": f"Bearer {jwt_token}",
-                "Content-Type": "application/json",
-                "Accept": "application/json, text/event-stream"
-            }
-            
-            test_payload = {
-                "jsonrpc": "2.0",
-                "id": "test",
-                "method": "initialize",
-                "params": {
-                    "protocolVersion": "2024-11-05",
-                    "capabilities": {},
-                    "clientInfo": {
-                        "name": "test-client",
-                        "version": "1.0.0"
-                    }
-                }
-            }
-            
-            import requests
-            test_response = requests.post(
-                f"{gateway_endpoint}/mcp",
-                headers=test_headers,
-                data=json.dumps(test_payload),
-                timeout=30
-            )
-            
-            print(f"Token test response status: {test_response.status_code}")
-            if test_response.status_code != 200:
-                print(f"Token test failed: {test_response.text}")
-                if test_response.status_code in [401, 403]:
-                    raise Exception(f"Token authentication failed: {test_response.status_code}")
-            
-            print("Token is valid, proceeding with MCP connection...")
-            
             headers = {"Authorization": f"Bearer {jwt_token}"}
             
             # Create MCP client
             mcp_client = MCPClient(lambda: streamablehttp_client(
                 url=f"{gateway_endpoint}/mcp",
-                headers=headers
+                headers=headers,
+                httpx_client_factory=round_trips.client_factory
             ))
             
-            # Enter context manager
-            mcp_client.__enter__()
+            # The initialize handshake also validates the token
+            mcp_client.start()
+            session_started = True
+            gateway_breaker.record_success()
+            
+            if not list_tools:
+                print("MCP session opened, skipping tools/list")
+                record(attempt + 1, True)
+                return [], mcp_client
             
             # Get tools
             tools = mcp_client.list_tools_sync()
             print(f"Successfully loaded {len(tools)} tools from MCP server")
             
+            record(attempt + 1, True)
             return tools, mcp_client
             
         except Exception as e:
-            error_msg = str(e)
-            print(f"MCP tools loading attempt {attempt + 1} failed: {error_msg}")
+            print(f"MCP tools loading attempt {attempt + 1} failed: {e}")
+            if session_started:
+                # tools/list failed on an open session; don't leak its thread
+                mcp_client.stop(None, None, None)
             
-            # Check if it's a token-related error
-            if ("401" in error_msg or "403" in error_msg or "Forbidden" in error_msg or 
-                "Invalid Bearer token" in error_msg or "Unauthorized" in error_msg or
-                "Token authentication failed" in error_msg):
-                
-                if attempt < max_retries:
-                    print("Token may be expired, getting fresh token and retrying...")
-                    try:
-                        # Force refresh token by getting new one directly from Cognito
-                        fresh_token = get_cognito_token_direct()
-                        if fresh_token:
-                            save_bearer_token_to_secret_manager(fresh_token)
-                            print("Fresh token obtained and saved, retrying...")
-                            continue
-                        else:
-                            print("Failed to get fresh token")
-                            break
-                    except Exception as token_error:
-                        print(f"Error getting fresh token: {token_error}")
-                        break
-                else:
-                    print("Max retries reached for token refresh")
-                    break
-            else:
-                # Non-token related error, don't retry
-                print(f"Non-token related error, not retrying: {error_msg}")
+            if isinstance(e, CircuitOpenError):
                 break
+            if mcp_client is not None:
+                gateway_breaker.record_error(e)
+            
+            if attempt >= max_retries:
+                print("Max retries reached")
+                break
+            
+            if jwt_token and is_auth_error(e):
+                print("Token rejected by the gateway, getting fresh token and retrying...")
+                invalidate_token(jwt_token)
+                fresh_token = refresh_cognito_token(stale_token=jwt_token)
+                token_refreshes += 1
+                if not fresh_token:
+                    print("Failed to get fresh token")
+                    break
+                continue
+            
+            delay = backoff_delay(attempt)
+            print(f"Retrying MCP connection in {delay:.2f}s...")
+            time.sleep(delay)
     
     print("Failed to load tools from MCP server after all attempts")
+    record(attempt + 1, False)
     return None, None
 
 # Usage examples:
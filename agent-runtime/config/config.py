@@ -1,4 +1,6 @@
 import json
+import os
+import tempfile
 from dataclasses import dataclass
 from typing import Optional
 from pathlib import Path
@@ -9,9 +11,55 @@ class Config:
     """Configuration management for the agent runtime"""
     mcp_server_url: str
     bearer_token: Optional[str] = None
+    target_name: Optional[str] = None
+    account_id: Optional[str] = None
     model_id: str = "us.anthropic.claude-3-5-haiku-20241022-v1:0"
     max_retries: int = 2
     request_timeout: int = 10
+    agent_pool_max_size: int = 32
+    agent_pool_idle_ttl: float = 1800.0
+    init_retry_interval: float = 5.0
+    warmup_enabled: bool = True
+    tool_catalog_ttl: float = 3600.0
+    tool_reload_interval: float = 300.0
+    tool_catalog_path: str = os.path.join(tempfile.gettempdir(), "robo-tool-catalog.json")
+    stream_coalesce_bytes: int = 0
+    stream_coalesce_ms: float = 0
+    metrics_log_interval: float = 60.0
+    request_deadline_seconds: float = 120.0
+    max_concurrent_requests: int = 8
+    max_queued_requests: int = 32
+    max_active_per_session: int = 1
+    admission_timeout: float = 30.0
+    intent_router_enabled: bool = True
+    prompt_cache_system: bool = True
+    prompt_cache_tools: bool = True
+    prompt_cache_type: str = "default"
+    fast_model_id: Optional[str] = None
+    strong_model_id: Optional[str] = None
+    route_short_prompt_chars: int = 30
+    route_latency_budget_ms: float = 0
+    conversation_token_budget: int = 6000
+    conversation_tool_result_chars: int = 400
+    conversation_summary_chars: int = 1500
+    log_level: str = "INFO"
+    log_json: bool = False
+    log_queue: bool = True
+    http_max_connections: int = 20
+    http_max_keepalive_connections: int = 10
+    http_keepalive_expiry: float = 30.0
+    aws_max_pool_connections: int = 50
+    aws_max_attempts: int = 3
+    aws_retry_mode: str = "adaptive"
+    circuit_failure_threshold: int = 5
+    circuit_reset_timeout: float = 30.0
+    mcp_session_pool_size: int = 3
+    mcp_health_interval: float = 30.0
+    mcp_health_timeout: float = 10.0
+    mcp_session_refresh_margin: float = 120.0
+    robot_queue_consumers: bool = True
+    robot_queue_buffer_size: int = 100
+    robot_queue_wait_seconds: int = 20
     
     @classmethod
     def from_config_file(cls) -> 'Config':
@@ -25,10 +73,20 @@ class Config:
             print(f"DEBUG: Loaded config from {config_path}")
             print(f"DEBUG: Gateway URL from config: {config_data.get('gateway_url', 'NOT_FOUND')}")
             
+            # Optional "runtime" section overrides tuning fields by name
+            runtime_options = {
+                key: value for key, value in config_data.get("runtime", {}).items()
+                if key in cls.__dataclass_fields__
+                and key not in ("mcp_server_url", "model_id", "bearer_token", "target_name", "account_id")
+            }
+            
             return cls(
                 mcp_server_url=config_data.get("gateway_url", ""),
                 model_id=config_data.get("model_id", "us.anthropic.claude-3-5-haiku-20241022-v1:0"),
-                bearer_token=None  # Will be obtained from SSM at runtime
+                bearer_token=None,  # Will be obtained from SSM at runtime
+                target_name=config_data.get("target_name"),
+                account_id=config_data.get("accountId"),
+                **runtime_options
             )
             
         except FileNotFoundError:
@@ -0,0 +1,145 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, Optional
+
+
+class AdmissionRejected(Exception):
+    """Raised when the wait queue is full"""
+
+
+class AdmissionTicket:
+    """A request's place in the admission controller"""
+    
+    def __init__(self, session_id: str, future: Optional[asyncio.Future] = None):
+        self.session_id = session_id
+        self.future = future
+        self.admitted = future is None
+        self.released = False
+        self.enqueued_at = time.perf_counter()
+        self.position = 0
+
+
+class AdmissionController:
+    """Caps concurrent agent runs and schedules queued requests round-robin across sessions
+    
+    All methods run on the event loop thread, so no locking is needed.
+    """
+    
+    def __init__(self, max_concurrent: int = 8, max_queued: int = 32, max_per_session: int = 1):
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_queued = max_queued
+        self.max_per_session = max(1, max_per_session)
+        self.logger = logging.getLogger(__name__)
+        self.active = 0
+        self._active_by_session: Dict[str, int] = {}
+        # Sessions with waiters, in round-robin order
+        self._waiters: "OrderedDict[str, Deque[AdmissionTicket]]" = OrderedDict()
+        self.waiting = 0
+        self.admitted_total = 0
+        self.queued_total = 0
+        self.rejected_total = 0
+        self.timed_out_total = 0
+    
+    def request(self, session_id: Optional[str]) -> AdmissionTicket:
+        """Admit immediately if a slot is free, otherwise enqueue; raises AdmissionRejected when full"""
+        session_id = session_id or ""
+        if self.waiting == 0 and self._has_capacity(session_id):
+            ticket = AdmissionTicket(session_id)
+            self._activate(ticket)
+            return ticket
+        
+        if self.waiting >= self.max_queued:
+            self.rejected_total += 1
+            self.logger.warning(f"Rejecting request for session {session_id}: {self.waiting} requests waiting")
+            raise AdmissionRejected(f"Admission queue is full ({self.waiting} waiting)")
+        
+        ticket = AdmissionTicket(session_id, asyncio.get_running_loop().create_future())
+        ticket.position = self.waiting + 1
+        self._waiters.setdefault(session_id, deque()).append(ticket)
+        self.waiting += 1
+        self.queued_total += 1
+        # A slot may be free but reserved for other sessions' waiters
+        self._admit_waiters()
+        return ticket
+    
+    async def wait(self, ticket: AdmissionTicket, timeout: float) -> bool:
+        """Wait until the ticket is admitted; returns False on timeout"""
+        if ticket.admitted:
+            return True
+        try:
+            await asyncio.wait_for(asyncio.shield(ticket.future), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            self.timed_out_total += 1
+            return False
+    
+    def release(self, ticket: AdmissionTicket) -> None:
+        """Free the ticket's slot, or drop it from the queue if it was never admitted"""
+        if ticket.released:
+            return
+        ticket.released = True
+        
+        if ticket.admitted:
+            self.active -= 1
+            remaining = self._active_by_session.get(ticket.session_id, 1) - 1
+            if remaining > 0:
+                self._active_by_session[ticket.session_id] = remaining
+            else:
+                self._active_by_session.pop(ticket.session_id, None)
+        else:
+            queue = self._waiters.get(ticket.session_id)
+            if queue is not None and ticket in queue:
+                queue.remove(ticket)
+                self.waiting -= 1
+                if not queue:
+                    del self._waiters[ticket.session_id]
+            if not ticket.future.done():
+                ticket.future.cancel()
+        
+        self._admit_waiters()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Concurrency, queue depth and admission counters"""
+        return {
+            "active": self.active,
+            "waiting": self.waiting,
+            "max_concurrent": self.max_concurrent,
+            "max_queued": self.max_queued,
+            "waiting_sessions": len(self._waiters),
+            "admitted_total": self.admitted_total,
+            "queued_total": self.queued_total,
+            "rejected_total": self.rejected_total,
+            "timed_out_total": self.timed_out_total,
+        }
+    
+    def _has_capacity(self, session_id: str) -> bool:
+        return (self.active < self.max_concurrent and
+                self._active_by_session.get(session_id, 0) < self.max_per_session)
+    
+    def _activate(self, ticket: AdmissionTicket) -> None:
+        ticket.admitted = True
+        self.active += 1
+        self._active_by_session[ticket.session_id] = self._active_by_session.get(ticket.session_id, 0) + 1
+        self.admitted_total += 1
+    
+    def _admit_waiters(self) -> None:
+        """Hand free slots to waiting sessions in round-robin order"""
+        for session_id in list(self._waiters):
+            if self.active >= self.max_concurrent:
+                return
+            if not self._has_capacity(session_id):
+                continue
+            
+            queue = self._waiters.pop(session_id)
+            ticket = queue.popleft()
+            self.waiting -= 1
+            if queue:
+                # Session goes to the back of the rotation with its remaining waiters
+                self._waiters[session_id] = queue
+            
+            if ticket.future.done():
+                continue
+            self._activate(ticket)
+            ticket.future.set_result(True)
@@ -1,14 +1,40 @@
+import asyncio
 import logging
-from typing import Optional, Any
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, asdict
+from typing import Optional, Any, Dict, List
 from strands import Agent
 from strands.models import BedrockModel
+from strands.tools.mcp import MCPAgentTool
 from config.config import Config
+from core.agent_pool import AgentPool
+from core.conversation_manager import TokenBudgetConversationManager
 from core.mcp_manager import MCPServerManager
+from core.deadline_hook import DeadlineHook
+from core.metrics_hook import MetricsHook
+from core.model_router import ModelRouter, ROUTE_FAST, ROUTE_STRONG
 from prompts.prompt import ORCHESTRATOR_PROMPT
 from tools.observer_env_agent import observe_env_agent
 from tools.robot_tools import get_robot_feedback, get_robot_detection, get_robot_gesture
 
 
+INIT_PENDING = "pending"
+INIT_READY = "ready"
+INIT_FAILED = "failed"
+
+
+@dataclass
+class InitState:
+    """Outcome of the most recent agent initialization attempt"""
+    status: str = INIT_PENDING
+    debug: bool = False
+    last_error: Optional[str] = None
+    failed_at: Optional[float] = None
+    attempts: int = 0
+
+
 class AgentManager:
     """Manages Strands Agent initialization and lifecycle"""
     
@@ -18,9 +44,29 @@ class AgentManager:
         self.logger = logging.getLogger(__name__)
         self.agent: Optional[Agent] = None
         self.mcp_client: Optional[Any] = None
+        # Template shared by every pooled agent
+        self.model: Optional[BedrockModel] = None
+        self.tools: list = []
+        # Digest of the MCP tool catalog the template was last built or reloaded with
+        self.tool_digest: Optional[str] = None
+        self.tool_reloads: Dict[str, int] = {"checks": 0, "added": 0, "changed": 0, "removed": 0, "errors": 0}
+        self._reload_thread: Optional[threading.Thread] = None
+        self.model_router: Optional[ModelRouter] = None
+        self.pool = AgentPool(
+            self._clone_agent,
+            max_size=config.agent_pool_max_size,
+            idle_ttl=config.agent_pool_idle_ttl
+        )
+        # Single-flight initialization state, guarded by _init_lock
+        self.init_state = InitState()
+        self.init_timings: Dict[str, float] = {}
+        self._init_lock = threading.Lock()
+        self._init_futures: Dict[bool, Future] = {}
+        self._init_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="agent-init")
     
     def initialize(self, debug: bool = False) -> bool:
         """Initialize the agent with MCP tools and local tools"""
+        mcp_client = None
         try:
             self.logger.info(f"Starting agent initialization... (debug mode: {debug})")
             
@@ -37,9 +83,13 @@ class AgentManager:
                 mcp_client = None
             else:
                 # Load tools from MCP server
+                phase_start = time.perf_counter()
                 mcp_tools, mcp_client = self.mcp_manager.load_tools()
+                self.init_timings["mcp_tools"] = time.perf_counter() - phase_start
                 if not mcp_tools or not mcp_client:
                     self.logger.error("Failed to load tools from MCP server")
+                    self.init_state.last_error = "Failed to load tools from MCP server"
+                    self._close_unused_pool(mcp_client)
                     return False
                 
                 # Combine MCP tools and local tools
@@ -47,37 +97,116 @@ class AgentManager:
                 self.logger.info(f"Loaded {len(mcp_tools)} MCP tools and {len(local_tools)} local tools")
             
             # Create the agent
-            if self._create_agent(all_tools):
+            phase_start = time.perf_counter()
+            created = self._create_agent(all_tools)
+            self.init_timings["agent_template"] = time.perf_counter() - phase_start
+            if created:
                 self.mcp_client = mcp_client
+                if mcp_client is not None:
+                    self.tool_digest = self.mcp_manager.catalog_digest(mcp_tools)
+                    self.mcp_manager.start_monitor()
+                    self.start_tool_reload()
                 self.logger.info(f"Agent initialized successfully (debug mode: {debug})")
                 return True
             else:
+                self._close_unused_pool(mcp_client)
                 return False
                 
         except Exception as e:
             self.logger.error(f"Error initializing agent: {str(e)}", exc_info=True)
+            self.init_state.last_error = f"Error initializing agent: {str(e)}"
+            self._close_unused_pool(mcp_client)
             return False
     
+    def _close_unused_pool(self, mcp_client: Optional[Any]) -> None:
+        """Close the session pool opened by a failed initialization attempt"""
+        if mcp_client is not None and mcp_client is not self.mcp_client:
+            self.mcp_manager.close_pool(mcp_client)
+    
     def _create_agent(self, tools: list) -> bool:
         """Create Strands Agent with the provided tools"""
         try:
             self.logger.info("Creating Strands Agent with tools...")
             
-            model = BedrockModel(model_id=self.config.model_id)
+            model = self._create_model(self.config.model_id)
             
             self.agent = Agent(
                 model=model,
                 tools=tools,
-                system_prompt=ORCHESTRATOR_PROMPT
+                system_prompt=ORCHESTRATOR_PROMPT,
+                hooks=[MetricsHook(), DeadlineHook()],
+                conversation_manager=self._create_conversation_manager(),
+                callback_handler=None
             )
+            self.model = model
+            self.tools = tools
+            self.model_router = self._create_model_router()
+            
+            # Session agents cloned from the previous template are stale now
+            self.pool.clear()
             
             self.logger.info("Agent created successfully")
             return True
             
         except Exception as e:
             self.logger.error(f"Error creating agent: {str(e)}", exc_info=True)
+            self.init_state.last_error = f"Error creating agent: {str(e)}"
             return False
     
+    def _create_model(self, model_id: str) -> BedrockModel:
+        """Create a BedrockModel with prompt-cache checkpoints when enabled in Config"""
+        cache_options = {}
+        if self.config.prompt_cache_system:
+            # Checkpoint after the system prompt
+            cache_options["cache_prompt"] = self.config.prompt_cache_type
+        if self.config.prompt_cache_tools:
+            # Checkpoint after the tool specs
+            cache_options["cache_tools"] = self.config.prompt_cache_type
+        return BedrockModel(model_id=model_id, **cache_options)
+    
+    def _create_model_router(self) -> Optional[ModelRouter]:
+        """Create the fast/strong routing policy when both model ids are configured"""
+        if not (self.config.fast_model_id and self.config.strong_model_id):
+            return None
+        self.logger.info(
+            f"Model routing enabled: fast={self.config.fast_model_id}, strong={self.config.strong_model_id}"
+        )
+        return ModelRouter(
+            {
+                ROUTE_FAST: self._create_model(self.config.fast_model_id),
+                ROUTE_STRONG: self._create_model(self.config.strong_model_id),
+            },
+            short_prompt_chars=self.config.route_short_prompt_chars,
+            latency_budget_ms=self.config.route_latency_budget_ms
+        )
+    
+    def route_model(self, agent: Agent, prompt: str) -> Optional[str]:
+        """Point the session agent at the routed model for this request; returns the route name"""
+        if self.model_router is None:
+            return None
+        route = self.model_router.select(prompt)
+        agent.model = self.model_router.routes[route]
+        return route
+    
+    def _create_conversation_manager(self) -> TokenBudgetConversationManager:
+        """Per-agent conversation manager enforcing the session token budget"""
+        return TokenBudgetConversationManager(
+            token_budget=self.config.conversation_token_budget,
+            tool_result_chars=self.config.conversation_tool_result_chars,
+            summary_chars=self.config.conversation_summary_chars
+        )
+    
+    def _clone_agent(self) -> Agent:
+        """Create a session agent sharing the template's model and tools"""
+        return Agent(
+            model=self.model,
+            tools=list(self.tools),
+            system_prompt=ORCHESTRATOR_PROMPT,
+            hooks=[MetricsHook(), DeadlineHook()],
+            conversation_manager=self._create_conversation_manager(),
+            callback_handler=None
+        )
+    
     def is_initialized(self, debug: bool = False) -> bool:
         """Check if agent is properly initialized"""
         if debug:
@@ -87,9 +216,89 @@ class AgentManager:
             # In normal mode, both agent and MCP client must exist
             return self.agent is not None and self.mcp_client is not None
     
-    def get_agent(self) -> Optional[Agent]:
-        """Get the initialized agent"""
-        return self.agent
+    def get_agent(self, session_id: Optional[str] = None) -> Optional[Agent]:
+        """Get the agent for a session, or a throwaway clone when no session is given
+        
+        The template agent itself is never handed out, so requests never share
+        its conversation or the model routed onto it.
+        """
+        if self.agent is None:
+            return None
+        if not session_id:
+            return self._clone_agent()
+        return self.pool.acquire(session_id)
+    
+    def context_sizes(self) -> Dict[str, int]:
+        """Estimated context size in tokens for each pooled session"""
+        return {
+            session_id: agent.conversation_manager.context_tokens
+            for session_id, agent in self.pool.items().items()
+            if isinstance(agent.conversation_manager, TokenBudgetConversationManager)
+        }
+    
+    def start_tool_reload(self) -> None:
+        """Periodically pick up tools added, changed or removed on the gateway, unless disabled"""
+        if self.config.tool_reload_interval <= 0 or self._reload_thread is not None:
+            return
+        
+        def reload_loop():
+            while True:
+                time.sleep(self.config.tool_reload_interval)
+                try:
+                    self.reload_tools()
+                except Exception as e:
+                    self.tool_reloads["errors"] += 1
+                    self.logger.error(f"Error reloading MCP tools: {str(e)}", exc_info=True)
+        
+        self._reload_thread = threading.Thread(target=reload_loop, name="tool-reload", daemon=True)
+        self._reload_thread.start()
+    
+    def reload_tools(self) -> Dict[str, List[str]]:
+        """Swap added, changed and removed MCP tools into the template and live agents
+        
+        Agents keep their conversation; tool calls already running finish on
+        the tool object they started with.
+        """
+        self.tool_reloads["checks"] += 1
+        listed = self.mcp_manager.refresh_tools()
+        if listed is None:
+            return {}
+        digest = self.mcp_manager.catalog_digest(listed)
+        if digest == self.tool_digest:
+            return {}
+        
+        current = {tool.tool_name: tool for tool in self.tools if isinstance(tool, MCPAgentTool)}
+        fresh = {tool.tool_name: tool for tool in listed}
+        added = [name for name in fresh if name not in current]
+        changed = [name for name in fresh if name in current and fresh[name].mcp_tool != current[name].mcp_tool]
+        removed = [name for name in current if name not in fresh]
+        
+        # Unchanged tools keep their objects; local tools stay after the MCP tools
+        mcp_tools = [fresh[name] if name in added or name in changed else current[name] for name in fresh]
+        self.tools = mcp_tools + [tool for tool in self.tools if not isinstance(tool, MCPAgentTool)]
+        self.tool_digest = digest
+        
+        self._swap_tools({name: fresh[name] for name in added + changed}, removed)
+        for kind, names in (("added", added), ("changed", changed), ("removed", removed)):
+            self.tool_reloads[kind] += len(names)
+        self.logger.info(f"Reloaded MCP tools: added {added}, changed {changed}, removed {removed}")
+        return {"added": added, "changed": changed, "removed": removed}
+    
+    def tool_reload_stats(self) -> Dict[str, Any]:
+        """Reload checks and tools added, changed or removed so far"""
+        return {**self.tool_reloads, "tools": len(self.tools)}
+    
+    def _swap_tools(self, replacements: Dict[str, Any], removed: List[str]) -> None:
+        """Install a new tool registry on the template and every pooled agent"""
+        agents = [self.agent] if self.agent is not None else []
+        agents.extend(self.pool.agents())
+        for agent in agents:
+            # Replaced as a whole so a concurrent event loop never iterates a dict being resized
+            registry = dict(agent.tool_registry.registry)
+            registry.update(replacements)
+            for name in removed:
+                registry.pop(name, None)
+            agent.tool_registry.registry = registry
     
     def get_mcp_client(self) -> Optional[Any]:
         """Get the MCP client"""
@@ -104,10 +313,73 @@ class AgentManager:
             self.logger.info("Agent not initialized in debug mode, attempting to initialize with local tools only...")
             return self.initialize(debug=True)
         else:
-            self.logger.info("Agent not initialized, checking MCP server status...")
-            if self.mcp_manager.is_server_running():
-                self.logger.info("MCP server is running, attempting to initialize agent...")
-                return self.initialize(debug=False)
-            else:
-                self.logger.error("MCP server is not running")
-                return False
+            # The MCP handshake while loading tools doubles as the server check,
+            # so no separate tools/list probe is sent first
+            self.logger.info("Agent not initialized, connecting to MCP server...")
+            return self.initialize(debug=False)
+    
+    def start_initialization(self, debug: bool = False) -> Future:
+        """Start initialization in the background, joining an in-flight attempt if any"""
+        with self._init_lock:
+            future = self._init_futures.get(debug)
+            if future is not None and not future.done():
+                return future
+            
+            if self.is_initialized(debug=debug):
+                self.init_state.status = INIT_READY
+                future = Future()
+                future.set_result(True)
+                return future
+            
+            self.init_state = InitState(
+                status=INIT_PENDING,
+                debug=debug,
+                attempts=self.init_state.attempts + 1
+            )
+            future = self._init_executor.submit(self._run_initialization, debug)
+            self._init_futures[debug] = future
+            return future
+    
+    def _run_initialization(self, debug: bool) -> bool:
+        """Run ensure_initialized on the init thread and record the outcome"""
+        try:
+            ready = self.ensure_initialized(debug=debug)
+        except Exception as e:
+            self.logger.error(f"Unexpected error during initialization: {str(e)}", exc_info=True)
+            self.init_state.last_error = str(e)
+            ready = False
+        
+        if ready:
+            self.init_state.status = INIT_READY
+            self.init_state.last_error = None
+            self.init_state.failed_at = None
+        else:
+            self.init_state.status = INIT_FAILED
+            self.init_state.failed_at = time.monotonic()
+            if not self.init_state.last_error:
+                self.init_state.last_error = "Agent initialization failed"
+        return ready
+    
+    async def ensure_initialized_async(self, debug: bool = False) -> bool:
+        """Ensure agent is initialized without blocking the event loop
+        
+        Concurrent callers share one in-flight initialization. After a failure,
+        callers fail fast until init_retry_interval has elapsed.
+        """
+        if self.is_initialized(debug=debug):
+            return True
+        
+        state = self.init_state
+        if (state.status == INIT_FAILED and state.debug == debug and state.failed_at is not None
+                and time.monotonic() - state.failed_at < self.config.init_retry_interval):
+            self.logger.warning(f"Skipping initialization, last attempt failed: {state.last_error}")
+            return False
+        
+        # Shielded: a cancelled request must not cancel the init other callers share
+        return await asyncio.shield(asyncio.wrap_future(self.start_initialization(debug=debug)))
+    
+    def get_init_state(self) -> Dict[str, Any]:
+        """Current initialization state (pending/ready/failed with last error)"""
+        state = asdict(self.init_state)
+        state.pop("failed_at")
+        return state
@@ -0,0 +1,95 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List
+from strands import Agent
+
+
+@dataclass
+class PooledAgent:
+    """Agent held by the pool together with its usage timestamps"""
+    agent: Agent
+    created_at: float
+    last_used: float
+
+
+class AgentPool:
+    """Session-keyed pool of agents with LRU and idle-time eviction"""
+
+    def __init__(self, factory: Callable[[], Agent], max_size: int = 32, idle_ttl: float = 1800.0):
+        self.factory = factory
+        self.max_size = max(1, max_size)
+        self.idle_ttl = idle_ttl
+        self.logger = logging.getLogger(__name__)
+        self._agents: "OrderedDict[str, PooledAgent]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def acquire(self, session_id: str) -> Agent:
+        """Return the agent bound to session_id, cloning a new one on a miss"""
+        now = time.monotonic()
+        with self._lock:
+            self._evict_idle(now)
+
+            entry = self._agents.get(session_id)
+            if entry is not None:
+                self._agents.move_to_end(session_id)
+                entry.last_used = now
+                self.hits += 1
+                return entry.agent
+
+            self.misses += 1
+            while len(self._agents) >= self.max_size:
+                evicted_id, _ = self._agents.popitem(last=False)
+                self.evictions += 1
+                self.logger.info(f"Evicted least recently used agent for session {evicted_id}")
+
+            agent = self.factory()
+            self._agents[session_id] = PooledAgent(agent=agent, created_at=now, last_used=now)
+            self.logger.info(f"Created agent for session {session_id} (pool size: {len(self._agents)})")
+            return agent
+
+    def clear(self) -> None:
+        """Drop all pooled agents"""
+        with self._lock:
+            self._agents.clear()
+
+    def agents(self) -> List[Agent]:
+        """Snapshot of the currently pooled agents"""
+        with self._lock:
+            return [entry.agent for entry in self._agents.values()]
+
+    def items(self) -> Dict[str, Agent]:
+        """Snapshot of pooled agents keyed by session id"""
+        with self._lock:
+            return {session_id: entry.agent for session_id, entry in self._agents.items()}
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool size and hit/miss/eviction counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._agents),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+            }
+
+    def _evict_idle(self, now: float) -> None:
+        """Evict agents idle for longer than idle_ttl (caller holds the lock)"""
+        if self.idle_ttl <= 0:
+            return
+        # OrderedDict is kept in LRU order, so idle agents are at the front
+        while self._agents:
+            session_id, entry = next(iter(self._agents.items()))
+            if now - entry.last_used < self.idle_ttl:
+                break
+            del self._agents[session_id]
+            self.evictions += 1
+            self.logger.info(f"Evicted idle agent for session {session_id}")
@@ -0,0 +1,120 @@
+import json
+import logging
+from typing import Any, Dict, List, Optional
+from strands.agent.conversation_manager import ConversationManager
+from strands.types.exceptions import ContextWindowOverflowException
+
+
+# Rough average for mixed Korean/English text and JSON tool payloads
+CHARS_PER_TOKEN = 3
+SUMMARY_PREFIX = "[이전 대화 요약]"
+
+
+class TokenBudgetConversationManager(ConversationManager):
+    """Keeps a session's history within a token budget by folding old turns into a rolling summary
+    
+    Tool results outside the latest turn are kept only in truncated form. When
+    the estimate still exceeds the budget, the oldest turns are removed and a
+    short extract of them is carried in front of the first remaining message.
+    """
+    
+    def __init__(self, token_budget: int = 6000, tool_result_chars: int = 400, summary_chars: int = 1500):
+        super().__init__()
+        self.token_budget = token_budget
+        self.tool_result_chars = tool_result_chars
+        self.summary_chars = summary_chars
+        self.summary = ""
+        self.context_tokens = 0
+        self.compactions = 0
+        # Tool results already truncated, by toolUseId
+        self._compacted_results = set()
+        self.logger = logging.getLogger(__name__)
+    
+    def apply_management(self, agent: Any, **kwargs: Any) -> None:
+        """Compact tool results and old turns after each invocation"""
+        messages = agent.messages
+        turn_starts = self._turn_starts(messages)
+        latest_turn = turn_starts[-1] if turn_starts else len(messages)
+        self._compact_tool_results(messages[:latest_turn])
+        
+        self.context_tokens = self.estimate_tokens(messages)
+        if self.context_tokens > self.token_budget:
+            while self.context_tokens > self.token_budget and self._drop_oldest_turn(messages):
+                self.context_tokens = self.estimate_tokens(messages)
+            self.compactions += 1
+            self.logger.info(f"Compacted conversation to ~{self.context_tokens} tokens")
+    
+    def reduce_context(self, agent: Any, e: Optional[Exception] = None, **kwargs: Any) -> None:
+        """Drop the oldest turn when the model reports a context overflow"""
+        if not self._drop_oldest_turn(agent.messages):
+            raise e or ContextWindowOverflowException("Unable to trim conversation context!")
+        self.context_tokens = self.estimate_tokens(agent.messages)
+    
+    def estimate_tokens(self, messages: List[Dict[str, Any]]) -> int:
+        """Approximate token count of the message history"""
+        return len(json.dumps(messages, ensure_ascii=False, default=str)) // CHARS_PER_TOKEN
+    
+    def _turn_starts(self, messages: List[Dict[str, Any]]) -> List[int]:
+        """Indexes of user messages that open a turn (text, not tool results)"""
+        return [
+            index for index, message in enumerate(messages)
+            if message.get("role") == "user"
+            and any("text" in block for block in message.get("content", []))
+            and not any("toolResult" in block for block in message.get("content", []))
+        ]
+    
+    def _compact_tool_results(self, messages: List[Dict[str, Any]]) -> None:
+        """Truncate tool result payloads in place"""
+        for message in messages:
+            for block in message.get("content", []):
+                tool_result = block.get("toolResult")
+                if not tool_result or tool_result.get("toolUseId") in self._compacted_results:
+                    continue
+                text = json.dumps(tool_result.get("content", []), ensure_ascii=False, default=str)
+                if len(text) > self.tool_result_chars:
+                    tool_result["content"] = [{"text": text[:self.tool_result_chars] + " ...(truncated)"}]
+                self._compacted_results.add(tool_result.get("toolUseId"))
+    
+    def _drop_oldest_turn(self, messages: List[Dict[str, Any]]) -> bool:
+        """Fold the oldest complete turn into the summary; False if only one turn is left"""
+        self._strip_summary(messages)
+        turn_starts = self._turn_starts(messages)
+        if len(turn_starts) < 2:
+            self._attach_summary(messages)
+            return False
+        
+        end = turn_starts[1]
+        self._extend_summary(messages[:end])
+        for message in messages[:end]:
+            for block in message.get("content", []):
+                if "toolResult" in block:
+                    self._compacted_results.discard(block["toolResult"].get("toolUseId"))
+        del messages[:end]
+        self.removed_message_count += end
+        self._attach_summary(messages)
+        return True
+    
+    def _extend_summary(self, removed: List[Dict[str, Any]]) -> None:
+        """Append a short extract of removed messages, keeping the most recent summary_chars"""
+        lines = []
+        for message in removed:
+            speaker = "사용자" if message.get("role") == "user" else "어시스턴트"
+            for block in message.get("content", []):
+                if "text" in block:
+                    lines.append(f"{speaker}: {block['text'][:200]}")
+                elif "toolUse" in block:
+                    tool_use = block["toolUse"]
+                    arguments = json.dumps(tool_use.get("input", {}), ensure_ascii=False)[:100]
+                    lines.append(f"도구 호출 {tool_use.get('name')}({arguments})")
+        self.summary = "\n".join(filter(None, [self.summary, *lines]))[-self.summary_chars:]
+    
+    def _strip_summary(self, messages: List[Dict[str, Any]]) -> None:
+        if messages:
+            content = messages[0].get("content", [])
+            messages[0]["content"] = [
+                block for block in content if not str(block.get("text", "")).startswith(SUMMARY_PREFIX)
+            ]
+    
+    def _attach_summary(self, messages: List[Dict[str, Any]]) -> None:
+        if messages and self.summary:
+            messages[0]["content"].insert(0, {"text": f"{SUMMARY_PREFIX}\n{self.summary}"})
@@ -0,0 +1,16 @@
+from strands.experimental.hooks import BeforeModelInvocationEvent, BeforeToolInvocationEvent
+from strands.hooks.registry import HookProvider, HookRegistry
+from utils.deadline import current_deadline
+
+
+class DeadlineHook(HookProvider):
+    """Stops the agent loop before a model turn or tool call once the request deadline passed"""
+    
+    def check_deadline(self, event):
+        deadline = current_deadline.get()
+        if deadline is not None:
+            deadline.check()
+    
+    def register_hooks(self, registry: HookRegistry):
+        registry.add_callback(BeforeModelInvocationEvent, self.check_deadline)
+        registry.add_callback(BeforeToolInvocationEvent, self.check_deadline)
@@ -0,0 +1,215 @@
+import asyncio
+import json
+import logging
+import re
+import time
+import unicodedata
+import uuid
+from typing import Any, AsyncGenerator, Dict, Optional
+from strands.tools.mcp import MCPAgentTool
+from tools.robot_tools import get_robot_feedback
+from utils.metrics import MetricsRegistry, current_request, metrics
+
+
+# Korean command synonyms of the mcp-interface command_robot Lambda. Only these
+# exact phrases skip the agent; bare action names such as "hello" or "stand"
+# are ordinary chat and go through the model
+DIRECT_COMMANDS: Dict[str, str] = {
+    "탐지": "detected",
+    "행복해": "heart",
+    "반가워": "heart",
+    "피곤해": "stretch",
+    "춤춰봐": "dance1",
+    "앉아": "sit",
+    "일어서": "stand",
+}
+
+# Voice message sent with each action (30 characters or less)
+ACTION_MESSAGES: Dict[str, str] = {
+    "sit": "앉을게요!",
+    "stand": "일어설게요!",
+    "heart": "하트를 보낼게요!",
+    "stretch": "기지개를 켤게요!",
+    "dance1": "춤을 춰볼게요!",
+    "dance2": "춤을 춰볼게요!",
+    "hello": "안녕하세요!",
+    "stop_move": "멈출게요.",
+    "detected": "탐지를 시작할게요.",
+}
+
+# Polite or request endings stripped before lookup, longest first
+REQUEST_SUFFIXES = ("해주세요", "주세요", "해줘", "줘", "요")
+
+PUNCTUATION = re.compile(r"[\s\.\,\!\?~…·'\"]+")
+
+
+def normalize_command(text: str) -> str:
+    """Normalize a short Korean/English command for lookup"""
+    normalized = PUNCTUATION.sub("", unicodedata.normalize("NFC", text or "")).lower()
+    for suffix in REQUEST_SUFFIXES:
+        if normalized.endswith(suffix) and len(normalized) > len(suffix):
+            stripped = normalized[:-len(suffix)]
+            if stripped in DIRECT_COMMANDS:
+                return stripped
+    return normalized
+
+
+def command_failed(result: Dict[str, Any]) -> bool:
+    """Whether a command tool result means the robot did not get the command
+    
+    The command Lambdas report an IoT publish failure inside a successful MCP
+    result, as {"statusCode": 200, "body": false} or a non-2xx statusCode.
+    """
+    if result.get("status") == "error":
+        return True
+    responses = [result.get("structuredContent")]
+    for content in result.get("content") or []:
+        try:
+            responses.append(json.loads(content.get("text", "")))
+        except (AttributeError, TypeError, ValueError):
+            continue
+    for response in responses:
+        if not isinstance(response, dict):
+            continue
+        status_code = response.get("statusCode")
+        if response.get("body") is False or (isinstance(status_code, int) and not 200 <= status_code < 300):
+            return True
+    return False
+
+
+class IntentRouter:
+    """Dispatches unambiguous direct robot commands without a model round trip"""
+    
+    def __init__(self, agent_manager, registry: MetricsRegistry = metrics, max_length: int = 20):
+        self.agent_manager = agent_manager
+        self.registry = registry
+        self.max_length = max_length
+        self.logger = logging.getLogger(__name__)
+        self.hits = 0
+        self.misses = 0
+        self.saved_ms = 0.0
+    
+    def match(self, user_message: str) -> Optional[str]:
+        """Return the robot action for a direct command, or None to use the agent"""
+        if not user_message or len(user_message) > self.max_length:
+            self.misses += 1
+            return None
+        
+        command = normalize_command(user_message)
+        action = DIRECT_COMMANDS.get(command)
+        if action is None or self._command_tool() is None:
+            self.misses += 1
+            return None
+        
+        self.hits += 1
+        return action
+    
+    async def dispatch(self, action: str, user_message: str, agent: Any = None) -> AsyncGenerator[Dict[str, Any], None]:
+        """Run the command tool and feedback check, streaming the usual runtime events"""
+        started = time.perf_counter()
+        tool = self._command_tool()
+        arguments = {"action": action}
+        if action in ACTION_MESSAGES:
+            arguments["message"] = ACTION_MESSAGES[action]
+        
+        tool_id = f"router-{uuid.uuid4().hex[:12]}"
+        yield {
+            "type": "tool_use",
+            "tool_name": tool.tool_name,
+            "tool_input": arguments,
+            "tool_id": tool_id
+        }
+        # Routed calls bypass the agent's MetricsHook, so they are timed here
+        call_started = time.perf_counter()
+        try:
+            result = await tool.mcp_client.call_tool_async(
+                tool_use_id=tool_id,
+                name=tool.tool_name,
+                arguments=arguments
+            )
+        except Exception:
+            self._record_tool_call(tool.tool_name, "mcp", call_started, error=True)
+            raise
+        failed = command_failed(result)
+        self._record_tool_call(tool.tool_name, "mcp", call_started, error=failed)
+        
+        if failed:
+            reply = f"'{user_message}' 명령을 로봇에게 전달하지 못했어요. 잠시 후 다시 시도해주세요."
+        else:
+            feedback_id = f"router-{uuid.uuid4().hex[:12]}"
+            yield {
+                "type": "tool_use",
+                "tool_name": "get_robot_feedback",
+                "tool_input": {},
+                "tool_id": feedback_id
+            }
+            call_started = time.perf_counter()
+            try:
+                feedback = await asyncio.to_thread(get_robot_feedback)
+            except Exception:
+                self._record_tool_call("get_robot_feedback", "local", call_started, error=True)
+                raise
+            self._record_tool_call(
+                "get_robot_feedback", "local", call_started, error=isinstance(feedback, dict) and "error" in feedback
+            )
+            reply = self._build_reply(user_message, action, feedback)
+        
+        yield {
+            "type": "chunk",
+            "data": reply,
+        }
+        yield {
+            "type": "complete",
+            "final_response": reply
+        }
+        
+        self._remember_turn(agent, user_message, reply)
+        self._record_latency(time.perf_counter() - started)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Router hit rate and estimated latency saved versus the agent path"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "latency_saved_ms": round(self.saved_ms, 1),
+        }
+    
+    def _record_tool_call(self, name: str, kind: str, started: float, error: bool = False) -> None:
+        """Record a routed tool call in the current request's metrics"""
+        request = current_request.get()
+        if request is not None:
+            request.record_tool_call(name, kind, time.perf_counter() - started, error=error)
+    
+    def _command_tool(self) -> Optional[MCPAgentTool]:
+        """Find the gateway command tool (exposed as "<target>___command")"""
+        for tool in self.agent_manager.tools:
+            if isinstance(tool, MCPAgentTool) and (tool.tool_name == "command" or tool.tool_name.endswith("___command")):
+                return tool
+        return None
+    
+    def _build_reply(self, user_message: str, action: str, feedback: Dict[str, Any]) -> str:
+        """Summarize the command and the feedback check for the user"""
+        reply = f"'{user_message}' 명령에 따라 로봇이 {action} 동작을 수행하도록 지시했어요."
+        if not isinstance(feedback, dict) or "error" in feedback:
+            return reply + " 아직 로봇의 피드백은 확인하지 못했어요."
+        if feedback.get("status") == "success":
+            return reply + f" 로봇 피드백 {feedback.get('message_count', 0)}건을 확인했어요."
+        return reply + " 아직 새로운 로봇 피드백은 없어요."
+    
+    def _remember_turn(self, agent: Any, user_message: str, reply: str) -> None:
+        """Keep the session agent's history aware of the routed exchange"""
+        if agent is None:
+            return
+        if agent.messages and agent.messages[-1].get("role") != "assistant":
+            return
+        agent.messages.append({"role": "user", "content": [{"text": user_message}]})
+        agent.messages.append({"role": "assistant", "content": [{"text": reply}]})
+    
+    def _record_latency(self, seconds: float) -> None:
+        """Record router latency and the estimated saving against the agent path median"""
+        self.registry.observe("router.direct", seconds)
+        baseline_ms = self.registry.histogram("request.stream").percentile(50)
+        if baseline_ms is not None:
+            self.saved_ms += max(0.0, baseline_ms - seconds * 1000)
@@ -1,9 +1,21 @@
 import os
-import requests
+import threading
+import time
 import logging
+import httpx
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from mcp.types import Tool as MCPTool
+from strands.tools.mcp import MCPAgentTool
 from auth import access_token
-from typing import Optional, Tuple, Any, Dict
+from typing import Optional, Tuple, Any, Dict, List
 from config.config import Config
+from core.mcp_session_pool import MCPSessionPool, PooledSession
+from core.tool_catalog import ToolCatalogCache
+from utils.circuit_breaker import CircuitOpenError, circuit_breakers, http_probe
+
+
+# How often a replaced session is checked for calls still running on it
+CLOSE_POLL_SECONDS = 0.5
 
 
 class MCPServerManager:
@@ -12,30 +24,51 @@ class MCPServerManager:
     def __init__(self, config: Config):
         self.config = config
         self.logger = logging.getLogger(__name__)
+        self.tool_catalog = ToolCatalogCache(config.tool_catalog_path, ttl=config.tool_catalog_ttl)
+        # While the gateway circuit is open, its base URL is probed in the background
+        circuit_breakers.get("gateway", probe=http_probe(lambda: self.config.mcp_server_url))
+        # Pool of MCP sessions serving tool calls, supervised by the monitor thread
+        self.session_pool: Optional[MCPSessionPool] = None
+        self.reconnects = 0
+        self.downtime_seconds = 0.0
+        self.last_reconnect_reason: Optional[str] = None
+        self._monitor_thread: Optional[threading.Thread] = None
+        self._monitor_stop = threading.Event()
+    
+    def _catalog_key(self) -> str:
+        """Tool catalog cache key for the configured gateway and target"""
+        return ToolCatalogCache.make_key(self.config.mcp_server_url, self.config.target_name)
     
     def _get_auth_headers(self) -> Dict[str, str]:
         """Get authentication headers for MCP requests"""
-        jwt_token = self.config.bearer_token
+        # Served from the shared token cache; expired tokens are refreshed once for all callers
+        jwt_token = access_token.token_cache.get()
         
         if not jwt_token:
-            self.logger.info("No bearer token available, trying to get one...")
+            self.logger.info("No cached bearer token, trying to get one...")
             try:
                 jwt_token = access_token.get_gateway_access_token_with_retry(
                     max_retries=self.config.max_retries
                 )
                 self.logger.info("Token obtained successfully")
-                # Update config and environment
-                self.config.bearer_token = jwt_token
-                os.environ["BEARER_TOKEN"] = jwt_token
             except Exception as e:
                 self.logger.error(f"Error getting token: {str(e)}", exc_info=True)
                 return {}
         
+        if jwt_token != self.config.bearer_token:
+            # Update config and environment
+            self.config.bearer_token = jwt_token
+            os.environ["BEARER_TOKEN"] = jwt_token
+        
         return {
             "Authorization": f"Bearer {jwt_token}",
             "Content-Type": "application/json"
         }
     
+    def prefetch_token(self) -> bool:
+        """Obtain the gateway bearer token ahead of the first request"""
+        return bool(self._get_auth_headers())
+    
     def _check_with_auth(self) -> bool:
         """Check MCP server with authentication"""
         headers = self._get_auth_headers()
@@ -50,7 +83,8 @@ class MCPServerManager:
         }
         
         try:
-            response = requests.post(
+            response = access_token.gateway_request(
+                "POST",
                 f"{self.config.mcp_server_url}/mcp",
                 headers=headers,
                 json=payload,
@@ -63,20 +97,21 @@ class MCPServerManager:
             else:
                 self.logger.error(f"MCP server response error: {response.status_code} - {response.text}")
                 return False
-        except requests.exceptions.RequestException as e:
+        except (httpx.HTTPError, CircuitOpenError) as e:
             self.logger.error(f"Request exception when checking MCP server: {str(e)}")
             return False
     
     def _check_health_endpoint(self) -> bool:
         """Check MCP server health endpoint (for local testing)"""
         try:
-            response = requests.get(
+            response = access_token.gateway_request(
+                "GET",
                 f"{self.config.mcp_server_url}/health",
                 timeout=5
             )
             self.logger.info(f"Health endpoint response status: {response.status_code}")
             return response.status_code == 200
-        except requests.exceptions.RequestException as e:
+        except (httpx.HTTPError, CircuitOpenError) as e:
             self.logger.error(f"Health endpoint request exception: {str(e)}")
             return False
     
@@ -90,6 +125,12 @@ class MCPServerManager:
                 self.logger.error("MCP server URL is not configured")
                 return False
             
+            # A cached catalog means the gateway answered tools/list before;
+            # load_tools opens the session and fails there if it is down now
+            if self.tool_catalog.get(self._catalog_key()) is not None:
+                self.logger.info("Tool catalog cached, skipping tools/list probe")
+                return True
+            
             # Try with authentication first
             if self.config.bearer_token or self._get_auth_headers():
                 self.logger.info("Attempting to check MCP server with authentication")
@@ -115,24 +156,283 @@ class MCPServerManager:
             
             self.logger.info(f"Attempting to load tools from: {self.config.mcp_server_url}")
             
-            tools, mcp_client = access_token.load_tools_from_mcp_with_retry(
-                self.config.mcp_server_url,
-                max_retries=self.config.max_retries
-            )
+            key = self._catalog_key()
+            cached = self.tool_catalog.get(key)
             
-            if not tools or not mcp_client:
-                self.logger.error("Failed to load tools from MCP server")
-                return None, None
+            if cached is not None:
+                schemas, needs_revalidation = cached
+                self.logger.info(f"Building {len(schemas)} tools from cached catalog")
+                _, mcp_client = access_token.load_tools_from_mcp_with_retry(
+                    self.config.mcp_server_url,
+                    max_retries=self.config.max_retries,
+                    list_tools=False
+                )
+                if not mcp_client:
+                    self.logger.error("Failed to open MCP session")
+                    return None, None
+                
+                pool = self._open_pool(mcp_client)
+                tools = [MCPAgentTool(MCPTool.model_validate(schema), pool) for schema in schemas]
+                if needs_revalidation:
+                    self._revalidate_catalog(key, mcp_client)
+            else:
+                tools, mcp_client = access_token.load_tools_from_mcp_with_retry(
+                    self.config.mcp_server_url,
+                    max_retries=self.config.max_retries
+                )
+                
+                if not tools or not mcp_client:
+                    self.logger.error("Failed to load tools from MCP server")
+                    return None, None
+                
+                self.tool_catalog.put(key, self._tool_schemas(tools))
+                pool = self._open_pool(mcp_client)
+                tools = [MCPAgentTool(tool.mcp_tool, pool) for tool in tools]
                 
             self.logger.info(f"Loaded {len(tools)} tools from MCP server")
             self._log_available_tools(tools)
             
-            return tools, mcp_client
+            return tools, pool
             
         except Exception as e:
             self.logger.error(f"Error loading tools from MCP server: {str(e)}", exc_info=True)
             return None, None
     
+    def _tool_schemas(self, tools: list) -> List[Dict[str, Any]]:
+        """Serialize MCP tool definitions for the catalog cache"""
+        return [
+            tool.mcp_tool.model_dump(mode="json", by_alias=True, exclude_none=True)
+            for tool in tools
+        ]
+    
+    def refresh_tools(self) -> Optional[List[MCPAgentTool]]:
+        """List the gateway's tools over the session pool and update the catalog; None before the pool is open or on an empty listing"""
+        pool = self.session_pool
+        if pool is None:
+            return None
+        listed = pool.list_tools_sync()
+        if not listed:
+            # Most likely a gateway briefly without targets; keep the tools agents have
+            self.logger.warning("Gateway listed no tools, keeping the current tool set")
+            return None
+        self.tool_catalog.put(self._catalog_key(), self._tool_schemas(listed))
+        return [MCPAgentTool(tool.mcp_tool, pool) for tool in listed]
+    
+    def catalog_digest(self, tools: list) -> str:
+        """Content hash of the MCP tool definitions"""
+        return ToolCatalogCache.digest(self._tool_schemas(tools))
+    
+    def _revalidate_catalog(self, key: str, mcp_client: Any) -> None:
+        """Refresh a stale or unverified catalog entry in the background"""
+        def revalidate():
+            try:
+                tools = mcp_client.list_tools_sync()
+                if self.tool_catalog.put(key, self._tool_schemas(tools)):
+                    self.logger.warning("Tool catalog changed on the gateway; it applies on the next tool reload")
+                else:
+                    self.logger.info("Tool catalog revalidated, no changes")
+            except Exception as e:
+                self.logger.error(f"Error revalidating tool catalog: {str(e)}", exc_info=True)
+        
+        threading.Thread(target=revalidate, name="tool-catalog-revalidate", daemon=True).start()
+    
+    def _open_session(self) -> Optional[Any]:
+        """Open one more authenticated MCP session without listing tools"""
+        # Pool and replacement sessions keep connect_stats on the primary handshake
+        _, mcp_client = access_token.load_tools_from_mcp_with_retry(
+            self.config.mcp_server_url,
+            max_retries=self.config.max_retries,
+            list_tools=False,
+            record_stats=False
+        )
+        return mcp_client
+    
+    def _open_pool(self, mcp_client: Any) -> MCPSessionPool:
+        """Pool mcp_client with mcp_session_pool_size - 1 further sessions opened in parallel"""
+        extra = max(0, self.config.mcp_session_pool_size - 1)
+        clients = [mcp_client]
+        if extra:
+            with ThreadPoolExecutor(max_workers=extra, thread_name_prefix="mcp-session-open") as executor:
+                opened = list(executor.map(lambda _: self._open_session(), range(extra)))
+            clients.extend(client for client in opened if client)
+            if len(clients) < extra + 1:
+                self.logger.warning(f"Opened {len(clients)} of {extra + 1} MCP sessions")
+        
+        pool = MCPSessionPool(clients)
+        token, expires_at = self._session_token()
+        for index in range(len(pool)):
+            session = pool.session(index)
+            session.token, session.expires_at = token, expires_at
+        previous, self.session_pool = self.session_pool, pool
+        if previous is not None:
+            # Left over from an earlier initialization attempt
+            self.close_pool(previous)
+        self.logger.info(f"MCP session pool ready with {len(pool)} sessions")
+        return pool
+    
+    def close_pool(self, pool: MCPSessionPool) -> None:
+        """Close every session of pool once its in-flight calls finish, and stop supervising it"""
+        if self.session_pool is pool:
+            self.session_pool = None
+        for index in range(len(pool)):
+            threading.Thread(
+                target=self._close_when_idle,
+                args=(pool, pool.session(index), self.config.request_deadline_seconds),
+                name=f"mcp-session-close-{index}",
+                daemon=True
+            ).start()
+    
+    def _session_token(self) -> Tuple[Optional[str], Optional[float]]:
+        """Token new sessions were opened with, and its expiry"""
+        token = access_token.token_cache.token
+        return token, access_token.decode_jwt_expiry(token or "")
+    
+    def start_monitor(self) -> None:
+        """Start supervising the MCP sessions unless the health interval is disabled"""
+        if self.config.mcp_health_interval <= 0 or self._monitor_thread is not None:
+            return
+        self._monitor_thread = threading.Thread(target=self._monitor, name="mcp-health", daemon=True)
+        self._monitor_thread.start()
+    
+    def stop_monitor(self) -> None:
+        """Stop the session monitor"""
+        self._monitor_stop.set()
+    
+    def session_stats(self) -> Dict[str, Any]:
+        """Per-session in-flight depth and health, reconnect count and accumulated downtime"""
+        stats: Dict[str, Any] = {
+            "reconnects": self.reconnects,
+            "downtime_seconds": round(self.downtime_seconds, 3),
+            "last_reconnect_reason": self.last_reconnect_reason,
+        }
+        pool = self.session_pool
+        if pool is not None:
+            stats.update(pool.stats())
+            stats["downtime_seconds"] = round(
+                self.downtime_seconds + sum(session["down_seconds"] or 0 for session in stats["sessions"]), 3
+            )
+            expiries = [pool.session(index).expires_at for index in range(len(pool))]
+            expiries = [expires_at for expires_at in expiries if expires_at]
+            stats["token_expires_in"] = round(min(expiries) - time.time(), 1) if expiries else None
+        return stats
+    
+    def _monitor(self) -> None:
+        """Probe each pooled session periodically and replace those that are dead or whose token is expiring"""
+        while not self._monitor_stop.wait(self.config.mcp_health_interval):
+            pool = self.session_pool
+            if pool is None:
+                continue
+            try:
+                # Keeps the shared token cache warm so a fresh token is ready before the sessions' expires
+                access_token.get_gateway_access_token()
+            except Exception as e:
+                self.logger.warning(f"Token refresh from MCP session monitor failed: {str(e)}")
+            
+            for index in range(len(pool)):
+                if self._monitor_stop.is_set():
+                    return
+                try:
+                    problem = self._session_problem(pool.session(index))
+                    if problem:
+                        self._reconnect(pool, index, problem)
+                except Exception as e:
+                    self.logger.error(f"MCP session monitor error: {str(e)}", exc_info=True)
+    
+    def _session_problem(self, session: PooledSession) -> Optional[str]:
+        """Reason a pooled session should be replaced, or None if it is healthy"""
+        if (session.expires_at is not None and
+                session.expires_at - time.time() <= self.config.mcp_session_refresh_margin):
+            return "session token expiring"
+        
+        probe = self._start_probe(session.client)
+        try:
+            probe.result(timeout=self.config.mcp_health_timeout)
+            return None
+        except FutureTimeoutError:
+            return f"health probe timed out after {self.config.mcp_health_timeout}s"
+        except Exception as e:
+            if access_token.is_auth_error(e) and session.token:
+                access_token.invalidate_token(session.token)
+                # Single-flight, so sessions rejected together share one renewal
+                try:
+                    access_token.refresh_cognito_token(stale_token=session.token)
+                except Exception as refresh_error:
+                    self.logger.warning(f"Token refresh after rejected health probe failed: {str(refresh_error)}")
+            return f"health probe failed: {str(e)}"
+    
+    def _start_probe(self, mcp_client: Any) -> Future:
+        """Run list_tools_sync on a thread of its own, so a hung probe never delays the next session's"""
+        probe: Future = Future()
+        
+        def run() -> None:
+            try:
+                probe.set_result(mcp_client.list_tools_sync())
+            except Exception as e:
+                probe.set_exception(e)
+        
+        threading.Thread(target=run, name="mcp-health-probe", daemon=True).start()
+        return probe
+    
+    def _reconnect(self, pool: MCPSessionPool, index: int, reason: str) -> None:
+        """Open a new session with a fresh token, swap it into the pool, then close the old one"""
+        # A session replaced only because its token is expiring is still up meanwhile
+        healthy = reason == "session token expiring"
+        self.logger.warning(f"Replacing MCP session {index}: {reason}")
+        self.last_reconnect_reason = reason
+        if not healthy:
+            pool.mark_down(index)
+        
+        attempt = 0
+        while not self._monitor_stop.is_set():
+            new_client = self._open_session()
+            if new_client:
+                break
+            delay = access_token.backoff_delay(attempt, cap=self.config.mcp_health_interval)
+            attempt += 1
+            self.logger.error(f"MCP session {index} reconnect failed, retrying in {delay:.1f}s")
+            if self._monitor_stop.wait(delay):
+                return
+        else:
+            return
+        
+        down_since = pool.session(index).down_since
+        old_session = pool.replace(index, new_client, *self._session_token())
+        self.reconnects += 1
+        if down_since is not None:
+            downtime = time.monotonic() - down_since
+            self.downtime_seconds += downtime
+            self.logger.info(f"MCP session {index} reconnected after {downtime:.1f}s of downtime")
+        else:
+            self.logger.info(f"MCP session {index} replaced without downtime")
+        
+        # Let calls still running on a healthy old session finish before closing it,
+        # but no longer than a request may take
+        grace = self.config.request_deadline_seconds if healthy else 0
+        threading.Thread(
+            target=self._close_when_idle,
+            args=(pool, old_session, grace),
+            name=f"mcp-session-close-{index}",
+            daemon=True
+        ).start()
+    
+    def _close_when_idle(self, pool: MCPSessionPool, session: PooledSession, timeout: float) -> None:
+        """Close a replaced session once its in-flight calls finish, or after timeout"""
+        give_up_at = time.monotonic() + timeout
+        while timeout > 0 and pool.in_flight(session) > 0:
+            if time.monotonic() >= give_up_at:
+                self.logger.warning(
+                    f"Closing replaced MCP session with {pool.in_flight(session)} calls still running after {timeout:.0f}s"
+                )
+                break
+            time.sleep(CLOSE_POLL_SECONDS)
+        self._close_session(session.client)
+    
+    def _close_session(self, mcp_client: Any) -> None:
+        try:
+            mcp_client.stop(None, None, None)
+        except Exception as e:
+            self.logger.warning(f"Error closing replaced MCP session: {str(e)}")
+    
     def _log_available_tools(self, tools: list):
         """Log information about available tools"""
         if not tools:
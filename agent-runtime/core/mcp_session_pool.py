@@ -0,0 +1,188 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any, Dict, Iterator, List, Optional
+from utils.circuit_breaker import CircuitBreaker, CircuitOpenError, circuit_breakers
+
+
+# Start of the error result MCPClient returns when the call itself raised (transport
+# or session failure), as opposed to an error reported by the tool
+CALL_FAILED_PREFIX = "Tool execution failed:"
+
+
+@dataclass
+class PooledSession:
+    """MCP client held by the pool together with its load and health"""
+    client: Any
+    token: Optional[str] = None
+    expires_at: Optional[float] = None
+    in_flight: int = 0
+    calls: int = 0
+    max_in_flight: int = 0
+    down_since: Optional[float] = None
+
+
+class MCPSessionPool:
+    """Spreads MCP tool calls over several authenticated gateway sessions
+    
+    Stands in for a single MCPClient wherever MCPAgentTool uses one, and sends
+    each call to the healthy session with the fewest calls in flight. Sessions
+    are replaced in place, so tools bound to the pool never need rebinding.
+    Tool calls and listings go through the gateway circuit breaker and fail fast while it is open.
+    """
+    
+    def __init__(self, clients: List[Any], breaker: Optional[CircuitBreaker] = None):
+        if not clients:
+            raise ValueError("MCPSessionPool needs at least one session")
+        self.breaker = breaker or circuit_breakers.get("gateway")
+        self.logger = logging.getLogger(__name__)
+        self._sessions = [PooledSession(client=client) for client in clients]
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self._sessions)
+    
+    def session(self, index: int) -> PooledSession:
+        """Pooled session at index"""
+        return self._sessions[index]
+    
+    async def call_tool_async(
+        self,
+        tool_use_id: str,
+        name: str,
+        arguments: Optional[Dict[str, Any]] = None,
+        read_timeout_seconds: Optional[timedelta] = None,
+        **kwargs: Any
+    ) -> Any:
+        """Call a tool on the least-loaded session; newer MCPClient options such as cancel_signal pass through"""
+        try:
+            self.breaker.check()
+        except CircuitOpenError as e:
+            return self._circuit_open_result(tool_use_id, e)
+        with self._checkout() as client:
+            try:
+                result = await client.call_tool_async(tool_use_id, name, arguments, read_timeout_seconds, **kwargs)
+            except Exception as e:
+                self.breaker.record_error(e)
+                raise
+        self._record_result(result)
+        return result
+    
+    def call_tool_sync(
+        self,
+        tool_use_id: str,
+        name: str,
+        arguments: Optional[Dict[str, Any]] = None,
+        read_timeout_seconds: Optional[timedelta] = None,
+        **kwargs: Any
+    ) -> Any:
+        """Call a tool on the least-loaded session, blocking"""
+        try:
+            self.breaker.check()
+        except CircuitOpenError as e:
+            return self._circuit_open_result(tool_use_id, e)
+        with self._checkout() as client:
+            try:
+                result = client.call_tool_sync(tool_use_id, name, arguments, read_timeout_seconds, **kwargs)
+            except Exception as e:
+                self.breaker.record_error(e)
+                raise
+        self._record_result(result)
+        return result
+    
+    def list_tools_sync(self, pagination_token: Optional[str] = None) -> Any:
+        """List tools through the least-loaded session; raises CircuitOpenError while the gateway circuit is open"""
+        self.breaker.check()
+        with self._checkout() as client:
+            try:
+                tools = client.list_tools_sync(pagination_token)
+            except Exception as e:
+                self.breaker.record_error(e)
+                raise
+        self.breaker.record_success()
+        return tools
+    
+    def mark_down(self, index: int) -> None:
+        """Stop dispatching to a session until it is replaced"""
+        with self._lock:
+            session = self._sessions[index]
+            if session.down_since is None:
+                session.down_since = time.monotonic()
+    
+    def replace(
+        self, index: int, client: Any, token: Optional[str] = None, expires_at: Optional[float] = None
+    ) -> PooledSession:
+        """Swap in a new client at index and return the old session; calls already running keep the old client"""
+        with self._lock:
+            old = self._sessions[index]
+            self._sessions[index] = PooledSession(client=client, token=token, expires_at=expires_at)
+        return old
+    
+    def in_flight(self, session: PooledSession) -> int:
+        """Calls still running on session, which may already have been replaced"""
+        with self._lock:
+            return session.in_flight
+    
+    def stop(self, exc_type: Any = None, exc_val: Any = None, exc_tb: Any = None) -> None:
+        """Close every session"""
+        for session in list(self._sessions):
+            try:
+                session.client.stop(exc_type, exc_val, exc_tb)
+            except Exception as e:
+                self.logger.warning(f"Error closing MCP session: {str(e)}")
+    
+    def stats(self) -> Dict[str, Any]:
+        """Per-session in-flight depth, call count and health"""
+        now = time.monotonic()
+        with self._lock:
+            sessions = [
+                {
+                    "in_flight": session.in_flight,
+                    "max_in_flight": session.max_in_flight,
+                    "calls": session.calls,
+                    "down_seconds": round(now - session.down_since, 1) if session.down_since is not None else None,
+                }
+                for session in self._sessions
+            ]
+        return {
+            "size": len(sessions),
+            "healthy": sum(1 for session in sessions if session["down_seconds"] is None),
+            "in_flight": sum(session["in_flight"] for session in sessions),
+            "sessions": sessions,
+        }
+    
+    def _record_result(self, result: Dict[str, Any]) -> None:
+        """Count a call that failed below the tool as a gateway outage, anything else as an answer"""
+        content = result.get("content") or [{}]
+        text = content[0].get("text", "") if isinstance(content[0], dict) else ""
+        if result.get("status") == "error" and text.startswith(CALL_FAILED_PREFIX):
+            self.breaker.record_failure(text)
+        else:
+            self.breaker.record_success()
+    
+    def _circuit_open_result(self, tool_use_id: str, error: CircuitOpenError) -> Dict[str, Any]:
+        """Error tool result returned instead of calling the gateway"""
+        return {
+            "status": "error",
+            "toolUseId": tool_use_id,
+            "content": [{"text": str(error)}],
+        }
+    
+    @contextmanager
+    def _checkout(self) -> Iterator[Any]:
+        """Reserve the least-loaded healthy session for one call"""
+        with self._lock:
+            # Sessions marked down are only used when none is healthy
+            candidates = [session for session in self._sessions if session.down_since is None] or self._sessions
+            session = min(candidates, key=lambda candidate: (candidate.in_flight, candidate.calls))
+            session.in_flight += 1
+            session.calls += 1
+            session.max_in_flight = max(session.max_in_flight, session.in_flight)
+        try:
+            yield session.client
+        finally:
+            with self._lock:
+                session.in_flight -= 1
@@ -0,0 +1,48 @@
+from strands.experimental.hooks import (
+    AfterModelInvocationEvent,
+    AfterToolInvocationEvent,
+    BeforeModelInvocationEvent,
+    BeforeToolInvocationEvent,
+)
+from strands.hooks.registry import HookProvider, HookRegistry
+from strands.tools.mcp import MCPAgentTool
+from utils.metrics import current_request
+
+
+class MetricsHook(HookProvider):
+    """Records model turn and tool call durations into the current request's metrics"""
+    
+    def on_before_model(self, event: BeforeModelInvocationEvent):
+        request = current_request.get()
+        if request is not None:
+            request.start_span("model")
+    
+    def on_after_model(self, event: AfterModelInvocationEvent):
+        request = current_request.get()
+        if request is None:
+            return
+        duration = request.end_span("model")
+        if duration is not None:
+            request.record_model_turn(duration)
+    
+    def on_before_tool(self, event: BeforeToolInvocationEvent):
+        request = current_request.get()
+        if request is not None:
+            request.start_span(f"tool:{event.tool_use['toolUseId']}")
+    
+    def on_after_tool(self, event: AfterToolInvocationEvent):
+        request = current_request.get()
+        if request is None:
+            return
+        duration = request.end_span(f"tool:{event.tool_use['toolUseId']}")
+        if duration is None:
+            return
+        kind = "mcp" if isinstance(event.selected_tool, MCPAgentTool) else "local"
+        error = event.exception is not None or event.result.get("status") == "error"
+        request.record_tool_call(event.tool_use["name"], kind, duration, error=error)
+    
+    def register_hooks(self, registry: HookRegistry):
+        registry.add_callback(BeforeModelInvocationEvent, self.on_before_model)
+        registry.add_callback(AfterModelInvocationEvent, self.on_after_model)
+        registry.add_callback(BeforeToolInvocationEvent, self.on_before_tool)
+        registry.add_callback(AfterToolInvocationEvent, self.on_after_tool)
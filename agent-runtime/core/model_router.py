@@ -0,0 +1,105 @@
+import logging
+from typing import Any, Dict, List, Optional
+from strands.models import BedrockModel
+from utils.metrics import MetricsRegistry, metrics
+
+
+ROUTE_FAST = "fast"
+ROUTE_STRONG = "strong"
+
+# Wording of situation-based requests in ORCHESTRATOR_PROMPT ("주변을 살펴봐", "모니터링해", ...)
+SITUATION_KEYWORDS = (
+    "살펴", "둘러", "모니터링", "순찰", "상황", "확인", "감지", "탐지", "주변", "분석", "위험", "점검", "이상",
+)
+
+
+class ModelRouter:
+    """Chooses a Bedrock model per request from a cheap classifier and observed p95 latency"""
+    
+    def __init__(
+        self,
+        routes: Dict[str, BedrockModel],
+        registry: MetricsRegistry = metrics,
+        short_prompt_chars: int = 30,
+        latency_budget_ms: float = 0
+    ):
+        self.routes = routes
+        self.registry = registry
+        self.short_prompt_chars = short_prompt_chars
+        # When the preferred route's p95 exceeds this budget, a faster route is used instead
+        self.latency_budget_ms = latency_budget_ms
+        self.logger = logging.getLogger(__name__)
+        self.selections: Dict[str, int] = dict.fromkeys(routes, 0)
+        self.fallbacks = 0
+        # Every probe_interval-th over-budget request still uses its preferred
+        # route so that route's latency window keeps getting fresh samples
+        self.probe_interval = 10
+        # Consecutive over-budget selections per route, reset by any in-budget sample
+        self._over_budget_streaks: Dict[str, int] = dict.fromkeys(routes, 0)
+    
+    def classify(self, prompt: str) -> str:
+        """Situation-based or long requests go to the strong model, short direct control to the fast one"""
+        text = prompt or ""
+        if any(keyword in text for keyword in SITUATION_KEYWORDS):
+            return ROUTE_STRONG
+        if len(text) <= self.short_prompt_chars:
+            return ROUTE_FAST
+        return ROUTE_STRONG
+    
+    def select(self, prompt: str) -> str:
+        """Pick a route name for the prompt"""
+        route = self.classify(prompt)
+        
+        if self.latency_budget_ms > 0:
+            p95 = self._p95(route)
+            over_budget = p95 is not None and p95 > self.latency_budget_ms
+            if over_budget:
+                self._over_budget_streaks[route] += 1
+            else:
+                self._over_budget_streaks[route] = 0
+            if over_budget and self._over_budget_streaks[route] % self.probe_interval:
+                alternatives = [
+                    (alt_p95, name) for name in self.routes
+                    if name != route and (alt_p95 := self._p95(name)) is not None and alt_p95 < p95
+                ]
+                if alternatives:
+                    _, faster = min(alternatives)
+                    self.logger.info(f"Route {route} p95 {p95:.0f}ms over budget, using {faster}")
+                    self.fallbacks += 1
+                    route = faster
+        
+        self.selections[route] += 1
+        return route
+    
+    def record(self, route: str, model_turns: List[float], stream_seconds: float, usage: Dict[str, Any]) -> None:
+        """Record a request's model turn durations, end-to-end stream time and token usage against its route
+        
+        Only model turns feed the route's p95: tool calls inside the stream are
+        equally slow on every route, so switching models cannot shorten them.
+        """
+        for seconds in model_turns:
+            self.registry.observe(f"model_route.{route}", seconds)
+            if route in self._over_budget_streaks and seconds * 1000 <= self.latency_budget_ms:
+                self._over_budget_streaks[route] = 0
+        self.registry.observe(f"model_route.{route}.stream", stream_seconds)
+        for key, value in usage.items():
+            self.registry.increment(f"model_route.{route}.{key}", value)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Per-route selections, model turn latency and end-to-end stream latency percentiles"""
+        return {
+            "fallbacks": self.fallbacks,
+            "routes": {
+                name: {
+                    "model_id": model.get_config().get("model_id"),
+                    "selections": self.selections[name],
+                    "p50_ms": self.registry.histogram(f"model_route.{name}").percentile(50),
+                    "p95_ms": self._p95(name),
+                    "stream_p95_ms": self.registry.histogram(f"model_route.{name}.stream").percentile(95),
+                }
+                for name, model in self.routes.items()
+            },
+        }
+    
+    def _p95(self, route: str) -> Optional[float]:
+        return self.registry.histogram(f"model_route.{route}").percentile(95)
@@ -1,63 +1,176 @@
+import asyncio
 import logging
-from typing import AsyncGenerator, Dict, Any
+from typing import AsyncGenerator, Dict, Any, List, Optional
+from utils.deadline import find_deadline_exceeded
+
+
+# Marks the end of the agent stream on the coalescing queue
+STREAM_END = object()
 
 
 class StreamProcessor:
     """Handles streaming response processing"""
     
-    def __init__(self, logger: logging.Logger):
+    def __init__(self, logger: logging.Logger, coalesce_bytes: int = 0, coalesce_ms: float = 0):
         self.logger = logger
+        # Text deltas are buffered until either threshold is reached; 0 disables it
+        self.coalesce_bytes = coalesce_bytes
+        self.coalesce_ms = coalesce_ms
     
     async def process_stream(self, stream, user_message: str) -> AsyncGenerator[Dict[str, Any], None]:
         """Process streaming events from the agent"""
         try:
             self.logger.info("Processing message with Strands Agent (streaming)...")
             
+            if self.coalesce_bytes > 0 or self.coalesce_ms > 0:
+                async for output in self._coalesce(stream):
+                    yield output
+                return
+            
             async for event in stream:
-                self.logger.debug(f"Streaming event: {event}")
+                output = self._convert_event(event)
+                if output is not None:
+                    yield output
+        
+        except Exception as e:
+            # The agent loop wraps errors raised in hooks (EventLoopException), so look through the chain
+            exceeded = find_deadline_exceeded(e)
+            if exceeded is not None:
+                self.logger.warning(f"Stopped streaming: {str(exceeded)}")
+                yield {"type": "deadline_exceeded", "error": str(exceeded)}
+            else:
+                self.logger.error(f"Error in streaming mode: {str(e)}", exc_info=True)
+                yield {"error": f"Error processing request with agent: {str(e)}"}
+    
+    async def _coalesce(self, stream) -> AsyncGenerator[Dict[str, Any], None]:
+        """Merge consecutive text chunks, flushing by size, elapsed time or boundary events"""
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        # The agent keeps tracing spans attached across yields, so its stream must
+        # be iterated by one task only; the deadline below only waits on the queue
+        producer = asyncio.create_task(self._produce(stream, queue))
+        buffer: List[str] = []
+        buffered_bytes = 0
+        first_chunk_at = 0.0
+        
+        try:
+            while True:
+                if buffer and self.coalesce_ms > 0:
+                    remaining = max(0.0, first_chunk_at + self.coalesce_ms / 1000 - loop.time())
+                    try:
+                        item = await asyncio.wait_for(queue.get(), remaining)
+                    except TimeoutError:
+                        # Time threshold reached while the model is still producing
+                        yield self._chunk(buffer)
+                        buffer, buffered_bytes = [], 0
+                        continue
+                else:
+                    item = await queue.get()
                 
-                # Process different event types
-                if "data" in event:
-                    # Text chunk from the model
-                    chunk = event["data"]
-                    yield {
-                        "type": "chunk",
-                        "data": chunk,
-                    }
-                elif "current_tool_use" in event:
-                    # Tool use information
-                    tool_info = event["current_tool_use"]
-                    yield {
-                        "type": "tool_use",
-                        "tool_name": tool_info.get("name", "Unknown tool"),
-                        "tool_input": tool_info.get("input", {}),
-                        "tool_id": tool_info.get("toolUseId", "")
-                    }
-                elif "reasoning" in event and event["reasoning"]:
-                    # Reasoning information
-                    yield {
-                        "type": "reasoning",
-                        "reasoning_text": event.get("reasoningText", "")
-                    }
-                elif "result" in event:
-                    # Final result
-                    result = event["result"]
-                    final_response = self._extract_final_response(result)
-                    
-                    yield {
-                        "type": "complete",
-                        "final_response": final_response
-                    }
-                elif "event" in event and "metadata" in event["event"]:
-                    metadata = event["event"]["metadata"]
-                    yield {
-                        "type": "metadata",
-                        "metadata": metadata
-                    }
+                if item is STREAM_END:
+                    break
+                if isinstance(item, Exception):
+                    # Deliver text produced before the failure, then surface it
+                    if buffer:
+                        yield self._chunk(buffer)
+                    raise item
+                
+                output = self._convert_event(item)
+                if output is None:
+                    continue
+                
+                if output["type"] == "chunk":
+                    if not buffer:
+                        first_chunk_at = loop.time()
+                    buffer.append(output["data"])
+                    buffered_bytes += len(output["data"].encode("utf-8"))
                     
+                    if ((self.coalesce_bytes > 0 and buffered_bytes >= self.coalesce_bytes) or
+                            (self.coalesce_ms > 0 and loop.time() - first_chunk_at >= self.coalesce_ms / 1000)):
+                        yield self._chunk(buffer)
+                        buffer, buffered_bytes = [], 0
+                    continue
+                
+                # Boundary event: flush buffered text first to keep ordering
+                if buffer:
+                    yield self._chunk(buffer)
+                    buffer, buffered_bytes = [], 0
+                yield output
+            
+            if buffer:
+                yield self._chunk(buffer)
+        finally:
+            if not producer.done():
+                producer.cancel()
+    
+    async def _produce(self, stream, queue: asyncio.Queue) -> None:
+        """Feed every agent event into queue, then the error it failed with or STREAM_END"""
+        try:
+            async for event in stream:
+                queue.put_nowait(event)
         except Exception as e:
-            self.logger.error(f"Error in streaming mode: {str(e)}", exc_info=True)
-            yield {"error": f"Error processing request with agent: {str(e)}"}
+            queue.put_nowait(e)
+        else:
+            queue.put_nowait(STREAM_END)
+    
+    def _chunk(self, parts: List[str]) -> Dict[str, Any]:
+        """Build a chunk event from buffered text deltas"""
+        return {
+            "type": "chunk",
+            "data": "".join(parts),
+        }
+    
+    def _convert_event(self, event: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Convert an agent stream event into a runtime event, or None to skip it"""
+        if self.logger.isEnabledFor(logging.DEBUG):
+            # Formatting the whole event is expensive; skip it unless DEBUG is on
+            self.logger.debug(f"Streaming event: {event}")
+        
+        # Process different event types
+        if "data" in event:
+            # Text chunk from the model
+            chunk = event["data"]
+            return {
+                "type": "chunk",
+                "data": chunk,
+            }
+        elif "current_tool_use" in event:
+            # Tool use information
+            tool_info = event["current_tool_use"]
+            return {
+                "type": "tool_use",
+                "tool_name": tool_info.get("name", "Unknown tool"),
+                "tool_input": tool_info.get("input", {}),
+                "tool_id": tool_info.get("toolUseId", "")
+            }
+        elif "reasoning" in event and event["reasoning"]:
+            # Reasoning information
+            return {
+                "type": "reasoning",
+                "reasoning_text": event.get("reasoningText", "")
+            }
+        elif "result" in event:
+            # Final result
+            result = event["result"]
+            final_response = self._extract_final_response(result)
+            
+            return {
+                "type": "complete",
+                "final_response": final_response
+            }
+        elif "event" in event and "metadata" in event["event"]:
+            metadata = event["event"]["metadata"]
+            usage = metadata.get("usage", {})
+            return {
+                "type": "metadata",
+                "metadata": metadata,
+                # Prompt-cache effectiveness for this model turn
+                "cache": {
+                    "read_input_tokens": usage.get("cacheReadInputTokens", 0),
+                    "write_input_tokens": usage.get("cacheWriteInputTokens", 0)
+                }
+            }
+        return None
     
     def _extract_final_response(self, result) -> str:
         """Extract final response text from result object"""
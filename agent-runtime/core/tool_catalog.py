@@ -0,0 +1,135 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class ToolCatalogCache:
+    """In-memory MCP tool schema cache with TTL and an on-disk snapshot
+
+    Entries are keyed by gateway URL and target so that a restarted container
+    can build its agent from the snapshot before the gateway has been queried.
+    """
+
+    def __init__(self, snapshot_path: str, ttl: float = 3600.0):
+        self.snapshot_path = snapshot_path
+        self.ttl = ttl
+        self.logger = logging.getLogger(__name__)
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.revalidations = 0
+        self.changes = 0
+        self._load_snapshot()
+
+    @staticmethod
+    def make_key(gateway_url: str, target: Optional[str]) -> str:
+        """Cache key for a gateway URL and target"""
+        return f"{gateway_url.rstrip('/')}#{target or ''}"
+
+    @staticmethod
+    def digest(schemas: List[Dict[str, Any]]) -> str:
+        """Content hash of a tool catalog, independent of key order"""
+        return hashlib.sha256(json.dumps(schemas, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple[List[Dict[str, Any]], bool]]:
+        """Return (schemas, needs_revalidation) for key, or None on a miss
+
+        Entries past their TTL, or loaded from the snapshot and not yet
+        confirmed against the gateway, are served but flagged for revalidation.
+        An empty catalog is never served.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or not entry["tools"]:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            stale = time.time() - entry["fetched_at"] > self.ttl
+            if stale:
+                self.stale_hits += 1
+            return entry["tools"], stale or not entry["verified"]
+
+    def put(self, key: str, schemas: List[Dict[str, Any]]) -> bool:
+        """Store freshly listed schemas and snapshot them; returns True if the catalog changed
+
+        An empty listing is ignored, so a gateway briefly without targets
+        never leaves restarts with no tools to build.
+        """
+        if not schemas:
+            self.logger.warning(f"Not caching empty tool catalog for {key}")
+            return False
+        with self._lock:
+            previous = self._entries.get(key)
+            changed = previous is None or previous["tools"] != schemas
+            if previous is not None:
+                self.revalidations += 1
+                if changed:
+                    self.changes += 1
+            self._entries[key] = {
+                "tools": schemas,
+                "fetched_at": time.time(),
+                "verified": True,
+            }
+            snapshot = {
+                cache_key: {"tools": entry["tools"], "fetched_at": entry["fetched_at"]}
+                for cache_key, entry in self._entries.items()
+            }
+
+        self._write_snapshot(snapshot)
+        return changed
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss, staleness and revalidation counters"""
+        with self._lock:
+            now = time.time()
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "stale_hits": self.stale_hits,
+                "revalidations": self.revalidations,
+                "changes": self.changes,
+                "age_seconds": {
+                    key: round(now - entry["fetched_at"], 1) for key, entry in self._entries.items()
+                },
+            }
+
+    def _load_snapshot(self) -> None:
+        """Load the on-disk snapshot; its entries are unverified until revalidated"""
+        try:
+            with open(self.snapshot_path, 'r') as f:
+                snapshot = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, json.JSONDecodeError) as e:
+            self.logger.warning(f"Ignoring unreadable tool catalog snapshot {self.snapshot_path}: {e}")
+            return
+
+        for key, entry in snapshot.items():
+            if not entry.get("tools"):
+                continue
+            self._entries[key] = {
+                "tools": entry.get("tools", []),
+                "fetched_at": entry.get("fetched_at", 0.0),
+                "verified": False,
+            }
+        self.logger.info(f"Loaded tool catalog snapshot with {len(self._entries)} entries")
+
+    def _write_snapshot(self, snapshot: Dict[str, Any]) -> None:
+        """Atomically replace the on-disk snapshot"""
+        tmp_path = f"{self.snapshot_path}.tmp"
+        with self._write_lock:
+            try:
+                with open(tmp_path, 'w') as f:
+                    json.dump(snapshot, f, ensure_ascii=False)
+                os.replace(tmp_path, self.snapshot_path)
+            except OSError as e:
+                self.logger.warning(f"Could not write tool catalog snapshot {self.snapshot_path}: {e}")
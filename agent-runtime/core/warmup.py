@@ -0,0 +1,76 @@
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+from config.config import Config
+from core.agent_manager import AgentManager
+from core.mcp_manager import MCPServerManager
+
+
+WARMUP_IDLE = "idle"
+WARMUP_RUNNING = "running"
+WARMUP_READY = "ready"
+WARMUP_FAILED = "failed"
+
+
+class WarmupManager:
+    """Warms up the gateway token, MCP session, tools and agent template at process start"""
+
+    def __init__(self, config: Config, mcp_manager: MCPServerManager, agent_manager: AgentManager):
+        self.config = config
+        self.mcp_manager = mcp_manager
+        self.agent_manager = agent_manager
+        self.logger = logging.getLogger(__name__)
+        self.state = WARMUP_IDLE
+        self.timings: Dict[str, float] = {}
+        self.error: Optional[str] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start the warm-up on a background thread"""
+        if self._thread is not None:
+            return
+        self.state = WARMUP_RUNNING
+        self._thread = threading.Thread(target=self._run, name="agent-warmup", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        """Run each warm-up phase and record its duration"""
+        started = time.perf_counter()
+        try:
+            self.logger.info("Starting background warm-up...")
+
+            phase_start = time.perf_counter()
+            if not self.mcp_manager.prefetch_token():
+                self.logger.warning("Warm-up could not prefetch the gateway token")
+            self.timings["token"] = time.perf_counter() - phase_start
+
+            # Share the single-flight init so early requests wait on the same work
+            ready = self.agent_manager.start_initialization(debug=False).result()
+            self.timings.update(self.agent_manager.init_timings)
+
+            if ready:
+                self.state = WARMUP_READY
+            else:
+                self.state = WARMUP_FAILED
+                self.error = self.agent_manager.init_state.last_error
+        except Exception as e:
+            self.logger.error(f"Error during warm-up: {str(e)}", exc_info=True)
+            self.state = WARMUP_FAILED
+            self.error = str(e)
+        finally:
+            self.timings["total"] = time.perf_counter() - started
+            phases = ", ".join(f"{name}={seconds * 1000:.0f}ms" for name, seconds in self.timings.items())
+            self.logger.info(f"Warm-up finished with state {self.state} ({phases})")
+
+    def is_ready(self) -> bool:
+        """Whether the warm-up completed successfully"""
+        return self.state == WARMUP_READY
+
+    def status(self) -> Dict[str, Any]:
+        """Readiness and per-phase timings in milliseconds"""
+        return {
+            "state": self.state,
+            "error": self.error,
+            "timings_ms": {name: round(seconds * 1000, 1) for name, seconds in self.timings.items()},
+        }
@@ -1,20 +1,111 @@
 import logging
+import math
+import time
+from contextlib import aclosing
 from bedrock_agentcore.runtime import BedrockAgentCoreApp
+from starlette.responses import JSONResponse
+from auth import access_token
 from config.config import Config
 from core.mcp_manager import MCPServerManager
 from core.agent_manager import AgentManager
+from core.admission import AdmissionController, AdmissionRejected
+from core.intent_router import IntentRouter
 from core.stream_processor import StreamProcessor
+from core.warmup import WarmupManager
+from tools.robot_queues import robot_queues
+from utils.aws_clients import aws_clients
+from utils.circuit_breaker import circuit_breakers
+from utils.deadline import Deadline, current_deadline, with_deadline
+from utils.http_client import http_clients
 from utils.logger import LoggerSetup
+from utils.metrics import metrics, current_request, RequestMetrics, MetricsReporter
 
 
+# Upper bounds for the client's stream coalescing options
+MAX_COALESCE_BYTES = 16384
+MAX_COALESCE_MS = 1000
+
 # Initialize configuration and logging
 config = Config.from_config_file()
-logger = LoggerSetup.setup_logging()
+logger = LoggerSetup.setup_logging(
+    level=config.log_level,
+    json_format=config.log_json,
+    use_queue=config.log_queue
+)
 app = BedrockAgentCoreApp()
 
+# Pooled keep-alive connections for gateway and auth HTTP traffic
+http_clients.configure(
+    max_connections=config.http_max_connections,
+    max_keepalive_connections=config.http_max_keepalive_connections,
+    keepalive_expiry=config.http_keepalive_expiry
+)
+# Shared boto3 clients with pooled keep-alive connections and adaptive retries
+aws_clients.configure(
+    max_pool_connections=config.aws_max_pool_connections,
+    max_attempts=config.aws_max_attempts,
+    retry_mode=config.aws_retry_mode
+)
+# Fail fast on the gateway and AWS dependencies after repeated outages
+circuit_breakers.configure(
+    failure_threshold=config.circuit_failure_threshold,
+    reset_timeout=config.circuit_reset_timeout
+)
+
 # Initialize managers
 mcp_manager = MCPServerManager(config)
 agent_manager = AgentManager(config, mcp_manager)
+warmup = WarmupManager(config, mcp_manager, agent_manager)
+admission = AdmissionController(
+    max_concurrent=config.max_concurrent_requests,
+    max_queued=config.max_queued_requests,
+    max_per_session=config.max_active_per_session
+)
+intent_router = IntentRouter(agent_manager)
+
+# Warm up tools, token and model client while the app boots
+if config.warmup_enabled:
+    warmup.start()
+
+# Long-poll the robot queues so robot tools answer from memory
+if config.robot_queue_consumers and config.account_id:
+    robot_queues.start(
+        config.account_id,
+        buffer_size=config.robot_queue_buffer_size,
+        wait_seconds=config.robot_queue_wait_seconds
+    )
+
+# Export runtime metrics as a periodic log line and a local endpoint
+metrics.register_gauge("agent_pool", agent_manager.pool.stats)
+metrics.register_gauge("tool_catalog", mcp_manager.tool_catalog.stats)
+metrics.register_gauge("token_cache", access_token.token_cache.stats)
+metrics.register_gauge("token_refresh", access_token.refresh_stats)
+metrics.register_gauge("mcp_connect", access_token.connect_stats)
+metrics.register_gauge("mcp_session", mcp_manager.session_stats)
+metrics.register_gauge("tool_reload", agent_manager.tool_reload_stats)
+metrics.register_gauge("http", http_clients.stats)
+metrics.register_gauge("aws_clients", aws_clients.stats)
+metrics.register_gauge("circuit_breakers", circuit_breakers.stats)
+metrics.register_gauge("robot_queues", robot_queues.stats)
+metrics.register_gauge("warmup", warmup.status)
+metrics.register_gauge("init", agent_manager.get_init_state)
+metrics.register_gauge("admission", admission.stats)
+metrics.register_gauge("context_tokens", agent_manager.context_sizes)
+metrics.register_gauge("intent_router", intent_router.stats)
+metrics.register_gauge(
+    "model_routes",
+    lambda: agent_manager.model_router.stats() if agent_manager.model_router else None
+)
+metrics_reporter = MetricsReporter(metrics, config.metrics_log_interval)
+metrics_reporter.start()
+
+
+async def metrics_endpoint(request):
+    """Return the in-process metrics snapshot"""
+    return JSONResponse(metrics.snapshot())
+
+
+app.add_route("/metrics", metrics_endpoint, methods=["GET"])
 
 
 @app.entrypoint
@@ -26,18 +117,52 @@ async def strands_agent_bedrock_streaming(payload, context):
     """
     user_message = payload.get("prompt")
     debug = payload.get("debug", False)  # Add debug parameter, default to False
+
+    # Each request streams in its own task, so the context variable is per request
+    request_metrics = RequestMetrics(metrics, session_id=context.session_id)
+    current_request.set(request_metrics)
+    # Clients may shorten the deadline but never disable or extend it
+    deadline = Deadline(_payload_number(
+        payload, "deadline_seconds", config.request_deadline_seconds,
+        maximum=config.request_deadline_seconds, allow_zero=False
+    ))
+    current_deadline.set(deadline)
     logger.info(f"Received user message: {user_message}, debug mode: {debug}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Runtime context: session={context.session_id}, type={type(context).__name__}")
+
+    # Every exit, including init and admission failures, counts towards the request totals
+    try:
+        async with aclosing(_handle_request(payload, context, request_metrics, deadline)) as events:
+            async for event in events:
+                yield event
+    finally:
+        request_metrics.finish()
+
+    if payload.get("timings", False):
+        yield {"type": "timings", "timings": request_metrics.summary()}
 
-    print("=== Runtime Context Information ===")
-    print("Runtime Session ID:", context.session_id)
-    print("Context Object Type:", type(context))
-    print("User input:", user_message)
-    print("Debug mode:", debug)
-    print("=== End Context Information ===")
+
+async def _handle_request(payload, context, request_metrics, deadline):
+    """Initialize, admit and route one request"""
+    user_message = payload.get("prompt")
+    debug = payload.get("debug", False)
 
     # Ensure agent is initialized
     logger.info("Checking agent initialization...")
-    if not agent_manager.ensure_initialized(debug=debug):
+    init_started = time.perf_counter()
+    ready = await agent_manager.ensure_initialized_async(debug=debug)
+    request_metrics.record("init", time.perf_counter() - init_started)
+    if not ready:
+        open_circuits = circuit_breakers.open_circuits()
+        if open_circuits and not debug:
+            logger.error(f"Agent unavailable, open circuits: {', '.join(open_circuits)}")
+            yield {
+                "error": "dependency_unavailable",
+                "message": "A required service is unavailable; failing fast until it recovers",
+                "circuits": open_circuits
+            }
+            return
         if debug:
             error_msg = "Failed to initialize agent in debug mode. Please check local tools configuration."
             logger.error(error_msg)
@@ -46,24 +171,113 @@ async def strands_agent_bedrock_streaming(payload, context):
             logger.error(error_msg)
             logger.error(f"MCP server URL: {mcp_manager.config.mcp_server_url}")
             logger.error(f"Bearer token available: {bool(mcp_manager.config.bearer_token)}")
-        yield {"error": error_msg}
+        yield {"error": error_msg, "init_state": agent_manager.get_init_state()}
         return
 
-    # Get the initialized agent
-    agent = agent_manager.get_agent()
-    if not agent:
-        error_msg = "Agent is not available"
-        logger.error(error_msg)
-        yield {"error": error_msg}
+    # Admission control: cap concurrent agent runs, queue fairly across sessions
+    try:
+        ticket = admission.request(context.session_id)
+    except AdmissionRejected as e:
+        yield {"error": "busy", "message": str(e)}
         return
 
-    # Process the stream
-    stream = agent.stream_async(user_message)
-    stream_processor = StreamProcessor(logger)
-    
-    async for event in stream_processor.process_stream(stream, user_message):
-        yield event
+    try:
+        if not ticket.admitted:
+            yield {"type": "queued", "position": ticket.position}
+            wait_started = time.perf_counter()
+            admitted = await admission.wait(ticket, deadline.timeout(config.admission_timeout))
+            request_metrics.record("admission_wait", time.perf_counter() - wait_started)
+            if not admitted:
+                yield {"error": "busy", "message": "Timed out waiting for an agent slot"}
+                return
+
+        # Get the agent bound to this session
+        agent = agent_manager.get_agent(context.session_id)
+        if not agent:
+            error_msg = "Agent is not available"
+            logger.error(error_msg)
+            yield {"error": error_msg}
+            return
+
+        # Unambiguous direct commands skip the model entirely
+        action = None
+        if config.intent_router_enabled and not debug and payload.get("router", True):
+            action = intent_router.match(user_message)
+
+        if action:
+            logger.info(f"Routing direct command to action: {action}")
+            events = _route_direct(action, agent, user_message, request_metrics, deadline)
+        else:
+            events = _stream_agent(agent, user_message, payload, request_metrics, deadline)
+        async with aclosing(events):
+            async for event in events:
+                yield event
+    finally:
+        admission.release(ticket)
+
+
+def _payload_number(payload, key, default, maximum, allow_zero=True, integer=False):
+    """
+    Numeric payload option capped at maximum; missing, malformed, negative
+    or (unless allow_zero) zero values fall back to default
+    """
+    value = payload.get(key)
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        return default
+    try:
+        number = float(value)
+    except ValueError:
+        return default
+    if not math.isfinite(number) or number < 0 or (number == 0 and not allow_zero):
+        return default
+    number = min(number, maximum)
+    return int(number) if integer else number
+
+
+async def _route_direct(action, agent, user_message, request_metrics, deadline):
+    """Dispatch a direct command through the intent router"""
+    try:
+        async for event in with_deadline(intent_router.dispatch(action, user_message, agent), deadline):
+            request_metrics.observe_event(event)
+            yield event
+    except Exception as e:
+        logger.error(f"Error routing direct command: {str(e)}", exc_info=True)
+        yield {"error": f"Error processing direct command: {str(e)}"}
+    finally:
+        deadline.cancel()
+
+
+async def _stream_agent(agent, user_message, payload, request_metrics, deadline):
+    """Stream the agent's response as runtime events"""
+    route = agent_manager.route_model(agent, user_message)
+    if route:
+        logger.info(f"Using {route} model route")
+
+    # Process the stream, cancelling the agent once the deadline passes
+    stream = with_deadline(agent.stream_async(user_message), deadline)
+    stream_processor = StreamProcessor(
+        logger,
+        coalesce_bytes=_payload_number(
+            payload, "coalesce_bytes", config.stream_coalesce_bytes, maximum=MAX_COALESCE_BYTES, integer=True
+        ),
+        coalesce_ms=_payload_number(payload, "coalesce_ms", config.stream_coalesce_ms, maximum=MAX_COALESCE_MS)
+    )
     
+    stream_started = time.perf_counter()
+    try:
+        async for event in stream_processor.process_stream(stream, user_message):
+            request_metrics.observe_event(event)
+            yield event
+    finally:
+        # Also reached when the client disconnects; stops tools still running in threads
+        deadline.cancel()
+        stream_seconds = time.perf_counter() - stream_started
+        request_metrics.record("stream", stream_seconds)
+        if route:
+            agent_manager.model_router.record(
+                route, request_metrics.model_turns, stream_seconds, request_metrics.usage
+            )
+
 
 if __name__ == "__main__":
     # Run the AgentCore Runtime App
@@ -0,0 +1,31 @@
+import time
+import pytest
+
+
+class FakeClock:
+    """Manually advanced stand-in for time.time, time.monotonic and time.perf_counter"""
+    
+    def __init__(self, now: float = 1_700_000_000.0):
+        self.now = now
+    
+    def time(self) -> float:
+        return self.now
+    
+    def monotonic(self) -> float:
+        return self.now
+    
+    def perf_counter(self) -> float:
+        return self.now
+    
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Freeze time.time, time.monotonic and time.perf_counter; tests move them forward with clock.advance"""
+    clock = FakeClock()
+    monkeypatch.setattr(time, "time", clock.time)
+    monkeypatch.setattr(time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(time, "perf_counter", clock.perf_counter)
+    return clock
@@ -0,0 +1,51 @@
+import time
+from typing import Sequence
+from strands import tool
+from strands.models import Model
+
+
+class ToolThenTextModel(Model):
+    """Asks for tool_name on the first turn, then streams its answer as the given text deltas"""
+    
+    def __init__(self, tool_name: str, deltas: Sequence[str]):
+        self.tool_name = tool_name
+        self.deltas = deltas
+        self.turns = 0
+    
+    def update_config(self, **model_config):
+        pass
+    
+    def get_config(self):
+        return {}
+    
+    async def structured_output(self, output_model, prompt, system_prompt=None, **kwargs):
+        raise NotImplementedError
+        yield
+    
+    async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs):
+        self.turns += 1
+        yield {"messageStart": {"role": "assistant"}}
+        if self.turns == 1:
+            tool_use = {"toolUseId": f"{self.tool_name}-1", "name": self.tool_name}
+            yield {"contentBlockStart": {"start": {"toolUse": tool_use}}}
+            yield {"contentBlockDelta": {"delta": {"toolUse": {"input": "{}"}}}}
+            yield {"contentBlockStop": {}}
+            yield {"messageStop": {"stopReason": "tool_use"}}
+        else:
+            for text in self.deltas:
+                yield {"contentBlockDelta": {"delta": {"text": text}}}
+            yield {"contentBlockStop": {}}
+            yield {"messageStop": {"stopReason": "end_turn"}}
+
+
+@tool
+def echo_tool() -> str:
+    """Returns a fixed result"""
+    return "ok"
+
+
+@tool
+def slow_tool() -> str:
+    """Stands in for a slow gateway call"""
+    time.sleep(0.3)
+    return "slow result"
@@ -0,0 +1,64 @@
+import base64
+import json
+import time
+import pytest
+from auth import access_token
+
+
+def make_jwt(expires_at):
+    claims = base64.urlsafe_b64encode(json.dumps({"exp": expires_at}).encode()).decode().rstrip("=")
+    return f"header.{claims}.signature"
+
+
+@pytest.fixture
+def token_cache(monkeypatch):
+    cache = access_token.TokenCache()
+    monkeypatch.setattr(access_token, "token_cache", cache)
+    monkeypatch.setenv("GATEWAY_URL", "https://gateway.example")
+    monkeypatch.delenv("SECRET_NAME", raising=False)
+    return cache
+
+
+@pytest.mark.parametrize("outcome", [False, None])
+def test_unconfirmed_opaque_token_is_not_cached(token_cache, monkeypatch, outcome):
+    # False: rejected by the gateway, None: the check itself failed
+    monkeypatch.setattr(access_token, "check_bearer_token", lambda token: outcome)
+    # A copy cached earlier is dropped too
+    token_cache.set("opaque", time.time() + 600)
+    
+    assert access_token._accept_stored_token("opaque") is None
+    assert token_cache.get() is None
+
+
+def test_confirmed_opaque_token_is_cached(token_cache, monkeypatch):
+    monkeypatch.setattr(access_token, "check_bearer_token", lambda token: True)
+    
+    assert access_token._accept_stored_token("opaque") == "opaque"
+    assert token_cache.get() == "opaque"
+
+
+@pytest.mark.parametrize("message, expected", [
+    ("Client error '401 Unauthorized' for url 'https://gateway.example/mcp'", True),
+    ("Invalid Bearer token", True),
+    ("HTTP 403", True),
+    ("unexpected status code: 401", True),
+    ("All connection attempts failed: 10.0.4.1:4010", False),
+    ("request 403a9f1c timed out after reading 401 bytes", False),
+])
+def test_auth_errors_are_matched_by_status_not_stray_digits(message, expected):
+    assert access_token.is_auth_error(RuntimeError(message)) is expected
+
+
+def test_invalidated_token_is_not_reloaded(token_cache, monkeypatch):
+    rejected = make_jwt(time.time() + 3600)
+    monkeypatch.setenv("BEARER_TOKEN", rejected)
+    token_cache.set(rejected)
+    # The secret still holds the rejected token too
+    monkeypatch.setattr(access_token, "get_bearer_token_from_secret_manager", lambda: rejected)
+    monkeypatch.setattr(access_token, "fetch_fresh_token", lambda: "fresh")
+    
+    access_token.invalidate_token(rejected)
+    
+    assert access_token.get_gateway_access_token() == "fresh"
+    assert "BEARER_TOKEN" not in access_token.os.environ
+    assert access_token._accept_stored_token(rejected) is None
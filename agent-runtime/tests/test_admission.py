@@ -0,0 +1,61 @@
+import pytest
+from core.admission import AdmissionController, AdmissionRejected
+
+
+@pytest.mark.asyncio
+async def test_free_slots_rotate_across_sessions():
+    controller = AdmissionController(max_concurrent=1, max_queued=10, max_per_session=1)
+    running = controller.request("a")
+    assert running.admitted
+    
+    # Session a piles up waiters before b and c arrive
+    queued = [controller.request("a") for _ in range(3)] + [controller.request("b"), controller.request("c")]
+    assert not any(ticket.admitted for ticket in queued)
+    assert controller.stats()["waiting"] == 5
+    
+    order = []
+    current = running
+    while True:
+        controller.release(current)
+        admitted = [ticket for ticket in queued if ticket.admitted and ticket not in order]
+        if not admitted:
+            break
+        assert len(admitted) == 1
+        current = admitted[0]
+        assert await controller.wait(current, timeout=0)
+        order.append(current)
+    
+    assert [ticket.session_id for ticket in order] == ["a", "b", "c", "a", "a"]
+    assert controller.stats()["active"] == 0
+
+
+@pytest.mark.asyncio
+async def test_full_queue_rejects():
+    controller = AdmissionController(max_concurrent=1, max_queued=2)
+    controller.request("a")
+    controller.request("b")
+    controller.request("c")
+    
+    with pytest.raises(AdmissionRejected):
+        controller.request("d")
+    
+    stats = controller.stats()
+    assert stats["waiting"] == 2
+    assert stats["rejected_total"] == 1
+
+
+@pytest.mark.asyncio
+async def test_released_waiter_frees_its_queue_place():
+    controller = AdmissionController(max_concurrent=1, max_queued=1)
+    running = controller.request("a")
+    waiter = controller.request("b")
+    
+    assert not await controller.wait(waiter, timeout=0.01)
+    controller.release(waiter)
+    assert waiter.future.cancelled()
+    
+    # The place is free again and the slot goes to the next request
+    replacement = controller.request("c")
+    controller.release(running)
+    assert replacement.admitted
+    assert controller.stats()["timed_out_total"] == 1
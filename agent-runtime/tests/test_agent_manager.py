@@ -0,0 +1,51 @@
+import asyncio
+import threading
+import pytest
+from config.config import Config
+from core.agent_manager import INIT_READY, AgentManager
+
+
+def make_manager():
+    manager = AgentManager(Config(mcp_server_url=""), mcp_manager=None)
+    inits = []
+    release = threading.Event()
+    
+    def ensure_initialized(debug=False):
+        inits.append(debug)
+        release.wait(2)
+        manager.agent = object()
+        return True
+    
+    manager.ensure_initialized = ensure_initialized
+    return manager, inits, release
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_the_shared_init():
+    manager, inits, release = make_manager()
+    # Keeps the init queued behind the single init worker until released
+    manager._init_executor.submit(release.wait, 2)
+    
+    callers = [asyncio.ensure_future(manager.ensure_initialized_async(debug=True)) for _ in range(3)]
+    await asyncio.sleep(0.05)
+    callers[0].cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await callers[0]
+    
+    release.set()
+    assert await asyncio.wait_for(asyncio.gather(*callers[1:]), timeout=5) == [True, True]
+    assert inits == [True]
+    assert manager.init_state.status == INIT_READY
+
+
+def test_requests_without_a_session_never_get_the_template():
+    manager, _, _ = make_manager()
+    assert manager.get_agent() is None
+    
+    manager.agent = object()
+    manager._clone_agent = object
+    first, second = manager.get_agent(), manager.get_agent(None)
+    
+    assert manager.agent not in (first, second)
+    assert first is not second
+    assert manager.pool.stats()["misses"] == 0
@@ -0,0 +1,55 @@
+from core.agent_pool import AgentPool
+
+
+def make_pool(**kwargs):
+    created = []
+    
+    def factory():
+        created.append(object())
+        return created[-1]
+    
+    return AgentPool(factory, **kwargs), created
+
+
+def test_hit_returns_the_same_agent(clock):
+    pool, created = make_pool(max_size=2)
+    first = pool.acquire("s1")
+    assert pool.acquire("s1") is first
+    assert len(created) == 1
+    assert pool.stats()["hits"] == 1
+    assert pool.stats()["misses"] == 1
+
+
+def test_least_recently_used_is_evicted_when_full(clock):
+    pool, _ = make_pool(max_size=2)
+    s1 = pool.acquire("s1")
+    pool.acquire("s2")
+    # Touching s1 makes s2 the least recently used
+    pool.acquire("s1")
+    pool.acquire("s3")
+    
+    assert set(pool.items()) == {"s1", "s3"}
+    assert pool.items()["s1"] is s1
+    assert pool.stats()["evictions"] == 1
+
+
+def test_idle_agents_expire(clock):
+    pool, _ = make_pool(max_size=4, idle_ttl=60)
+    pool.acquire("idle")
+    clock.advance(30)
+    busy = pool.acquire("busy")
+    clock.advance(40)
+    
+    # idle has been unused for 70s, busy for 40s
+    pool.acquire("new")
+    assert set(pool.items()) == {"busy", "new"}
+    assert pool.items()["busy"] is busy
+    assert pool.stats()["evictions"] == 1
+
+
+def test_zero_ttl_keeps_idle_agents(clock):
+    pool, _ = make_pool(idle_ttl=0)
+    pool.acquire("s1")
+    clock.advance(10 ** 6)
+    pool.acquire("s2")
+    assert set(pool.items()) == {"s1", "s2"}
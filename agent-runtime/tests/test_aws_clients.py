@@ -0,0 +1,28 @@
+from utils.aws_clients import AwsClientRegistry
+
+
+def test_clients_are_reused_per_service_region_and_options():
+    registry = AwsClientRegistry()
+    sqs = registry.client("sqs", region_name="us-east-1")
+    
+    assert registry.client("sqs", region_name="us-east-1") is sqs
+    assert registry.client("sqs", region_name="us-west-2") is not sqs
+    assert registry.client("sqs", region_name="us-east-1", read_timeout=5) is not sqs
+    assert registry.client("sqs", region_name="us-east-1", read_timeout=5) is registry.client(
+        "sqs", region_name="us-east-1", read_timeout=5
+    )
+    assert registry.client("s3", region_name="us-east-1") is not sqs
+    
+    assert registry.stats() == {"clients": 4, "created": {"sqs": 3, "s3": 1}, "reused": {"sqs": 3}}
+
+
+def test_configure_applies_to_new_clients_only():
+    registry = AwsClientRegistry(max_attempts=3)
+    before = registry.client("sqs", region_name="us-east-1")
+    
+    registry.configure(max_attempts=5)
+    after = registry.client("sqs", region_name="us-east-1")
+    
+    assert after is not before
+    assert registry.default_options["retries"] == {"max_attempts": 5, "mode": "adaptive"}
+    assert registry.stats()["created"] == {"sqs": 2}
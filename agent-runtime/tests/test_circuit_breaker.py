@@ -0,0 +1,180 @@
+import threading
+import time
+import pytest
+from botocore.exceptions import ClientError
+from utils.circuit_breaker import (
+    STATE_CLOSED, STATE_HALF_OPEN, STATE_OPEN, CircuitBreaker, CircuitOpenError, is_outage
+)
+from utils.metrics import MetricsRegistry
+
+
+def client_error(status, code):
+    return ClientError({"Error": {"Code": code}, "ResponseMetadata": {"HTTPStatusCode": status}}, "Op")
+
+
+def fail(error):
+    def call():
+        raise error
+    return call
+
+
+def trip(breaker):
+    for _ in range(breaker.failure_threshold):
+        with pytest.raises(ConnectionError):
+            breaker.call(fail(ConnectionError("down")))
+
+
+def test_outage_classification():
+    assert is_outage(ConnectionError())
+    assert is_outage(client_error(503, "ServiceUnavailable"))
+    assert is_outage(client_error(400, "ThrottlingException"))
+    assert not is_outage(client_error(400, "ValidationException"))
+    assert not is_outage(ValueError())
+    
+    try:
+        try:
+            raise TimeoutError()
+        except TimeoutError as e:
+            raise RuntimeError("wrapped") from e
+    except RuntimeError as wrapped:
+        assert is_outage(wrapped)
+
+
+def test_trips_after_consecutive_outages(clock):
+    breaker = CircuitBreaker("t", failure_threshold=3, reset_timeout=30, registry=MetricsRegistry())
+    trip(breaker)
+    assert breaker.state == STATE_OPEN
+    
+    calls = []
+    with pytest.raises(CircuitOpenError):
+        breaker.call(calls.append, 1)
+    assert calls == []
+    assert breaker.stats()["rejected"] == 1
+    assert breaker.stats()["trips"] == 1
+
+
+def test_success_resets_the_streak(clock):
+    breaker = CircuitBreaker("t", failure_threshold=3, registry=MetricsRegistry())
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            breaker.call(fail(ConnectionError()))
+    breaker.call(lambda: None)
+    with pytest.raises(ConnectionError):
+        breaker.call(fail(ConnectionError()))
+    assert breaker.state == STATE_CLOSED
+    assert breaker.failures == 1
+
+
+def test_non_outage_errors_do_not_count(clock):
+    breaker = CircuitBreaker("t", failure_threshold=2, registry=MetricsRegistry())
+    with pytest.raises(ConnectionError):
+        breaker.call(fail(ConnectionError()))
+    for error in (ValueError("bad input"), client_error(403, "AccessDeniedException")):
+        with pytest.raises(type(error)):
+            breaker.call(fail(error))
+    
+    assert breaker.state == STATE_CLOSED
+    assert breaker.failures == 0
+
+
+def test_half_open_success_closes(clock):
+    breaker = CircuitBreaker("t", failure_threshold=1, reset_timeout=30, registry=MetricsRegistry())
+    trip(breaker)
+    
+    clock.advance(29)
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+    
+    clock.advance(1)
+    assert breaker.call(lambda: "ok") == "ok"
+    assert breaker.state == STATE_CLOSED
+
+
+def test_half_open_failure_reopens(clock):
+    breaker = CircuitBreaker("t", failure_threshold=3, reset_timeout=30, registry=MetricsRegistry())
+    trip(breaker)
+    clock.advance(30)
+    
+    def trial():
+        assert breaker.state == STATE_HALF_OPEN
+        raise ConnectionError()
+    
+    # One outage is enough to reopen a half-open circuit
+    with pytest.raises(ConnectionError):
+        breaker.call(trial)
+    assert breaker.state == STATE_OPEN
+    assert breaker.stats()["trips"] == 2
+
+
+def test_half_open_lets_one_concurrent_call_through(clock):
+    breaker = CircuitBreaker("t", failure_threshold=1, reset_timeout=30, registry=MetricsRegistry())
+    trip(breaker)
+    clock.advance(30)
+    
+    started = threading.Event()
+    release = threading.Event()
+    
+    def slow_call():
+        started.set()
+        release.wait(2)
+        return "ok"
+    
+    results = []
+    trial = threading.Thread(target=lambda: results.append(breaker.call(slow_call)))
+    trial.start()
+    assert started.wait(2)
+    
+    rejected = []
+    
+    def other_call():
+        try:
+            breaker.call(lambda: "ok")
+        except CircuitOpenError as e:
+            rejected.append(e)
+    
+    others = [threading.Thread(target=other_call) for _ in range(5)]
+    for thread in others:
+        thread.start()
+    for thread in others:
+        thread.join(2)
+    assert len(rejected) == 5
+    assert breaker.state == STATE_HALF_OPEN
+    
+    release.set()
+    trial.join(2)
+    assert results == ["ok"]
+    assert breaker.state == STATE_CLOSED
+    assert breaker.call(lambda: "ok") == "ok"
+
+
+def test_unresolved_half_open_trial_is_given_up(clock):
+    breaker = CircuitBreaker("t", failure_threshold=1, reset_timeout=30, registry=MetricsRegistry())
+    trip(breaker)
+    clock.advance(30)
+    breaker.check()
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+    
+    clock.advance(30)
+    breaker.check()
+    assert breaker.state == STATE_HALF_OPEN
+
+
+def test_probe_moves_open_circuit_to_half_open():
+    answered = threading.Event()
+    
+    def probe():
+        answered.set()
+        return True
+    
+    breaker = CircuitBreaker("t", failure_threshold=1, reset_timeout=0.01, probe=probe, registry=MetricsRegistry())
+    trip(breaker)
+    assert answered.wait(2)
+    
+    for _ in range(200):
+        if breaker.state == STATE_HALF_OPEN:
+            break
+        time.sleep(0.01)
+    assert breaker.state == STATE_HALF_OPEN
+    breaker.call(lambda: None)
+    assert breaker.state == STATE_CLOSED
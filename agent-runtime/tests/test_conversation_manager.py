@@ -0,0 +1,91 @@
+from types import SimpleNamespace
+import pytest
+from strands.types.exceptions import ContextWindowOverflowException
+from core.conversation_manager import SUMMARY_PREFIX, TokenBudgetConversationManager
+
+
+def tool_turn(index, result_text="ok"):
+    """User prompt, tool call, tool result and answer making up one turn"""
+    tool_use_id = f"tool-{index}"
+    return [
+        {"role": "user", "content": [{"text": f"prompt {index}"}]},
+        {"role": "assistant", "content": [
+            {"toolUse": {"toolUseId": tool_use_id, "name": "robot___command", "input": {"step": index}}}
+        ]},
+        {"role": "user", "content": [
+            {"toolResult": {"toolUseId": tool_use_id, "status": "success", "content": [{"text": result_text}]}}
+        ]},
+        {"role": "assistant", "content": [{"text": f"answer {index}"}]},
+    ]
+
+
+def make_agent(turns, **results):
+    messages = []
+    for index in range(turns):
+        messages.extend(tool_turn(index, results.get(f"result_{index}", "ok")))
+    return SimpleNamespace(messages=messages)
+
+
+def summary_blocks(message):
+    return [block for block in message["content"] if str(block.get("text", "")).startswith(SUMMARY_PREFIX)]
+
+
+def test_turns_are_dropped_whole():
+    agent = make_agent(4)
+    manager = TokenBudgetConversationManager(token_budget=1)
+    
+    manager.apply_management(agent)
+    
+    # Only the latest turn is left, with its tool call and result still paired
+    assert len(agent.messages) == 4
+    assert manager.removed_message_count == 12
+    assert summary_blocks(agent.messages[0])
+    assert agent.messages[0]["content"][-1] == {"text": "prompt 3"}
+    tool_uses = [block["toolUse"]["toolUseId"] for message in agent.messages
+                 for block in message["content"] if "toolUse" in block]
+    tool_results = [block["toolResult"]["toolUseId"] for message in agent.messages
+                    for block in message["content"] if "toolResult" in block]
+    assert tool_uses == tool_results == ["tool-3"]
+
+
+def test_summary_is_not_duplicated_when_folded_again():
+    agent = make_agent(3)
+    manager = TokenBudgetConversationManager(token_budget=100_000)
+    
+    manager.reduce_context(agent)
+    manager.reduce_context(agent)
+    
+    assert len(summary_blocks(agent.messages[0])) == 1
+    summary = summary_blocks(agent.messages[0])[0]["text"]
+    assert "prompt 0" in summary and "prompt 1" in summary
+    assert manager.removed_message_count == 8
+
+
+def test_latest_turn_is_never_truncated():
+    long_result = "x" * 1000
+    agent = make_agent(2, result_0=long_result, result_1=long_result)
+    manager = TokenBudgetConversationManager(token_budget=100_000, tool_result_chars=50)
+    
+    manager.apply_management(agent)
+    
+    old_result = agent.messages[2]["content"][0]["toolResult"]["content"][0]["text"]
+    latest_result = agent.messages[6]["content"][0]["toolResult"]["content"][0]["text"]
+    assert old_result.endswith("...(truncated)")
+    assert len(old_result) < 100
+    assert latest_result == long_result
+
+
+def test_reduce_context_raises_once_one_turn_is_left():
+    agent = make_agent(2)
+    manager = TokenBudgetConversationManager()
+    manager.reduce_context(agent)
+    
+    with pytest.raises(ContextWindowOverflowException):
+        manager.reduce_context(agent)
+    
+    overflow = ValueError("context overflow")
+    with pytest.raises(ValueError) as raised:
+        manager.reduce_context(agent, overflow)
+    assert raised.value is overflow
+    assert len(agent.messages) == 4
+    assert len(summary_blocks(agent.messages[0])) == 1
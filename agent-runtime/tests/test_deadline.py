@@ -0,0 +1,42 @@
+import asyncio
+import logging
+import pytest
+from strands import Agent
+from core.deadline_hook import DeadlineHook
+from core.stream_processor import StreamProcessor
+from tests.helpers import ToolThenTextModel, slow_tool
+from utils.deadline import Deadline, DeadlineExceeded, current_deadline, find_deadline_exceeded
+
+
+async def collect(stream):
+    return [event async for event in stream]
+
+
+def test_find_deadline_exceeded_walks_the_chain():
+    original = DeadlineExceeded("late")
+    try:
+        try:
+            raise original
+        except DeadlineExceeded as e:
+            raise RuntimeError("wrapped") from e
+    except RuntimeError as wrapped:
+        assert find_deadline_exceeded(wrapped) is original
+    assert find_deadline_exceeded(ValueError("other")) is None
+
+
+@pytest.mark.asyncio
+async def test_deadline_in_hook_streams_deadline_event():
+    agent = Agent(
+        model=ToolThenTextModel("slow_tool", ("done",)),
+        tools=[slow_tool],
+        hooks=[DeadlineHook()],
+        callback_handler=None
+    )
+    current_deadline.set(Deadline(0.2))
+    processor = StreamProcessor(logging.getLogger(__name__))
+    
+    events = await asyncio.wait_for(collect(processor.process_stream(agent.stream_async("go"), "go")), timeout=5)
+    
+    assert events[-1]["type"] == "deadline_exceeded"
+    assert "0.2s" in events[-1]["error"]
+    assert not any("error" in event and event.get("type") != "deadline_exceeded" for event in events)
@@ -0,0 +1,83 @@
+import json
+from types import SimpleNamespace
+import pytest
+from core import intent_router
+from core.intent_router import IntentRouter, command_failed, normalize_command
+from utils.metrics import MetricsRegistry, RequestMetrics, current_request
+
+
+@pytest.fixture
+def router(monkeypatch):
+    router = IntentRouter(agent_manager=None)
+    monkeypatch.setattr(router, "_command_tool", lambda: object())
+    return router
+
+
+@pytest.mark.parametrize("message, action", [
+    ("앉아", "sit"),
+    ("앉아요!", "sit"),
+    ("일어서 주세요", "stand"),
+    ("춤춰봐", "dance1"),
+    ("탐지해줘", "detected"),
+])
+def test_lambda_synonyms_are_routed(router, message, action):
+    assert router.match(message) == action
+
+
+@pytest.mark.parametrize("message", ["hello", "Hello!", "normal", "stand", "멈춰", "인사해", "안녕하세요"])
+def test_chat_goes_to_the_agent(router, message):
+    assert router.match(message) is None
+    assert router.hits == 0
+
+
+def test_suffix_kept_when_stem_is_not_a_command():
+    assert normalize_command("좋아요") == "좋아요"
+
+
+def lambda_result(body, status_code=200):
+    """Successful MCP result carrying a command Lambda response"""
+    return {"status": "success", "content": [{"text": json.dumps({"statusCode": status_code, "body": body})}]}
+
+
+def test_command_failed_reads_the_lambda_response():
+    assert not command_failed(lambda_result(True))
+    assert command_failed(lambda_result(False))
+    assert command_failed(lambda_result(True, status_code=500))
+    assert command_failed({"status": "error", "content": [{"text": "Tool execution failed: timeout"}]})
+    assert command_failed({"status": "success", "content": [], "structuredContent": {"statusCode": 200, "body": False}})
+    assert not command_failed({"status": "success", "content": [{"text": "plain text"}]})
+
+
+@pytest.mark.asyncio
+async def test_publish_failure_is_reported_to_the_user(monkeypatch):
+    async def call_tool_async(tool_use_id, name, arguments):
+        return lambda_result(False)
+    
+    tool = SimpleNamespace(tool_name="robot___command", mcp_client=SimpleNamespace(call_tool_async=call_tool_async))
+    router = IntentRouter(agent_manager=None, registry=MetricsRegistry())
+    monkeypatch.setattr(router, "_command_tool", lambda: tool)
+    monkeypatch.setattr(intent_router, "get_robot_feedback", lambda: pytest.fail("feedback checked after a failed command"))
+    
+    events = [event async for event in router.dispatch("sit", "앉아")]
+    
+    assert events[-1]["type"] == "complete"
+    assert "전달하지 못했어요" in events[-1]["final_response"]
+
+
+@pytest.mark.asyncio
+async def test_routed_tool_calls_are_timed(monkeypatch):
+    async def call_tool_async(tool_use_id, name, arguments):
+        return lambda_result(True)
+    
+    tool = SimpleNamespace(tool_name="robot___command", mcp_client=SimpleNamespace(call_tool_async=call_tool_async))
+    router = IntentRouter(agent_manager=None, registry=MetricsRegistry())
+    monkeypatch.setattr(router, "_command_tool", lambda: tool)
+    monkeypatch.setattr(intent_router, "get_robot_feedback", lambda: [])
+    request_metrics = RequestMetrics(MetricsRegistry())
+    current_request.set(request_metrics)
+    
+    [event async for event in router.dispatch("sit", "앉아")]
+    
+    calls = [(call["name"], call["kind"], call["error"]) for call in request_metrics.tool_calls]
+    assert calls == [("robot___command", "mcp", False), ("get_robot_feedback", "local", False)]
+    assert request_metrics.registry.histogram("tool.mcp.robot___command").count == 1
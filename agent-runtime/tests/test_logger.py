@@ -0,0 +1,66 @@
+import atexit
+import json
+import logging
+import sys
+import pytest
+from utils.logger import JsonFormatter, LoggerSetup, RequestContextFilter
+from utils.metrics import MetricsRegistry, RequestMetrics, current_request
+
+
+@pytest.fixture
+def root_logging():
+    """Restore the root logger after a test reconfigures it"""
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    yield
+    if LoggerSetup.listener is not None:
+        atexit.unregister(LoggerSetup.listener.stop)
+        LoggerSetup.listener.stop()
+        LoggerSetup.listener = None
+    root.handlers[:] = handlers
+    root.setLevel(level)
+
+
+def test_json_formatter_output():
+    request = RequestMetrics(MetricsRegistry(), session_id="s1")
+    token = current_request.set(request)
+    try:
+        try:
+            raise ValueError("bad")
+        except ValueError:
+            record = logging.getLogger("robot").makeRecord(
+                "robot", logging.ERROR, __file__, 1, "moved %s", ("앞으로",), sys.exc_info()
+            )
+        RequestContextFilter().filter(record)
+    finally:
+        current_request.reset(token)
+    
+    entry = json.loads(JsonFormatter().format(record))
+    
+    assert entry["level"] == "ERROR"
+    assert entry["logger"] == "robot"
+    assert entry["message"] == "moved 앞으로"
+    assert entry["request_id"] == request.request_id
+    assert entry["session_id"] == "s1"
+    assert "ValueError: bad" in entry["exception"]
+    assert entry["timestamp"].endswith("+00:00")
+
+
+def test_queue_listener_flushes_on_shutdown(capsys, root_logging):
+    logger = LoggerSetup.setup_logging(json_format=True, use_queue=True)
+    for index in range(50):
+        logger.info(f"queued {index}")
+    try:
+        raise RuntimeError("lost")
+    except RuntimeError:
+        logger.exception("failed")
+    
+    # What the atexit hook does on shutdown
+    atexit.unregister(LoggerSetup.listener.stop)
+    LoggerSetup.listener.stop()
+    LoggerSetup.listener = None
+    
+    entries = [json.loads(line) for line in capsys.readouterr().err.splitlines()]
+    assert [entry["message"] for entry in entries[:50]] == [f"queued {index}" for index in range(50)]
+    assert entries[-1]["message"] == "failed"
+    assert "RuntimeError: lost" in entries[-1]["exception"]
@@ -0,0 +1,126 @@
+import logging
+import threading
+import time
+from types import SimpleNamespace
+from core import mcp_manager
+from core.mcp_manager import MCPServerManager
+from core.mcp_session_pool import MCPSessionPool, PooledSession
+
+
+class ProbeClient:
+    """MCP client whose tools/list blocks until released"""
+    
+    def __init__(self, hang: bool = False):
+        self.released = threading.Event()
+        if not hang:
+            self.released.set()
+    
+        self.stopped = threading.Event()
+    
+    def list_tools_sync(self, pagination_token=None):
+        self.released.wait()
+        return []
+    
+    def stop(self, exc_type, exc_val, exc_tb):
+        self.stopped.set()
+
+
+def make_manager(health_timeout):
+    manager = MCPServerManager.__new__(MCPServerManager)
+    manager.config = SimpleNamespace(
+        mcp_health_timeout=health_timeout,
+        mcp_session_refresh_margin=60,
+        mcp_session_pool_size=1,
+        request_deadline_seconds=5
+    )
+    manager.logger = logging.getLogger(__name__)
+    manager.session_pool = None
+    return manager
+
+
+def test_hung_probe_does_not_fail_healthy_sessions():
+    manager = make_manager(health_timeout=0.2)
+    hung = ProbeClient(hang=True)
+    try:
+        assert "timed out" in manager._session_problem(PooledSession(client=hung))
+        
+        started = time.monotonic()
+        for _ in range(3):
+            assert manager._session_problem(PooledSession(client=ProbeClient())) is None
+        assert time.monotonic() - started < 0.2
+    finally:
+        hung.released.set()
+
+
+def test_replaced_session_closes_once_its_calls_finish(monkeypatch):
+    monkeypatch.setattr(mcp_manager, "CLOSE_POLL_SECONDS", 0.01)
+    manager = make_manager(health_timeout=0.2)
+    old = ProbeClient()
+    pool = MCPSessionPool([old])
+    
+    with pool._checkout():
+        old_session = pool.replace(0, ProbeClient())
+        closer = threading.Thread(target=manager._close_when_idle, args=(pool, old_session, 5))
+        closer.start()
+        # Longer than the health timeout the old session used to get
+        assert not old.stopped.wait(0.3)
+    
+    closer.join(2)
+    assert old.stopped.is_set()
+
+
+def test_replaced_session_closes_after_the_grace_period(monkeypatch):
+    monkeypatch.setattr(mcp_manager, "CLOSE_POLL_SECONDS", 0.01)
+    manager = make_manager(health_timeout=0.2)
+    old = ProbeClient()
+    pool = MCPSessionPool([old])
+    
+    with pool._checkout():
+        old_session = pool.replace(0, ProbeClient())
+        manager._close_when_idle(pool, old_session, 0.05)
+        assert old.stopped.is_set()
+
+
+def test_new_pool_closes_the_one_it_replaces(monkeypatch):
+    monkeypatch.setattr(mcp_manager, "CLOSE_POLL_SECONDS", 0.01)
+    manager = make_manager(health_timeout=0.2)
+    manager._session_token = lambda: (None, None)
+    first, second = ProbeClient(), ProbeClient()
+    
+    old_pool = manager._open_pool(first)
+    new_pool = manager._open_pool(second)
+    
+    assert manager.session_pool is new_pool is not old_pool
+    assert first.stopped.wait(2)
+    assert not second.stopped.is_set()
+
+
+def test_closed_pool_is_no_longer_supervised(monkeypatch):
+    monkeypatch.setattr(mcp_manager, "CLOSE_POLL_SECONDS", 0.01)
+    manager = make_manager(health_timeout=0.2)
+    manager._session_token = lambda: (None, None)
+    client = ProbeClient()
+    
+    manager.close_pool(manager._open_pool(client))
+    
+    assert manager.session_pool is None
+    assert client.stopped.wait(2)
+
+
+def test_rejected_probe_renews_the_stale_token(monkeypatch):
+    manager = make_manager(health_timeout=0.2)
+    calls = []
+    monkeypatch.setattr(mcp_manager.access_token, "invalidate_token", lambda token: calls.append(("invalidate", token)))
+    monkeypatch.setattr(
+        mcp_manager.access_token, "refresh_cognito_token",
+        lambda stale_token=None: calls.append(("refresh", stale_token)) or "fresh"
+    )
+    
+    class RejectedClient(ProbeClient):
+        def list_tools_sync(self, pagination_token=None):
+            raise RuntimeError("Client error '401 Unauthorized'")
+    
+    problem = manager._session_problem(PooledSession(client=RejectedClient(), token="stale"))
+    
+    assert "401" in problem
+    assert calls == [("invalidate", "stale"), ("refresh", "stale")]
@@ -0,0 +1,97 @@
+import pytest
+from core.mcp_session_pool import MCPSessionPool
+from utils.circuit_breaker import STATE_CLOSED, STATE_OPEN, CircuitBreaker, CircuitOpenError
+from utils.metrics import MetricsRegistry
+
+
+class FakeClient:
+    """MCP client returning a fixed tool result and counting calls"""
+    
+    def __init__(self, result):
+        self.result = result
+        self.calls = 0
+        self.options = []
+    
+    async def call_tool_async(self, tool_use_id, name, arguments=None, read_timeout_seconds=None, **kwargs):
+        self.calls += 1
+        self.options.append(kwargs)
+        return {"toolUseId": tool_use_id, **self.result}
+    
+    def call_tool_sync(self, tool_use_id, name, arguments=None, read_timeout_seconds=None, **kwargs):
+        self.calls += 1
+        self.options.append(kwargs)
+        return {"toolUseId": tool_use_id, **self.result}
+    
+    def list_tools_sync(self, pagination_token=None):
+        self.calls += 1
+        if self.result.get("status") == "error":
+            raise ConnectionError("All connection attempts failed")
+        return []
+
+
+def make_pool(result, failure_threshold=2):
+    breaker = CircuitBreaker("gateway", failure_threshold=failure_threshold, reset_timeout=30, registry=MetricsRegistry())
+    client = FakeClient(result)
+    return MCPSessionPool([client], breaker=breaker), client, breaker
+
+
+TRANSPORT_FAILURE = {"status": "error", "content": [{"text": "Tool execution failed: All connection attempts failed"}]}
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_returns_error_result_without_calling():
+    pool, client, breaker = make_pool({"status": "success", "content": [{"text": "ok"}]})
+    breaker.record_failure("down")
+    breaker.record_failure("down")
+    
+    result = await pool.call_tool_async("t1", "robot___command", {"action": "sit"})
+    
+    assert result["status"] == "error"
+    assert result["toolUseId"] == "t1"
+    assert "gateway is unavailable" in result["content"][0]["text"]
+    assert pool.call_tool_sync("t2", "robot___command")["status"] == "error"
+    assert client.calls == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_calls_trip_the_gateway_circuit():
+    pool, client, breaker = make_pool(TRANSPORT_FAILURE)
+    await pool.call_tool_async("t1", "robot___command")
+    pool.call_tool_sync("t2", "robot___command")
+    assert breaker.state == STATE_OPEN
+    
+    await pool.call_tool_async("t3", "robot___command")
+    assert client.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_tool_errors_are_answers_not_outages():
+    pool, _, breaker = make_pool({"status": "error", "content": [{"text": "unknown action"}]})
+    breaker.record_failure("down")
+    
+    await pool.call_tool_async("t1", "robot___command")
+    assert breaker.state == STATE_CLOSED
+    assert breaker.failures == 0
+
+
+def test_listing_tools_goes_through_the_gateway_circuit():
+    pool, client, breaker = make_pool(TRANSPORT_FAILURE)
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            pool.list_tools_sync()
+    assert breaker.state == STATE_OPEN
+    
+    with pytest.raises(CircuitOpenError):
+        pool.list_tools_sync()
+    assert client.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_newer_client_options_are_forwarded():
+    pool, client, _ = make_pool({"status": "success", "content": [{"text": "ok"}]})
+    cancel_signal = object()
+    
+    await pool.call_tool_async("t1", "robot___command", {}, None, cancel_signal=cancel_signal)
+    pool.call_tool_sync("t2", "robot___command")
+    
+    assert client.options == [{"cancel_signal": cancel_signal}, {}]
@@ -0,0 +1,36 @@
+from utils.metrics import MetricsRegistry, RequestMetrics
+
+
+def test_finish_records_total_and_completion(clock):
+    registry = MetricsRegistry()
+    request = RequestMetrics(registry, session_id="s1")
+    clock.advance(1.25)
+    
+    request.finish()
+    
+    snapshot = registry.snapshot()
+    assert snapshot["counters"]["requests.completed"] == 1
+    assert snapshot["histograms"]["request.total"]["count"] == 1
+    assert snapshot["histograms"]["request.total"]["max_ms"] == 1250.0
+
+
+def test_summary_shape(clock):
+    registry = MetricsRegistry()
+    request = RequestMetrics(registry, session_id="s1")
+    request.record("init", 0.01)
+    clock.advance(0.3)
+    request.observe_event({"type": "chunk", "data": "hi"})
+    request.observe_event({"type": "metadata", "metadata": {"usage": {"inputTokens": 12, "outputTokens": 3}}})
+    request.record_model_turn(0.25)
+    request.record_tool_call("robot___command", "mcp", 0.0404, error=True)
+    request.finish()
+    
+    summary = request.summary()
+    
+    assert summary["request_id"] == request.request_id
+    assert summary["session_id"] == "s1"
+    assert summary["timings_ms"] == {"init": 10.0, "time_to_first_token": 300.0, "total": 300.0}
+    assert summary["model_turns_ms"] == [250.0]
+    assert summary["tool_calls"] == [{"name": "robot___command", "kind": "mcp", "ms": 40.4, "error": True}]
+    assert summary["usage"] == {"inputTokens": 12, "outputTokens": 3}
+    assert registry.snapshot()["counters"]["tool.mcp.robot___command.errors"] == 1
@@ -0,0 +1,74 @@
+import time
+import pytest
+from strands import Agent
+from core.metrics_hook import MetricsHook
+from core.model_router import ROUTE_FAST, ROUTE_STRONG, ModelRouter
+from tests.helpers import ToolThenTextModel, slow_tool
+from utils.metrics import MetricsRegistry, RequestMetrics, current_request
+
+SITUATION_PROMPT = "주변 상황을 살펴봐"
+SHORT_PROMPT = "앉아"
+
+
+def make_router():
+    router = ModelRouter({ROUTE_FAST: None, ROUTE_STRONG: None}, registry=MetricsRegistry(), latency_budget_ms=1000)
+    for _ in range(20):
+        router.record(ROUTE_FAST, [0.2], 0.2, {})
+        router.record(ROUTE_STRONG, [5.0], 5.0, {})
+    return router
+
+
+def test_over_budget_route_falls_back_but_keeps_probing():
+    router = make_router()
+    routes = [router.select(SITUATION_PROMPT) for _ in range(router.probe_interval)]
+    assert routes.count(ROUTE_FAST) == router.probe_interval - 1
+    assert routes[-1] == ROUTE_STRONG
+
+
+def test_streak_is_per_route():
+    router = ModelRouter(
+        {ROUTE_FAST: None, ROUTE_STRONG: None, "backup": None}, registry=MetricsRegistry(), latency_budget_ms=1000
+    )
+    for _ in range(20):
+        router.record(ROUTE_FAST, [2.0], 2.0, {})
+        router.record(ROUTE_STRONG, [5.0], 5.0, {})
+        router.record("backup", [0.1], 0.1, {})
+    
+    for _ in range(router.probe_interval - 1):
+        assert router.select(SITUATION_PROMPT) == "backup"
+    # The strong route's streak does not make this the fast route's probe
+    assert router.select(SHORT_PROMPT) == "backup"
+    assert router.select(SITUATION_PROMPT) == ROUTE_STRONG
+
+
+def test_in_budget_sample_resets_the_streak():
+    router = make_router()
+    for _ in range(router.probe_interval - 2):
+        router.select(SITUATION_PROMPT)
+    router.record(ROUTE_STRONG, [0.5], 0.5, {})
+    
+    # The streak starts over, so the next probe is a full interval away
+    routes = [router.select(SITUATION_PROMPT) for _ in range(router.probe_interval)]
+    assert routes.count(ROUTE_STRONG) == 1
+    assert routes[-1] == ROUTE_STRONG
+
+
+@pytest.mark.asyncio
+async def test_slow_tools_do_not_trip_the_fallback():
+    router = ModelRouter({ROUTE_FAST: None, ROUTE_STRONG: None}, registry=MetricsRegistry(), latency_budget_ms=200)
+    router.record(ROUTE_FAST, [0.001], 0.001, {})
+    
+    for _ in range(3):
+        request_metrics = RequestMetrics(router.registry)
+        current_request.set(request_metrics)
+        agent = Agent(model=ToolThenTextModel("slow_tool", ("all clear",)), tools=[slow_tool], hooks=[MetricsHook()], callback_handler=None)
+        started = time.perf_counter()
+        async for _ in agent.stream_async(SITUATION_PROMPT):
+            pass
+        stream_seconds = time.perf_counter() - started
+        router.record(ROUTE_STRONG, request_metrics.model_turns, stream_seconds, request_metrics.usage)
+    
+    assert len(request_metrics.model_turns) == 2
+    assert stream_seconds > 0.3
+    assert router.registry.histogram(f"model_route.{ROUTE_STRONG}.stream").percentile(95) > 300
+    assert [router.select(SITUATION_PROMPT) for _ in range(5)] == [ROUTE_STRONG] * 5
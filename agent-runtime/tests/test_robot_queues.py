@@ -0,0 +1,73 @@
+import threading
+from datetime import datetime, timezone
+from tools.robot_queues import MessageRing, QueueConsumer, RobotQueueConsumers
+
+
+def stamped(seconds_ago, clock, **body):
+    stamp = datetime.fromtimestamp(clock.now - seconds_ago, timezone.utc).isoformat()
+    return {"timestamp": stamp, **body}
+
+
+def test_full_ring_drops_the_oldest(clock):
+    ring = MessageRing(capacity=3)
+    ring.extend([{"n": n} for n in range(5)])
+    
+    stats = ring.stats()
+    assert stats["depth"] == 3
+    assert stats["dropped"] == 2
+    assert [body["n"] for body in ring.take(limit=10)] == [2, 3, 4]
+
+
+def test_take_returns_the_latest_and_empties(clock):
+    ring = MessageRing(capacity=10)
+    ring.extend([{"n": n} for n in range(5)])
+    
+    assert [body["n"] for body in ring.take(limit=3)] == [2, 3, 4]
+    assert ring.take() == []
+    assert ring.stats()["served"] == 3
+
+
+def test_messages_expire_by_event_time(clock):
+    ring = MessageRing(capacity=10, max_age=180)
+    ring.extend([stamped(600, clock, n="stale"), stamped(60, clock, n="fresh")])
+    assert ring.stats()["expired"] == 1
+    
+    # The fresh message passes max_age two minutes later
+    clock.advance(121)
+    assert ring.take() == []
+    assert ring.stats()["expired"] == 2
+
+
+def test_messages_without_timestamp_age_from_arrival(clock):
+    ring = MessageRing(capacity=10, max_age=180)
+    ring.extend([{"n": 1}, {"timestamp": "not a time", "n": 2}])
+    
+    clock.advance(179)
+    assert [body["n"] for body in ring.take()] == [1, 2]
+    
+    ring.extend([{"n": 3}])
+    clock.advance(181)
+    assert ring.take() == []
+
+
+def test_direct_reads_only_without_a_running_consumer():
+    consumers = RobotQueueConsumers()
+    assert consumers.snapshot("robo_feedback") is None
+    
+    consumer = QueueConsumer("robo_feedback", "https://sqs.example/robo_feedback.fifo")
+    consumers.consumers["robo_feedback"] = consumer
+    assert consumers.snapshot("robo_feedback") is None
+    
+    # A live thread that has not polled successfully yet still owns the queue
+    release = threading.Event()
+    consumer._thread = threading.Thread(target=release.wait, daemon=True)
+    consumer._thread.start()
+    try:
+        consumer.ring.extend([{"n": 1}])
+        snapshot = consumers.snapshot("robo_feedback")
+        assert snapshot["messages"] == [{"n": 1}]
+        assert "not receiving" in snapshot["warning"]
+    finally:
+        release.set()
+        consumer._thread.join()
+    assert consumers.snapshot("robo_feedback") is None
@@ -0,0 +1,43 @@
+import logging
+import pytest
+from opentelemetry import trace
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from strands import Agent
+from core.stream_processor import StreamProcessor
+from tests.helpers import ToolThenTextModel, echo_tool
+
+
+@pytest.fixture
+def spans():
+    provider = trace.get_tracer_provider()
+    if not isinstance(provider, TracerProvider):
+        provider = TracerProvider()
+        trace.set_tracer_provider(provider)
+    exporter = InMemorySpanExporter()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    yield exporter
+    exporter.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_coalescing_keeps_the_agent_trace_intact(spans, caplog):
+    agent = Agent(model=ToolThenTextModel("echo_tool", ("the ", "robot ", "is ", "sitting")), tools=[echo_tool], callback_handler=None)
+    processor = StreamProcessor(logging.getLogger(__name__), coalesce_bytes=64, coalesce_ms=50)
+    
+    events = [event async for event in processor.process_stream(agent.stream_async("go"), "go")]
+    
+    chunks = [event["data"] for event in events if event["type"] == "chunk"]
+    assert "".join(chunks) == "the robot is sitting"
+    assert len(chunks) < 4
+    assert events[-1]["type"] == "complete"
+    assert not [record for record in caplog.records if "Failed to detach context" in record.getMessage()]
+    
+    finished = spans.get_finished_spans()
+    roots = [span for span in finished if span.parent is None]
+    assert len(roots) == 1
+    trace_id = roots[0].context.trace_id
+    assert all(span.context.trace_id == trace_id for span in finished)
+    assert any(span.name.startswith("execute_tool") for span in finished)
+    assert sum(1 for span in finished if span.name == "chat") == 2
@@ -0,0 +1,54 @@
+import json
+from core.tool_catalog import ToolCatalogCache
+
+KEY = ToolCatalogCache.make_key("https://gateway.example.com/", "robot")
+TOOLS = [{"name": "robot___command", "inputSchema": {"json": {"type": "object"}}}]
+
+
+def test_hit_miss_and_stale_counting(tmp_path, clock):
+    cache = ToolCatalogCache(str(tmp_path / "catalog.json"), ttl=60)
+    assert cache.get(KEY) is None
+    
+    assert cache.put(KEY, TOOLS)
+    assert cache.get(KEY) == (TOOLS, False)
+    
+    clock.advance(61)
+    assert cache.get(KEY) == (TOOLS, True)
+    
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["stale_hits"]) == (2, 1, 1)
+
+
+def test_revalidation_counts_changes(tmp_path, clock):
+    cache = ToolCatalogCache(str(tmp_path / "catalog.json"))
+    cache.put(KEY, TOOLS)
+    
+    assert not cache.put(KEY, TOOLS)
+    assert cache.put(KEY, TOOLS + [{"name": "robot___status"}])
+    assert (cache.stats()["revalidations"], cache.stats()["changes"]) == (2, 1)
+
+
+def test_snapshot_reloads_unverified(tmp_path, clock):
+    path = str(tmp_path / "catalog.json")
+    ToolCatalogCache(path).put(KEY, TOOLS)
+    
+    restarted = ToolCatalogCache(path)
+    
+    # Served from the snapshot, but flagged until the gateway confirms it
+    assert restarted.get(KEY) == (TOOLS, True)
+    restarted.put(KEY, TOOLS)
+    assert restarted.get(KEY) == (TOOLS, False)
+
+
+def test_empty_catalog_is_never_stored_or_served(tmp_path, clock):
+    path = tmp_path / "catalog.json"
+    cache = ToolCatalogCache(str(path))
+    cache.put(KEY, TOOLS)
+    
+    assert not cache.put(KEY, [])
+    assert cache.get(KEY) == (TOOLS, False)
+    assert json.loads(path.read_text())[KEY]["tools"] == TOOLS
+    
+    other = ToolCatalogCache.make_key("https://gateway.example.com", "empty")
+    path.write_text(json.dumps({other: {"tools": [], "fetched_at": clock.time()}}))
+    assert ToolCatalogCache(str(path)).get(other) is None
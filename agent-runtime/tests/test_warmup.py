@@ -0,0 +1,62 @@
+from concurrent.futures import Future
+from types import SimpleNamespace
+import pytest
+from core.warmup import WARMUP_FAILED, WARMUP_READY, WarmupManager
+
+
+def make_warmup(clock, ready=True, token=True, init_error=None):
+    def prefetch_token():
+        clock.advance(0.2)
+        return token
+    
+    def start_initialization(debug=False):
+        future = Future()
+        if init_error is not None:
+            future.set_exception(init_error)
+            return future
+        clock.advance(1.5)
+        agent_manager.init_timings = {"mcp_tools": 1.0, "agent_template": 0.5}
+        future.set_result(ready)
+        return future
+    
+    agent_manager = SimpleNamespace(
+        start_initialization=start_initialization,
+        init_timings={},
+        init_state=SimpleNamespace(last_error=None if ready else "Failed to load tools from MCP server")
+    )
+    mcp_manager = SimpleNamespace(prefetch_token=prefetch_token)
+    return WarmupManager(config=None, mcp_manager=mcp_manager, agent_manager=agent_manager)
+
+
+def test_ready_records_every_phase(clock):
+    warmup = make_warmup(clock)
+    
+    warmup._run()
+    
+    assert warmup.is_ready()
+    assert warmup.status() == {
+        "state": WARMUP_READY,
+        "error": None,
+        "timings_ms": {"token": 200.0, "mcp_tools": 1000.0, "agent_template": 500.0, "total": 1700.0},
+    }
+
+
+def test_failed_init_reports_its_error(clock):
+    warmup = make_warmup(clock, ready=False, token=False)
+    
+    warmup._run()
+    
+    assert not warmup.is_ready()
+    assert warmup.state == WARMUP_FAILED
+    assert warmup.error == "Failed to load tools from MCP server"
+    assert warmup.timings["total"] == pytest.approx(1.7)
+
+
+def test_init_exception_fails_the_warmup(clock):
+    warmup = make_warmup(clock, init_error=RuntimeError("gateway down"))
+    
+    warmup._run()
+    
+    assert warmup.state == WARMUP_FAILED
+    assert warmup.error == "gateway down"
+    assert warmup.status()["timings_ms"] == {"token": 200.0, "total": 200.0}
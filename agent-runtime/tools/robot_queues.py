@@ -0,0 +1,273 @@
+import json
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional
+from utils.aws_clients import aws_clients
+from utils.circuit_breaker import CircuitOpenError, circuit_breakers
+
+
+SQS_REGION = "ap-northeast-2"
+ROBOT_QUEUES = ("robo_feedback", "robo_detection", "robo_gesture")
+
+# Same window and count the robot tools have always returned
+MESSAGE_MAX_AGE_SECONDS = 3 * 60
+SNAPSHOT_MESSAGES = 3
+
+
+def parse_queue_message(message: Dict[str, Any]) -> Dict[str, Any]:
+    """Tool-facing body of an SQS message, tagged with its message_id"""
+    try:
+        body = json.loads(message['Body'])
+    except json.JSONDecodeError:
+        return {"message_id": message['MessageId'], "raw_body": message['Body']}
+    if not isinstance(body, dict):
+        return {"message_id": message['MessageId'], "raw_body": message['Body']}
+    body["message_id"] = message['MessageId']
+    return body
+
+
+def message_time(body: Dict[str, Any]) -> Optional[float]:
+    """Epoch seconds of the message's own timestamp field, if it has a readable one"""
+    try:
+        return datetime.fromisoformat(str(body['timestamp']).replace('Z', '+00:00')).timestamp()
+    except (KeyError, ValueError, TypeError):
+        return None
+
+
+class MessageRing:
+    """Bounded buffer of received messages in arrival order, indexed by event time
+    
+    When full, the oldest message is dropped. Messages past max_age are
+    expired on every write and snapshot.
+    """
+    
+    def __init__(self, capacity: int = 100, max_age: float = MESSAGE_MAX_AGE_SECONDS):
+        self.capacity = max(1, capacity)
+        self.max_age = max_age
+        # (event time, body), oldest first
+        self._entries: Deque = deque()
+        self._lock = threading.Lock()
+        self.received = 0
+        self.dropped = 0
+        self.expired = 0
+        self.served = 0
+    
+    def extend(self, bodies: List[Dict[str, Any]]) -> None:
+        """Buffer newly received message bodies"""
+        now = time.time()
+        with self._lock:
+            for body in bodies:
+                if len(self._entries) >= self.capacity:
+                    self._entries.popleft()
+                    self.dropped += 1
+                # Messages without their own timestamp are aged from their arrival
+                self._entries.append((message_time(body) or now, body))
+                self.received += 1
+            self._expire(now)
+    
+    def take(self, limit: int = SNAPSHOT_MESSAGES) -> List[Dict[str, Any]]:
+        """Latest limit messages within max_age, oldest first; empties the buffer like the queue drain did"""
+        with self._lock:
+            self._expire(time.time())
+            fresh = [body for _, body in self._entries][-limit:]
+            self._entries.clear()
+            self.served += len(fresh)
+            return fresh
+    
+    def stats(self) -> Dict[str, Any]:
+        """Depth, age of the oldest buffered message and drop counters"""
+        with self._lock:
+            oldest = self._entries[0][0] if self._entries else None
+            return {
+                "depth": len(self._entries),
+                "capacity": self.capacity,
+                "oldest_age_seconds": round(time.time() - oldest, 1) if oldest else None,
+                "received": self.received,
+                "served": self.served,
+                "dropped": self.dropped,
+                "expired": self.expired,
+            }
+    
+    def _expire(self, now: float) -> None:
+        cutoff = now - self.max_age
+        # Event times may arrive out of order, so check every entry rather than just the head
+        kept = deque(entry for entry in self._entries if entry[0] >= cutoff)
+        self.expired += len(self._entries) - len(kept)
+        self._entries = kept
+
+
+class QueueConsumer:
+    """Long-polls one SQS FIFO queue on a background thread into a MessageRing"""
+    
+    def __init__(self, queue_name: str, queue_url: str, buffer_size: int = 100, wait_seconds: int = 20):
+        self.queue_name = queue_name
+        self.queue_url = queue_url
+        self.wait_seconds = wait_seconds
+        self.ring = MessageRing(buffer_size)
+        self.breaker = circuit_breakers.get("sqs")
+        self.logger = logging.getLogger(__name__)
+        self.polls = 0
+        self.errors = 0
+        self.last_poll_at: Optional[float] = None
+        # Delay between SentTimestamp and arrival in the buffer
+        self.last_lag_seconds: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self) -> None:
+        """Start polling unless already running"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=f"sqs-consumer-{self.queue_name}", daemon=True)
+        self._thread.start()
+    
+    def stop(self) -> None:
+        """Stop after the current long poll returns"""
+        self._stop.set()
+    
+    def is_running(self) -> bool:
+        """Whether the polling thread is alive and still owns the queue"""
+        return self._thread is not None and self._thread.is_alive()
+    
+    def is_healthy(self) -> bool:
+        """Whether the buffer is being kept current: thread alive and a poll succeeded recently"""
+        if not self.is_running() or self.last_poll_at is None:
+            return False
+        return time.monotonic() - self.last_poll_at <= 2 * self.wait_seconds + 10
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Buffered messages in the shape _get_fifo_messages returns"""
+        current_time = datetime.now()
+        messages = self.ring.take()
+        if not messages:
+            return {
+                "status": "no_messages",
+                "message": f"No messages available in the {self.queue_name} queue",
+                "timestamp": current_time.isoformat()
+            }
+        return {
+            "status": "success",
+            "message_count": len(messages),
+            "timestamp": current_time.isoformat(),
+            "messages": messages
+        }
+    
+    def stats(self) -> Dict[str, Any]:
+        """Buffer depth, delivery lag, poll and drop counters"""
+        return {
+            **self.ring.stats(),
+            "healthy": self.is_healthy(),
+            "polls": self.polls,
+            "errors": self.errors,
+            "lag_seconds": round(self.last_lag_seconds, 3) if self.last_lag_seconds is not None else None,
+            "last_poll_age_seconds": (
+                round(time.monotonic() - self.last_poll_at, 1) if self.last_poll_at is not None else None
+            ),
+        }
+    
+    def _run(self) -> None:
+        failures = 0
+        while not self._stop.is_set():
+            try:
+                sqs = aws_clients.client('sqs', region_name=SQS_REGION)
+                response = self.breaker.call(
+                    sqs.receive_message,
+                    QueueUrl=self.queue_url,
+                    MaxNumberOfMessages=10,
+                    WaitTimeSeconds=self.wait_seconds,
+                    AttributeNames=['SentTimestamp'],
+                    MessageAttributeNames=['All']
+                )
+            except CircuitOpenError as e:
+                self._stop.wait(max(1.0, e.retry_in))
+                continue
+            except Exception as e:
+                self.errors += 1
+                failures += 1
+                delay = min(30.0, 2 ** failures)
+                self.logger.warning(f"Polling {self.queue_name} failed, retrying in {delay:.0f}s: {str(e)}")
+                self._stop.wait(delay)
+                continue
+            
+            failures = 0
+            self.polls += 1
+            self.last_poll_at = time.monotonic()
+            messages = response.get('Messages', [])
+            if not messages:
+                continue
+            
+            self.ring.extend([parse_queue_message(message) for message in messages])
+            sent = messages[-1].get('Attributes', {}).get('SentTimestamp')
+            if sent:
+                self.last_lag_seconds = max(0.0, time.time() - int(sent) / 1000)
+            self._delete(sqs, messages)
+    
+    def _delete(self, sqs: Any, messages: List[Dict[str, Any]]) -> None:
+        """Remove buffered messages from the queue in one batch"""
+        try:
+            response = sqs.delete_message_batch(
+                QueueUrl=self.queue_url,
+                Entries=[
+                    {"Id": str(index), "ReceiptHandle": message['ReceiptHandle']}
+                    for index, message in enumerate(messages)
+                ]
+            )
+            for failed in response.get('Failed', []):
+                self.logger.warning(f"Could not delete message from {self.queue_name}: {failed.get('Message')}")
+        except Exception as e:
+            self.logger.warning(f"Could not delete messages from {self.queue_name}: {str(e)}")
+
+
+class RobotQueueConsumers:
+    """Background consumers for the robot feedback, detection and gesture queues"""
+    
+    def __init__(self):
+        self.consumers: Dict[str, QueueConsumer] = {}
+        self.logger = logging.getLogger(__name__)
+    
+    def start(self, account_id: str, buffer_size: int = 100, wait_seconds: int = 20) -> None:
+        """Start one long-polling consumer per robot queue"""
+        for queue_name in ROBOT_QUEUES:
+            consumer = self.consumers.get(queue_name)
+            if consumer is None:
+                queue_url = f"https://sqs.{SQS_REGION}.amazonaws.com/{account_id}/{queue_name}.fifo"
+                consumer = QueueConsumer(queue_name, queue_url, buffer_size=buffer_size, wait_seconds=wait_seconds)
+                self.consumers[queue_name] = consumer
+            consumer.start()
+        self.logger.info(f"Started background consumers for {', '.join(ROBOT_QUEUES)}")
+    
+    def stop(self) -> None:
+        """Stop all consumers"""
+        for consumer in self.consumers.values():
+            consumer.stop()
+    
+    def snapshot(self, queue_name: str) -> Optional[Dict[str, Any]]:
+        """Buffered messages of queue_name, or None when no consumer thread is reading the queue
+        
+        A running consumer still owns the queue while it is failing or behind, so
+        its buffer is served with a warning rather than racing it with direct reads.
+        """
+        consumer = self.consumers.get(queue_name)
+        if consumer is None or not consumer.is_running():
+            return None
+        snapshot = consumer.snapshot()
+        if not consumer.is_healthy():
+            stats = consumer.stats()
+            snapshot["warning"] = (
+                f"The {queue_name} consumer is not receiving from SQS "
+                f"(last successful poll {stats['last_poll_age_seconds']}s ago, {stats['errors']} errors); "
+                "messages may be missing or delayed"
+            )
+        return snapshot
+    
+    def stats(self) -> Dict[str, Any]:
+        """Per-queue buffer and consumer stats"""
+        return {queue_name: consumer.stats() for queue_name, consumer in self.consumers.items()}
+
+
+# Started from main.py; robot tools fall back to direct SQS reads when its consumer threads are not running
+robot_queues = RobotQueueConsumers()
@@ -1,10 +1,23 @@
 from strands import tool
 from datetime import datetime
 import json
-import boto3
 import os
 from typing import Optional, List, Dict, Any
+from utils.aws_clients import aws_clients
+from utils.circuit_breaker import CircuitOpenError, aws_endpoint_probe, circuit_breakers
 from utils.s3_util import download_image_from_s3
+from utils.deadline import deadline_expired
+from tools.robot_queues import SQS_REGION, robot_queues
+
+
+DEADLINE_ERROR = "Request deadline exceeded or client disconnected"
+
+IMAGE_ANALYSIS_REGION = "us-west-2"
+
+sqs_breaker = circuit_breakers.get("sqs", probe=aws_endpoint_probe("sqs", SQS_REGION))
+image_analysis_breaker = circuit_breakers.get(
+    "bedrock_image_analysis", probe=aws_endpoint_probe("bedrock-runtime", IMAGE_ANALYSIS_REGION)
+)
 
 
 def _get_fifo_messages(queue_name: str, config: dict) -> Dict[str, Any]:
@@ -20,14 +33,14 @@ def _get_fifo_messages(queue_name: str, config: dict) -> Dict[str, Any]:
         Dictionary containing status and messages
     """
     try:
-        region = "ap-northeast-2"
+        region = SQS_REGION
         account_id = config['accountId']
     except KeyError as e:
         return {"error": f"Missing required configuration key: {e}"}
     
-    # Create SQS client
+    # Shared SQS client
     try:
-        sqs = boto3.client('sqs', region_name=region)
+        sqs = aws_clients.client('sqs', region_name=region)
     except Exception as e:
         return {"error": f"Failed to create SQS client: {e}"}
     
@@ -35,8 +48,12 @@ def _get_fifo_messages(queue_name: str, config: dict) -> Dict[str, Any]:
     queue_url = f"https://sqs.{region}.amazonaws.com/{account_id}/{queue_name}.fifo"
     
     # Check queue access first
+    if deadline_expired():
+        return {"error": DEADLINE_ERROR}
     try:
-        sqs.get_queue_attributes(QueueUrl=queue_url, AttributeNames=['All'])
+        sqs_breaker.call(sqs.get_queue_attributes, QueueUrl=queue_url, AttributeNames=['All'])
+    except CircuitOpenError as e:
+        return {"error": str(e)}
     except Exception as e:
         return {"error": f"Cannot access SQS queue: {e}. Please check queue name, AWS credentials, and permissions."}
     
@@ -45,8 +62,11 @@ def _get_fifo_messages(queue_name: str, config: dict) -> Dict[str, Any]:
     three_minutes_ago = current_time.timestamp() - (3 * 60)  # 3 minutes in seconds
     
     # Receive only the latest 3 messages from SQS
+    if deadline_expired():
+        return {"error": DEADLINE_ERROR}
     try:
-        response = sqs.receive_message(
+        response = sqs_breaker.call(
+            sqs.receive_message,
             QueueUrl=queue_url,
             MaxNumberOfMessages=3,  # Changed from 10 to 3
             WaitTimeSeconds=0,  # Non-blocking for tool usage
@@ -108,6 +128,8 @@ def _get_fifo_messages(queue_name: str, config: dict) -> Dict[str, Any]:
     
     # Delete all processed messages to clear the queue
     for message in messages_to_delete:
+        if deadline_expired():
+            break
         try:
             sqs.delete_message(
                 QueueUrl=queue_url,
@@ -116,10 +138,11 @@ def _get_fifo_messages(queue_name: str, config: dict) -> Dict[str, Any]:
         except Exception as e:
             print(f"Warning: Could not delete message {message['MessageId']}: {e}")
     
-    # Clear any remaining messages in the queue
+    # Clear any remaining messages in the queue, stopping once nobody is listening
     try:
-        while True:
-            response = sqs.receive_message(
+        while not deadline_expired():
+            response = sqs_breaker.call(
+                sqs.receive_message,
                 QueueUrl=queue_url,
                 MaxNumberOfMessages=10,
                 WaitTimeSeconds=0
@@ -160,6 +183,11 @@ def get_robot_feedback():
         A list of robot feedback messages with timestamps and execution details.
     """
     try:
+        # Served from memory while the background consumer runs; only read SQS directly without one
+        buffered = robot_queues.snapshot("robo_feedback")
+        if buffered is not None:
+            return buffered
+        
         # Load configuration
         config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config', 'config.json')
         try:
@@ -199,6 +227,11 @@ def get_robot_detection():
         Detection types include: emergency_situation, explosion, fire, person_down
     """
     try:
+        # Served from memory while the background consumer runs; only read SQS directly without one
+        buffered = robot_queues.snapshot("robo_detection")
+        if buffered is not None:
+            return buffered
+        
         # Load configuration
         config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config', 'config.json')
         try:
@@ -238,6 +271,11 @@ def get_robot_gesture():
         Contains information about recognized human gestures and corresponding image files.
     """
     try:
+        # Served from memory while the background consumer runs; only read SQS directly without one
+        buffered = robot_queues.snapshot("robo_gesture")
+        if buffered is not None:
+            return buffered
+        
         # Load configuration
         config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config', 'config.json')
         try:
@@ -275,10 +313,15 @@ def analyze_robot_image(image_path: str) -> str:
     """
     try:        
         # Download image from S3
+        if deadline_expired():
+            return f"Error analyzing image {image_path}: {DEADLINE_ERROR}"
         image_bytes = download_image_from_s3(image_path)
+        
+        if deadline_expired():
+            return f"Error analyzing image {image_path}: {DEADLINE_ERROR}"
                 
-        # Initialize Bedrock client
-        bedrock = boto3.client('bedrock-runtime', region_name='us-west-2')
+        # Shared Bedrock client
+        bedrock = aws_clients.client('bedrock-runtime', region_name=IMAGE_ANALYSIS_REGION)
         
         # Prepare the message for Bedrock Converse API
         messages = [
@@ -301,7 +344,8 @@ def analyze_robot_image(image_path: str) -> str:
         ]
         
         # Call Bedrock Converse API
-        response = bedrock.converse(
+        response = image_analysis_breaker.call(
+            bedrock.converse,
             modelId="us.amazon.nova-lite-v1:0",
             messages=messages,
         )
@@ -0,0 +1,80 @@
+import copy
+import logging
+import threading
+from typing import Any, Dict, Optional, Tuple
+import boto3
+from botocore.config import Config as BotoConfig
+
+
+class AwsClientRegistry:
+    """Process-wide cache of boto3 clients keyed by service, region and client config
+    
+    boto3 clients are thread-safe once created, but creating them is slow and
+    not thread-safe on a shared session, so creation is serialized here and
+    every caller reuses the same client and connection pool.
+    """
+    
+    def __init__(self, max_pool_connections: int = 50, max_attempts: int = 3, retry_mode: str = "adaptive"):
+        self.logger = logging.getLogger(__name__)
+        self._clients: Dict[Tuple, Any] = {}
+        self._session: Optional[boto3.session.Session] = None
+        self._lock = threading.Lock()
+        self.created: Dict[str, int] = {}
+        self.reused: Dict[str, int] = {}
+        self.configure(max_pool_connections, max_attempts, retry_mode)
+    
+    def configure(self, max_pool_connections: int = 50, max_attempts: int = 3, retry_mode: str = "adaptive") -> None:
+        """Set the default botocore options; applies to clients created afterwards"""
+        self.default_options = {
+            "max_pool_connections": max_pool_connections,
+            "tcp_keepalive": True,
+            "retries": {"max_attempts": max_attempts, "mode": retry_mode},
+        }
+    
+    def client(self, service_name: str, region_name: Optional[str] = None, **config_options: Any) -> Any:
+        """Return the shared client, creating it on first use; config_options override botocore defaults"""
+        options = {**self.default_options, **config_options}
+        key = (service_name, region_name, repr(sorted(options.items())))
+        
+        client = self._clients.get(key)
+        if client is not None:
+            self._count(self.reused, service_name)
+            return client
+        
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                if self._session is None:
+                    self._session = boto3.session.Session()
+                # botocore rewrites the retries dict in place, so hand it a copy
+                config = BotoConfig(**copy.deepcopy(options))
+                client = self._session.client(service_name, region_name=region_name, config=config)
+                self._clients[key] = client
+                self.created[service_name] = self.created.get(service_name, 0) + 1
+                self.logger.info(f"Created {service_name} client for region {region_name or 'default'}")
+                return client
+        self._count(self.reused, service_name)
+        return client
+    
+    def clear(self) -> None:
+        """Drop all cached clients, e.g. after credentials changed"""
+        with self._lock:
+            self._clients.clear()
+            self._session = None
+    
+    def stats(self) -> Dict[str, Any]:
+        """Client creations and reuses per service"""
+        with self._lock:
+            return {
+                "clients": len(self._clients),
+                "created": dict(self.created),
+                "reused": dict(self.reused),
+            }
+    
+    def _count(self, counters: Dict[str, int], service_name: str) -> None:
+        with self._lock:
+            counters[service_name] = counters.get(service_name, 0) + 1
+
+
+# Shared by tools, auth and S3 helpers
+aws_clients = AwsClientRegistry()
@@ -0,0 +1,271 @@
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+import httpx
+from botocore.exceptions import BotoCoreError, ClientError
+from utils.aws_clients import aws_clients
+from utils.http_client import http_clients
+from utils.metrics import MetricsRegistry, metrics
+
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+# Error codes AWS uses when a service sheds load rather than rejecting the request itself
+THROTTLING_CODES = {
+    "Throttling", "ThrottlingException", "ThrottledException", "RequestThrottled",
+    "TooManyRequestsException", "ServiceUnavailable", "ServiceUnavailableException",
+}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose circuit is open"""
+    
+    def __init__(self, name: str, failures: int, retry_in: float):
+        self.name = name
+        self.retry_in = retry_in
+        super().__init__(
+            f"{name} is unavailable (circuit open after {failures} consecutive failures), "
+            f"failing fast; next check in {retry_in:.0f}s"
+        )
+
+
+def is_outage(error: BaseException) -> bool:
+    """True if the error means the dependency is down or overloaded, not that the request was wrong"""
+    seen = set()
+    pending = [error]
+    while pending:
+        current = pending.pop()
+        if current is None or id(current) in seen:
+            continue
+        seen.add(id(current))
+        
+        if isinstance(current, (httpx.TransportError, TimeoutError, ConnectionError, BotoCoreError)):
+            return True
+        if isinstance(current, httpx.HTTPStatusError) and current.response.status_code >= 500:
+            return True
+        if isinstance(current, ClientError):
+            status = current.response.get("ResponseMetadata", {}).get("HTTPStatusCode", 0)
+            code = current.response.get("Error", {}).get("Code")
+            if status >= 500 or code in THROTTLING_CODES:
+                return True
+        
+        pending.extend([current.__cause__, current.__context__])
+        pending.extend(getattr(current, "exceptions", None) or [])
+    return False
+
+
+def http_probe(url: Callable[[], Optional[str]], timeout: float = 5.0) -> Callable[[], bool]:
+    """Probe that succeeds when url() answers with any status below 500"""
+    def probe() -> bool:
+        target = url()
+        if not target:
+            return False
+        return http_clients.request("GET", target, timeout=timeout).status_code < 500
+    return probe
+
+
+def aws_endpoint_probe(service_name: str, region_name: Optional[str] = None) -> Callable[[], bool]:
+    """Probe that succeeds when the AWS service endpoint is reachable"""
+    return http_probe(lambda: aws_clients.client(service_name, region_name=region_name).meta.endpoint_url)
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker for one remote dependency
+    
+    After failure_threshold outages in a row the circuit opens and calls fail
+    fast with CircuitOpenError. A background probe checks the dependency every
+    reset_timeout seconds; once it answers, the circuit goes half-open and
+    lets a single trial call through, which either closes it or opens it
+    again; other calls keep failing fast until the trial is resolved. Without
+    a probe, the circuit goes half-open once reset_timeout has passed.
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        probe: Optional[Callable[[], Any]] = None,
+        is_failure: Callable[[BaseException], bool] = is_outage,
+        registry: MetricsRegistry = metrics
+    ):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.probe = probe
+        self.is_failure = is_failure
+        self.registry = registry
+        self.logger = logging.getLogger(__name__)
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.trips = 0
+        self.rejected = 0
+        self._probing = False
+        # Start of the call let through while half-open, None when no trial is running
+        self._trial_started: Optional[float] = None
+        self._lock = threading.Lock()
+    
+    def call(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Call fn through the breaker"""
+        self.check()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            self.record_error(e)
+            raise
+        self.record_success()
+        return result
+    
+    def check(self) -> None:
+        """Raise CircuitOpenError while the circuit is open or a half-open trial call is running"""
+        with self._lock:
+            now = time.monotonic()
+            if self.state == STATE_CLOSED:
+                return
+            if self.state == STATE_OPEN:
+                elapsed = now - self.opened_at
+                if self.probe is None and elapsed >= self.reset_timeout:
+                    self._set_state(STATE_HALF_OPEN)
+            if self.state == STATE_HALF_OPEN:
+                # A trial whose outcome was never recorded is given up after reset_timeout
+                if self._trial_started is None or now - self._trial_started >= self.reset_timeout:
+                    self._trial_started = now
+                    return
+                elapsed = now - self._trial_started
+            self.rejected += 1
+            retry_in = max(0.0, self.reset_timeout - elapsed)
+        self.registry.increment(f"circuit.{self.name}.rejected")
+        raise CircuitOpenError(self.name, self.failures, retry_in)
+    
+    def record_success(self) -> None:
+        """Note a successful call; closes a half-open circuit"""
+        with self._lock:
+            self.failures = 0
+            self._trial_started = None
+            if self.state != STATE_CLOSED:
+                self._set_state(STATE_CLOSED)
+    
+    def record_error(self, error: BaseException) -> None:
+        """Note a failed call; only outages count towards tripping the circuit"""
+        if isinstance(error, CircuitOpenError):
+            return
+        if not self.is_failure(error):
+            # The dependency answered, it just rejected this request
+            self.record_success()
+            return
+        self.record_failure(str(error))
+    
+    def record_failure(self, reason: str) -> None:
+        """Count an outage, opening the circuit at the threshold or on a failed half-open call"""
+        with self._lock:
+            self.failures += 1
+            self.last_error = reason
+            self._trial_started = None
+            if self.state == STATE_OPEN:
+                return
+            if self.state == STATE_HALF_OPEN or self.failures >= self.failure_threshold:
+                self._trip()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Current state, failure streak and counters"""
+        with self._lock:
+            retry_in = None
+            if self.state == STATE_OPEN:
+                retry_in = round(max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at)), 1)
+            return {
+                "state": self.state,
+                "failures": self.failures,
+                "trips": self.trips,
+                "rejected": self.rejected,
+                "retry_in": retry_in,
+                "last_error": self.last_error,
+            }
+    
+    def _trip(self) -> None:
+        # Called with the lock held
+        self.opened_at = time.monotonic()
+        self.trips += 1
+        self._set_state(STATE_OPEN)
+        self.registry.increment(f"circuit.{self.name}.trips")
+        self.logger.warning(
+            f"Circuit {self.name} opened after {self.failures} consecutive failures: {self.last_error}"
+        )
+        if self.probe is not None and not self._probing:
+            self._probing = True
+            threading.Thread(target=self._probe_loop, name=f"circuit-probe-{self.name}", daemon=True).start()
+    
+    def _probe_loop(self) -> None:
+        """Probe the dependency until it answers, then let real calls through half-open"""
+        while True:
+            time.sleep(self.reset_timeout)
+            try:
+                healthy = self.probe() is not False
+            except Exception as e:
+                healthy = False
+                self.logger.info(f"Circuit {self.name} probe failed: {str(e)}")
+            
+            with self._lock:
+                if healthy or self.state != STATE_OPEN:
+                    self._probing = False
+                    if self.state == STATE_OPEN:
+                        self._set_state(STATE_HALF_OPEN)
+                    return
+                self.opened_at = time.monotonic()
+    
+    def _set_state(self, state: str) -> None:
+        if state != self.state:
+            self.logger.info(f"Circuit {self.name}: {self.state} -> {state}")
+            self.state = state
+
+
+class CircuitBreakerRegistry:
+    """Named circuit breakers sharing one threshold and reset timeout"""
+    
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+        self.configure(failure_threshold, reset_timeout)
+    
+    def configure(self, failure_threshold: int = 5, reset_timeout: float = 30.0) -> None:
+        """Set the threshold and reset timeout of existing and future breakers"""
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        with self._lock:
+            for breaker in self._breakers.values():
+                breaker.failure_threshold = self.failure_threshold
+                breaker.reset_timeout = self.reset_timeout
+    
+    def get(self, name: str, probe: Optional[Callable[[], Any]] = None) -> CircuitBreaker:
+        """The breaker called name, created on first use"""
+        with self._lock:
+            breaker = self._breakers.get(name)
+            if breaker is None:
+                breaker = CircuitBreaker(
+                    name,
+                    failure_threshold=self.failure_threshold,
+                    reset_timeout=self.reset_timeout,
+                    probe=probe
+                )
+                self._breakers[name] = breaker
+            elif probe is not None and breaker.probe is None:
+                breaker.probe = probe
+            return breaker
+    
+    def open_circuits(self) -> Dict[str, Dict[str, Any]]:
+        """Stats of the breakers that are currently failing fast"""
+        return {name: stats for name, stats in self.stats().items() if stats["state"] == STATE_OPEN}
+    
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """State of every breaker"""
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {name: breaker.stats() for name, breaker in sorted(breakers.items())}
+
+
+# Shared by auth, MCP and robot tools
+circuit_breakers = CircuitBreakerRegistry()
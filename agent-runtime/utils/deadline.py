@@ -0,0 +1,85 @@
+import asyncio
+import contextvars
+import threading
+import time
+from typing import AsyncGenerator, Any, Optional
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a request ran past its deadline or was abandoned by the client"""
+
+
+class Deadline:
+    """Per-request deadline shared by the stream, hooks and tool threads"""
+    
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+        self._cancelled = threading.Event()
+    
+    def remaining(self) -> float:
+        """Seconds left before the deadline, 0 once expired or cancelled"""
+        if self._cancelled.is_set():
+            return 0.0
+        return max(0.0, self.expires_at - time.monotonic())
+    
+    def expired(self) -> bool:
+        """Whether the deadline passed or the request was cancelled"""
+        return self.remaining() <= 0
+    
+    def cancel(self) -> None:
+        """Cancel the request, e.g. when the client disconnected"""
+        self._cancelled.set()
+    
+    def check(self) -> None:
+        """Raise DeadlineExceeded if the request should stop"""
+        if self._cancelled.is_set():
+            raise DeadlineExceeded("Request was cancelled")
+        if time.monotonic() >= self.expires_at:
+            raise DeadlineExceeded(f"Request deadline of {self.seconds}s exceeded")
+    
+    def timeout(self, default: float) -> float:
+        """Bound a blocking call's timeout by the remaining time"""
+        return min(default, self.remaining())
+
+
+def find_deadline_exceeded(error: BaseException) -> Optional[DeadlineExceeded]:
+    """The DeadlineExceeded behind error, looking through __cause__ and __context__"""
+    seen = set()
+    current: Optional[BaseException] = error
+    while current is not None and id(current) not in seen:
+        if isinstance(current, DeadlineExceeded):
+            return current
+        seen.add(id(current))
+        current = current.__cause__ or current.__context__
+    return None
+
+
+# Deadline of the request being served; copied into tool threads by asyncio.to_thread
+current_deadline: contextvars.ContextVar[Optional[Deadline]] = contextvars.ContextVar(
+    "current_deadline", default=None
+)
+
+
+def deadline_expired() -> bool:
+    """Whether the current request's deadline passed (False outside a request)"""
+    deadline = current_deadline.get()
+    return deadline is not None and deadline.expired()
+
+
+async def with_deadline(stream, deadline: Deadline) -> AsyncGenerator[Any, None]:
+    """Iterate stream, cancelling the pending step once the deadline passes"""
+    iterator = stream.__aiter__()
+    while True:
+        try:
+            # The timeout only covers the producer, never the consumer's time at yield
+            async with asyncio.timeout(deadline.remaining()):
+                event = await iterator.__anext__()
+        except StopAsyncIteration:
+            return
+        except TimeoutError:
+            if not deadline.expired():
+                raise
+            deadline.cancel()
+            raise DeadlineExceeded(f"Request deadline of {deadline.seconds}s exceeded") from None
+        yield event
@@ -0,0 +1,155 @@
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+import httpx
+from utils.metrics import MetricsRegistry, metrics
+
+
+class RequestTrace:
+    """Collects connection timings of one request from httpcore trace events"""
+    
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.timings: Dict[str, float] = {}
+        self._phase_started: Dict[str, float] = {}
+    
+    def __call__(self, event_name: str, info: Dict[str, Any]) -> None:
+        # e.g. "connection.connect_tcp.started" / "connection.start_tls.complete"
+        scope, _, state = event_name.rpartition(".")
+        phase = scope.rpartition(".")[2]
+        if state == "started":
+            self._phase_started[phase] = time.perf_counter()
+        elif state in ("complete", "failed") and phase in self._phase_started:
+            self.timings[phase] = time.perf_counter() - self._phase_started.pop(phase)
+    
+    @property
+    def reused_connection(self) -> bool:
+        return "connect_tcp" not in self.timings
+
+
+class RoundTripCounter:
+    """Counts the HTTP requests sent by the clients it creates
+
+    client_factory matches the httpx_client_factory hook of the MCP
+    streamable HTTP transport.
+    """
+    
+    def __init__(self):
+        self.count = 0
+    
+    async def _on_request(self, request: httpx.Request) -> None:
+        self.count += 1
+    
+    def client_factory(
+        self,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[httpx.Timeout] = None,
+        auth: Optional[httpx.Auth] = None
+    ) -> httpx.AsyncClient:
+        """Create an AsyncClient with MCP defaults that counts its requests"""
+        return httpx.AsyncClient(
+            headers=headers,
+            timeout=timeout or httpx.Timeout(30.0),
+            auth=auth,
+            follow_redirects=True,
+            event_hooks={"request": [self._on_request]}
+        )
+
+
+class HttpClients:
+    """Shared keep-alive HTTP client for gateway and MCP traffic
+    
+    One pooled httpx.Client serves all threads. Connect and TLS handshake
+    times are recorded per request.
+    """
+    
+    def __init__(
+        self,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 30.0,
+        timeout: float = 30.0,
+        registry: MetricsRegistry = metrics
+    ):
+        self.registry = registry
+        self.logger = logging.getLogger(__name__)
+        self.requests = 0
+        self.new_connections = 0
+        self.reused_connections = 0
+        self._client: Optional[httpx.Client] = None
+        self._lock = threading.Lock()
+        self.configure(max_connections, max_keepalive_connections, keepalive_expiry, timeout)
+    
+    def configure(
+        self,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 30.0,
+        timeout: float = 30.0
+    ) -> None:
+        """Set pool limits; takes effect for clients created afterwards"""
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.timeout = timeout
+    
+    def client(self) -> httpx.Client:
+        """The process-wide synchronous client"""
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = httpx.Client(limits=self.limits, timeout=self.timeout)
+        return self._client
+    
+    def request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """Send a request over the pooled connections"""
+        trace = RequestTrace()
+        kwargs.setdefault("extensions", {})["trace"] = trace
+        try:
+            response = self.client().request(method, url, **kwargs)
+        finally:
+            self._record(trace)
+        response.extensions["timings"] = self._timings_ms(trace)
+        return response
+    
+    def close(self) -> None:
+        """Close the shared client"""
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+    
+    def stats(self) -> Dict[str, Any]:
+        """Request count and connection reuse"""
+        return {
+            "requests": self.requests,
+            "new_connections": self.new_connections,
+            "reused_connections": self.reused_connections,
+            "max_connections": self.limits.max_connections,
+            "max_keepalive_connections": self.limits.max_keepalive_connections,
+        }
+    
+    def _record(self, trace: RequestTrace) -> None:
+        with self._lock:
+            self.requests += 1
+            if trace.reused_connection:
+                self.reused_connections += 1
+            else:
+                self.new_connections += 1
+        if not trace.reused_connection:
+            self.registry.observe("http.connect", trace.timings["connect_tcp"])
+            if "start_tls" in trace.timings:
+                self.registry.observe("http.tls", trace.timings["start_tls"])
+        self.registry.observe("http.request", time.perf_counter() - trace.started_at)
+    
+    def _timings_ms(self, trace: RequestTrace) -> Dict[str, Any]:
+        timings = {phase: round(seconds * 1000, 1) for phase, seconds in trace.timings.items()}
+        timings["reused_connection"] = trace.reused_connection
+        return timings
+
+
+# Process-wide client shared by auth and MCP health checks
+http_clients = HttpClients()
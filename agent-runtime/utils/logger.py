@@ -1,17 +1,98 @@
+import atexit
+import copy
+import json
 import logging
+import logging.handlers
+import queue
+import sys
+from datetime import datetime, timezone
+from typing import Optional
+from utils.metrics import current_request
+
+
+class RequestContextFilter(logging.Filter):
+    """Stamps records with the request and session id of the calling context"""
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        # Runs in the calling thread, where the request context variable is visible
+        request = current_request.get()
+        record.request_id = request.request_id if request else None
+        record.session_id = request.session_id if request else None
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as one JSON object per line"""
+    
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "thread": record.threadName,
+        }
+        if getattr(record, "request_id", None):
+            entry["request_id"] = record.request_id
+        if getattr(record, "session_id", None):
+            entry["session_id"] = record.session_id
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class RecordQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that leaves formatting, including tracebacks, to the listener's formatter"""
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve arguments and exceptions now so the record can cross threads
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
 
 
 class LoggerSetup:
     """Centralized logging configuration"""
     
+    # Background listener writing queued records, when queue logging is enabled
+    listener: Optional[logging.handlers.QueueListener] = None
+    
     @staticmethod
-    def setup_logging():
-        """Configure logging for the application"""
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S'
-        )
+    def setup_logging(level: str = "INFO", json_format: bool = False, use_queue: bool = False):
+        """Configure logging for the application
+        
+        With use_queue, request threads only enqueue records and a background
+        listener formats and writes them, keeping I/O off the streaming path.
+        """
+        if json_format:
+            formatter = JsonFormatter()
+        else:
+            formatter = logging.Formatter(
+                '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+                datefmt='%Y-%m-%d %H:%M:%S'
+            )
+        
+        stream_handler = logging.StreamHandler(sys.stderr)
+        stream_handler.setFormatter(formatter)
+        
+        if use_queue:
+            handler = RecordQueueHandler(queue.SimpleQueue())
+            LoggerSetup.listener = logging.handlers.QueueListener(
+                handler.queue, stream_handler, respect_handler_level=True
+            )
+            LoggerSetup.listener.start()
+            atexit.register(LoggerSetup.listener.stop)
+        else:
+            handler = stream_handler
+        handler.addFilter(RequestContextFilter())
+        
+        logging.basicConfig(level=getattr(logging, level.upper(), logging.INFO), handlers=[handler], force=True)
         
         # Set logging level for specific libraries
         logging.getLogger('requests').setLevel(logging.WARNING)
@@ -0,0 +1,233 @@
+import bisect
+import contextvars
+import logging
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+
+# Histogram bucket upper bounds in milliseconds
+DEFAULT_BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000]
+
+
+class Histogram:
+    """Cumulative latency histogram with a window of recent samples for percentiles"""
+    
+    def __init__(self, buckets_ms: Optional[List[float]] = None, window: int = 1024):
+        self.buckets_ms = buckets_ms or DEFAULT_BUCKETS_MS
+        self.bucket_counts = [0] * (len(self.buckets_ms) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self._recent: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+    
+    def observe(self, value_ms: float) -> None:
+        """Record one sample in milliseconds"""
+        with self._lock:
+            self.bucket_counts[bisect.bisect_left(self.buckets_ms, value_ms)] += 1
+            self.count += 1
+            self.total_ms += value_ms
+            self.max_ms = max(self.max_ms, value_ms)
+            self._recent.append(value_ms)
+    
+    def percentile(self, q: float) -> Optional[float]:
+        """Percentile (0-100) over the recent sample window"""
+        with self._lock:
+            samples = sorted(self._recent)
+        if not samples:
+            return None
+        index = min(len(samples) - 1, int(round(q / 100 * (len(samples) - 1))))
+        return samples[index]
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Count, mean, max, percentiles and bucket counts"""
+        with self._lock:
+            count = self.count
+            total = self.total_ms
+            max_ms = self.max_ms
+            buckets = {
+                f"le_{bound}": bucket_count
+                for bound, bucket_count in zip(self.buckets_ms + ["inf"], self.bucket_counts, strict=True)
+            }
+        return {
+            "count": count,
+            "mean_ms": round(total / count, 1) if count else None,
+            "max_ms": round(max_ms, 1),
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "buckets": buckets,
+        }
+
+
+class MetricsRegistry:
+    """Process-wide histograms, counters and gauge providers"""
+    
+    def __init__(self):
+        self._histograms: Dict[str, Histogram] = {}
+        self._counters: Dict[str, float] = {}
+        self._gauges: Dict[str, Callable[[], Any]] = {}
+        self._lock = threading.Lock()
+    
+    def histogram(self, name: str) -> Histogram:
+        """Get or create the histogram called name"""
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(name, Histogram())
+        return histogram
+    
+    def observe(self, name: str, seconds: float) -> None:
+        """Record a duration in seconds into the histogram called name"""
+        self.histogram(name).observe(seconds * 1000)
+    
+    def increment(self, name: str, value: float = 1) -> None:
+        """Increase the counter called name"""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+    
+    def register_gauge(self, name: str, provider: Callable[[], Any]) -> None:
+        """Register a callable whose result is included in every snapshot"""
+        self._gauges[name] = provider
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """All metrics as a JSON-serializable dictionary"""
+        with self._lock:
+            histograms = dict(self._histograms)
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+        
+        gauge_values = {}
+        for name, provider in gauges.items():
+            try:
+                gauge_values[name] = provider()
+            except Exception as e:
+                gauge_values[name] = {"error": str(e)}
+        
+        return {
+            "histograms": {name: histogram.snapshot() for name, histogram in sorted(histograms.items())},
+            "counters": counters,
+            "gauges": gauge_values,
+        }
+    
+    def summary_line(self) -> str:
+        """Compact one-line summary of histogram percentiles and counters"""
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            counters = sorted(self._counters.items())
+        parts = [
+            f"{name}: n={histogram.count} p50={histogram.percentile(50)} p95={histogram.percentile(95)}"
+            for name, histogram in histograms
+        ]
+        parts.extend(f"{name}={value}" for name, value in counters)
+        return "; ".join(parts)
+
+
+class RequestMetrics:
+    """Timings and token usage collected for a single runtime request"""
+    
+    def __init__(self, registry: MetricsRegistry, session_id: Optional[str] = None):
+        self.registry = registry
+        self.request_id = uuid.uuid4().hex
+        self.session_id = session_id
+        self.started_at = time.perf_counter()
+        self.timings: Dict[str, float] = {}
+        self.model_turns: List[float] = []
+        self.tool_calls: List[Dict[str, Any]] = []
+        self.usage: Dict[str, int] = {}
+        self._first_token_seen = False
+        self._open_spans: Dict[str, float] = {}
+    
+    def record(self, name: str, seconds: float) -> None:
+        """Record a named phase of this request"""
+        self.timings[name] = seconds
+        self.registry.observe(f"request.{name}", seconds)
+    
+    def start_span(self, key: str) -> None:
+        """Mark the start of a model turn or tool call"""
+        self._open_spans[key] = time.perf_counter()
+    
+    def end_span(self, key: str) -> Optional[float]:
+        """Close a span started with start_span and return its duration"""
+        started = self._open_spans.pop(key, None)
+        if started is None:
+            return None
+        return time.perf_counter() - started
+    
+    def record_model_turn(self, seconds: float) -> None:
+        """Record the duration of one model invocation"""
+        self.model_turns.append(seconds)
+        self.registry.observe("model.turn", seconds)
+    
+    def record_tool_call(self, name: str, kind: str, seconds: float, error: bool = False) -> None:
+        """Record one tool call; kind is "mcp" for gateway tools and "local" otherwise"""
+        self.tool_calls.append({"name": name, "kind": kind, "ms": round(seconds * 1000, 1), "error": error})
+        self.registry.observe(f"tool.{kind}.{name}", seconds)
+        if error:
+            self.registry.increment(f"tool.{kind}.{name}.errors")
+    
+    def observe_event(self, event: Dict[str, Any]) -> None:
+        """Track time-to-first-token and token usage from runtime stream events"""
+        event_type = event.get("type")
+        if event_type == "chunk" and not self._first_token_seen:
+            self._first_token_seen = True
+            self.record("time_to_first_token", time.perf_counter() - self.started_at)
+        elif event_type == "metadata":
+            for key, value in event.get("metadata", {}).get("usage", {}).items():
+                if isinstance(value, (int, float)):
+                    self.usage[key] = self.usage.get(key, 0) + value
+                    self.registry.increment(f"tokens.{key}", value)
+    
+    def finish(self) -> None:
+        """Record the total request duration"""
+        self.record("total", time.perf_counter() - self.started_at)
+        self.registry.increment("requests.completed")
+    
+    def summary(self) -> Dict[str, Any]:
+        """Per-request timing summary in milliseconds"""
+        return {
+            "request_id": self.request_id,
+            "session_id": self.session_id,
+            "timings_ms": {name: round(seconds * 1000, 1) for name, seconds in self.timings.items()},
+            "model_turns_ms": [round(seconds * 1000, 1) for seconds in self.model_turns],
+            "tool_calls": self.tool_calls,
+            "usage": self.usage,
+        }
+
+
+class MetricsReporter:
+    """Periodically logs a one-line metrics summary"""
+    
+    def __init__(self, registry: MetricsRegistry, interval: float):
+        self.registry = registry
+        self.interval = interval
+        self.logger = logging.getLogger(__name__)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self) -> None:
+        """Start the reporter thread unless the interval is disabled"""
+        if self.interval <= 0 or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="metrics-reporter", daemon=True)
+        self._thread.start()
+    
+    def stop(self) -> None:
+        """Stop the reporter thread"""
+        self._stop.set()
+    
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            summary = self.registry.summary_line()
+            if summary:
+                self.logger.info(f"Runtime metrics: {summary}")
+
+
+# Process-wide registry and the metrics of the request being served in this context
+metrics = MetricsRegistry()
+current_request: contextvars.ContextVar[Optional[RequestMetrics]] = contextvars.ContextVar(
+    "current_request", default=None
+)
@@ -1,5 +1,5 @@
-import boto3
 from urllib.parse import urlparse
+from utils.aws_clients import aws_clients
 
 
 def download_image_from_s3(s3_url: str) -> bytes:
@@ -23,8 +23,8 @@ def download_image_from_s3(s3_url: str) -> bytes:
         bucket_name = parsed_url.netloc
         object_key = parsed_url.path.lstrip('/')
         
-        # S3 클라이언트 생성
-        s3_client = boto3.client('s3')
+        # 공유 S3 클라이언트
+        s3_client = aws_clients.client('s3')
         
         # S3에서 객체 다운로드
         response = s3_client.get_object(Bucket=bucket_name, Key=object_key)
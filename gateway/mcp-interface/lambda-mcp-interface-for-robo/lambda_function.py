@@ -2,14 +2,25 @@ import json
 import boto3
 import os
 import traceback
+from botocore.config import Config
 
 bedrock_agent_runtime_client = boto3.client("bedrock-agent-runtime")
 
+# IoT client is created on first command and reused by warm invocations
+iot_client = None
+
+def get_iot_client():
+    global iot_client
+    if iot_client is None:
+        iot_client = boto3.client(
+            'iot-data',
+            region_name='ap-northeast-2',
+            config=Config(tcp_keepalive=True, retries={'max_attempts': 3, 'mode': 'adaptive'})
+        )
+    return iot_client
+
 def command_robot(action: str, message: str) -> str:
-    client = boto3.client(
-        'iot-data',
-        region_name='ap-northeast-2'
-    )        
+    client = get_iot_client()
     print('action: ', action)
 
     say = ""
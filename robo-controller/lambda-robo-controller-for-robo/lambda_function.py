@@ -2,11 +2,25 @@ import json
 import boto3
 import os
 import traceback
+from botocore.config import Config
 
 bedrock_agent_runtime_client = boto3.client("bedrock-agent-runtime")
 
 topic = os.environ.get('TOPIC', 'robot/control')
 
+# IoT client is created on first publish and reused by warm invocations
+iot_client = None
+
+def get_iot_client():
+    global iot_client
+    if iot_client is None:
+        iot_client = boto3.client(
+            'iot-data',
+            region_name='ap-northeast-2',
+            config=Config(tcp_keepalive=True, retries={'max_attempts': 3, 'mode': 'adaptive'})
+        )
+    return iot_client
+
 def command_robot(action: str, message: str, debug: bool = False) -> str:
     print('action: ', action)
     print('debug mode: ', debug)
@@ -68,10 +82,7 @@ def command_robot(action: str, message: str, debug: bool = False) -> str:
 
     # Debug 모드가 아닌 경우 실제 MQTT publish 수행
     try:
-        client = boto3.client(
-            'iot-data',
-            region_name='ap-northeast-2'
-        )
+        client = get_iot_client()
         
         response = client.publish(
             topic = topic,